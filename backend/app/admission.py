@@ -0,0 +1,167 @@
+"""
+Admission Control
+Per-client token-bucket rate limiting plus a global in-flight cap with a bounded wait queue
+"""
+import asyncio
+import ipaddress
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from .cache import LRUCache
+
+
+class AdmissionRejected(Exception):
+    """Request refused; carries the HTTP status and Retry-After seconds"""
+
+    def __init__(self, status_code, retry_after, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Take one token; returns seconds to wait if none are available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    def __init__(self, rate_per_client=1.0, burst=5, max_in_flight=32,
+                 max_queue=64, queue_timeout=5.0, shed=False):
+        self.rate_per_client = rate_per_client
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        # When saturated, degrade to cached/fallback answers instead of 503
+        self.shed = shed
+
+        # Bounded so a flood of distinct IPs can't grow memory without limit
+        self._buckets = LRUCache(max_entries=10000)
+        self._semaphore = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def check_rate(self, client_id):
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = TokenBucket(self.rate_per_client, self.burst)
+            self._buckets.set(client_id, bucket)
+
+        wait_for = bucket.take()
+        if wait_for > 0:
+            self.rejected += 1
+            raise AdmissionRejected(429, max(1, math.ceil(wait_for)), "Too many requests, slow down")
+
+    def saturated(self):
+        return self.in_flight >= self.max_in_flight and self.waiting >= self.max_queue
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of max_in_flight slots, waiting in a bounded queue if needed"""
+        if self._semaphore is None:
+            # Created lazily so it binds to the running event loop
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(503, math.ceil(self.queue_timeout), "Server busy, please retry")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AdmissionRejected(503, math.ceil(self.queue_timeout), "Server busy, please retry")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "shed_mode": self.shed,
+        }
+
+
+def _parse_networks(value):
+    networks = []
+    for item in value.split(","):
+        item = item.strip()
+        if item:
+            networks.append(ipaddress.ip_network(item, strict=False))
+    return networks
+
+
+# Proxies (IPs or CIDRs) whose X-Forwarded-For we believe; empty = ignore the header
+TRUSTED_PROXIES = _parse_networks(os.environ.get("TRUSTED_PROXIES", ""))
+
+
+def _trusted(host):
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_id_from(request):
+    """Client identity for rate limiting: peer IP, or the hop a trusted proxy saw
+
+    X-Forwarded-For is client-controlled except for what our own proxies
+    append, so it is only read when the peer is a trusted proxy, and then from
+    the right: the first hop that isn't one of our proxies is the client.
+    """
+    peer = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or not _trusted(peer):
+        return peer
+    for hop in reversed([hop.strip() for hop in forwarded.split(",")]):
+        if hop and not _trusted(hop):
+            return hop
+    return peer
+
+
+# Global instance
+admission_controller = None
+
+def get_admission_controller():
+    """Get or create the /ask admission controller"""
+    global admission_controller
+    if admission_controller is None:
+        admission_controller = AdmissionController(
+            rate_per_client=float(os.environ.get("ASK_RATE_PER_CLIENT", "1.0")),
+            burst=int(os.environ.get("ASK_BURST", "5")),
+            max_in_flight=int(os.environ.get("ASK_MAX_IN_FLIGHT", "32")),
+            max_queue=int(os.environ.get("ASK_MAX_QUEUE", "64")),
+            queue_timeout=float(os.environ.get("ASK_QUEUE_TIMEOUT", "5")),
+            shed=os.environ.get("ASK_SHED_MODE", "0") == "1"
+        )
+    return admission_controller
@@ -0,0 +1,276 @@
+"""
+Ask Analytics
+Every /ask as one row in rotating Parquet files, written off the request path
+
+A request only appends a dict to an in-memory deque (a few microseconds). A
+background thread drains the deque in batches into the current Parquet file
+and closes it after ANALYTICS_ROTATE_ROWS rows or ANALYTICS_ROTATE_SECONDS,
+renaming it from *.parquet.inprogress to *.parquet so readers only ever see
+complete files. Each process writes its own files, so workers never contend.
+
+Row: ts, normalized question, lang, outcome (crisis | calculator | cache | llm
+| coalesced | degraded | error), HTTP status, total latency, per-stage latency map (from
+stage_timer), LLM prompt/completion tokens.
+
+Query (from backend/):  python -m app.analytics top [N] | latency [stage]
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .cache import normalize_question
+from .metrics import metrics, stage_timer, stage_trace
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+ANALYTICS_ENABLED = os.environ.get("ANALYTICS_ENABLED", "1") == "1"
+ANALYTICS_DIR = Path(os.environ.get("ANALYTICS_DIR", "out/analytics"))
+ANALYTICS_FLUSH_ROWS = int(os.environ.get("ANALYTICS_FLUSH_ROWS", "1000"))
+ANALYTICS_FLUSH_SECONDS = float(os.environ.get("ANALYTICS_FLUSH_SECONDS", "5"))
+ANALYTICS_ROTATE_ROWS = int(os.environ.get("ANALYTICS_ROTATE_ROWS", "200000"))
+ANALYTICS_ROTATE_SECONDS = float(os.environ.get("ANALYTICS_ROTATE_SECONDS", "900"))
+ANALYTICS_MAX_BUFFER = 100000  # rows held in memory before new ones are dropped
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+_current = ContextVar("analytics_record", default=None)
+
+
+def _schema():
+    return pa.schema([
+        ("ts", pa.timestamp("ms")),
+        ("question", pa.string()),
+        ("lang", pa.string()),
+        ("outcome", pa.string()),
+        ("status", pa.int16()),
+        ("latency_ms", pa.float32()),
+        ("stages_ms", pa.map_(pa.string(), pa.float32())),
+        ("prompt_tokens", pa.int32()),
+        ("completion_tokens", pa.int32()),
+    ])
+
+
+def annotate(**fields):
+    """Set fields on the /ask row being recorded for this request (no-op outside one)"""
+    record = _current.get()
+    if record is not None:
+        record.update(fields)
+
+
+class AnalyticsSink:
+    def __init__(self, directory=ANALYTICS_DIR, flush_rows=ANALYTICS_FLUSH_ROWS,
+                 flush_seconds=ANALYTICS_FLUSH_SECONDS, rotate_rows=ANALYTICS_ROTATE_ROWS,
+                 rotate_seconds=ANALYTICS_ROTATE_SECONDS):
+        self.directory = Path(directory)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.rotate_rows = rotate_rows
+        self.rotate_seconds = rotate_seconds
+        self.enabled = ANALYTICS_ENABLED and pa is not None
+        self._buffer = deque()
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()  # one writer: background thread or an explicit flush()
+        self._writer = None
+        self._writer_path = None
+        self._writer_rows = 0
+        self._writer_opened = 0.0
+        self._files = 0
+        self._thread = None
+        self.dropped = 0
+        self.written = 0
+
+    def submit(self, record):
+        if not self.enabled:
+            return
+        if len(self._buffer) >= ANALYTICS_MAX_BUFFER:
+            self.dropped += 1
+            return
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_rows:
+            self._wake.set()
+
+    @contextmanager
+    def track(self, question, lang):
+        """Collect one /ask row; stage_timer and annotate() fill it in while the request runs"""
+        record = {
+            "ts": datetime.now(), "question": question, "lang": lang, "outcome": None,
+            "status": 200, "stages": {}, "prompt_tokens": None, "completion_tokens": None,
+        }
+        record_token = _current.set(record)
+        trace_token = stage_trace.set(record["stages"])
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["status"] = getattr(e, "status_code", 500)
+            record["outcome"] = record["outcome"] or "error"
+            raise
+        finally:
+            record["latency"] = time.perf_counter() - start
+            stage_trace.reset(trace_token)
+            _current.reset(record_token)
+            # Shared work (a coalesced LLM call) may still add stages after we return
+            record["stages"] = dict(record["stages"])
+            self.submit(record)
+
+    def start(self):
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="analytics-sink", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Analytics flush error: {e}")
+
+    def _rows_to_table(self, rows):
+        return pa.Table.from_pydict({
+            "ts": [row["ts"] for row in rows],
+            # Normalizing here, not in the request, keeps the request path to a deque append
+            "question": [normalize_question(row["question"]) for row in rows],
+            "lang": [row["lang"] for row in rows],
+            "outcome": [row["outcome"] or "llm" for row in rows],
+            "status": [row["status"] for row in rows],
+            "latency_ms": [row["latency"] * 1000 for row in rows],
+            "stages_ms": [[(stage, seconds * 1000) for stage, seconds in row["stages"].items()] for row in rows],
+            "prompt_tokens": [row["prompt_tokens"] for row in rows],
+            "completion_tokens": [row["completion_tokens"] for row in rows],
+        }, schema=_schema())
+
+    def flush(self, close=False):
+        """Write buffered rows; rotate (or close, on shutdown) the current file when due"""
+        if not self.enabled:
+            return
+        with self._flush_lock:
+            while self._buffer:
+                rows = []
+                while self._buffer and len(rows) < self.flush_rows:
+                    rows.append(self._buffer.popleft())
+                with stage_timer("analytics_flush"):
+                    self._write(self._rows_to_table(rows))
+                if self._writer_rows >= self.rotate_rows:
+                    self._close_writer()
+            if self._writer is not None and (close or time.time() - self._writer_opened >= self.rotate_seconds):
+                self._close_writer()
+
+    def _write(self, table):
+        if self._writer is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            self._files += 1
+            self._writer_path = self.directory / f"asks-{stamp}-{os.getpid()}-{self._files}.parquet.inprogress"
+            self._writer = pq.ParquetWriter(str(self._writer_path), table.schema, compression="zstd")
+            self._writer_rows = 0
+            self._writer_opened = time.time()
+        self._writer.write_table(table)
+        self._writer_rows += table.num_rows
+        self.written += table.num_rows
+        metrics.counter("analytics_rows_written_total").inc(table.num_rows)
+
+    def _close_writer(self):
+        self._writer.close()
+        os.replace(self._writer_path, self._writer_path.with_suffix(""))
+        self._writer = None
+
+    def stats(self):
+        return {"buffered": len(self._buffer), "written": self.written, "dropped": self.dropped}
+
+
+def load_asks(directory=ANALYTICS_DIR, hours=None):
+    """All completed rows (optionally only the last `hours`) as an Arrow table"""
+    files = sorted(str(path) for path in Path(directory).glob("asks-*.parquet"))
+    if not files:
+        return _schema().empty_table()
+    dataset = ds.dataset(files, schema=_schema(), format="parquet")
+    if hours is None:
+        return dataset.to_table()
+    since = pa.scalar(datetime.now() - timedelta(hours=hours), pa.timestamp("ms"))
+    return dataset.to_table(filter=ds.field("ts") >= since)
+
+
+def top_questions(n=20, hours=None, lang=None, directory=ANALYTICS_DIR):
+    """Most asked normalized questions with their outcome mix and latency"""
+    table = load_asks(directory, hours)
+    if lang:
+        table = table.filter(pc.equal(table["lang"], lang))
+    if table.num_rows == 0:
+        return []
+    llm = pc.cast(pc.equal(table["outcome"], "llm"), pa.int32())
+    grouped = table.append_column("llm", llm).group_by("question").aggregate([
+        ("question", "count"), ("llm", "sum"), ("latency_ms", "mean"), ("completion_tokens", "sum"),
+    ]).sort_by([("question_count", "descending")]).slice(0, n)
+    return [
+        {
+            "question": row["question"],
+            "count": row["question_count"],
+            # Asked often but reaching the LLM each time: candidates for cache pre-warming
+            "llm_calls": row["llm_sum"],
+            "mean_latency_ms": round(row["latency_ms_mean"], 1),
+            "completion_tokens": row["completion_tokens_sum"] or 0,
+        }
+        for row in grouped.to_pylist()
+    ]
+
+
+def latency_distribution(stage=None, hours=None, directory=ANALYTICS_DIR):
+    """Quantiles of total latency (or one stage's), overall and per outcome"""
+    table = load_asks(directory, hours)
+    if stage:
+        values = pc.map_lookup(table["stages_ms"], pa.scalar(stage), "first")
+        ran = pc.is_valid(values)  # rows where the stage actually ran
+        latency, outcome = pc.filter(values, ran), pc.filter(table["outcome"], ran)
+    else:
+        latency, outcome = table["latency_ms"], table["outcome"]
+
+    def summarize(column):
+        if len(column) == 0:
+            return {"count": 0}
+        quantiles = pc.quantile(column, q=list(QUANTILES)).to_pylist()
+        return {"count": len(column), "mean_ms": round(pc.mean(column).as_py(), 1),
+                **{f"p{int(q * 100)}_ms": round(value, 1) for q, value in zip(QUANTILES, quantiles)}}
+
+    result = {"stage": stage or "total", **summarize(latency), "by_outcome": {}}
+    for name in pc.unique(outcome).to_pylist():
+        result["by_outcome"][name] = summarize(pc.filter(latency, pc.equal(outcome, name)))
+    return result
+
+
+# Global instance
+analytics_sink = None
+
+def get_analytics_sink():
+    """Get or create the sink (call start() once the app is up)"""
+    global analytics_sink
+    if analytics_sink is None:
+        analytics_sink = AnalyticsSink()
+        if ANALYTICS_ENABLED and pa is None:
+            print("Analytics disabled: pip install pyarrow")
+    return analytics_sink
+
+
+if __name__ == "__main__":
+    import json
+    command = sys.argv[1] if len(sys.argv) > 1 else "top"
+    if command == "top":
+        print(json.dumps(top_questions(int(sys.argv[2]) if len(sys.argv) > 2 else 20), indent=2, ensure_ascii=False))
+    elif command == "latency":
+        print(json.dumps(latency_distribution(sys.argv[2] if len(sys.argv) > 2 else None), indent=2))
+    else:
+        print("Usage: python -m app.analytics top [N] | latency [stage]")
+        sys.exit(1)
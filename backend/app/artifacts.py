@@ -0,0 +1,392 @@
+"""
+Artifact Store
+Disk store for generated audio and charts: byte-budget LRU, idle TTL, background GC
+
+Files are written atomically (temp file + rename) and tracked in an in-memory index
+that is persisted to index.json, so lookups and evictions never scan the directory.
+In multi-worker mode (SHARED_CACHE_DIR set) the index lives in the shared LMDB map
+instead, so all workers share one byte budget and one LRU order.
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from .metrics import metrics
+from .shared_cache import SHARED_CACHE_DIR, SHARED_CACHE_MB, _open_env, shared_cache_enabled
+
+
+def artifact_key(*parts):
+    """Stable content key from the inputs that determine an artifact"""
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+
+
+class ArtifactStore:
+    def __init__(self, root, max_bytes=512 * 1024 * 1024, ttl=24 * 3600, index_flush_interval=5.0,
+                 tmp_grace=3600.0):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir = self.root / ".tmp"
+        self.tmp_dir.mkdir(exist_ok=True)
+        self.index_path = self.root / "index.json"
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.index_flush_interval = index_flush_interval
+        self.tmp_grace = tmp_grace  # scratch files older than this were abandoned (crash, failed job)
+
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> {"file", "size", "accessed"}, least recently used first
+        self.total_bytes = 0
+        self._dirty = False
+        self._last_flush = 0.0
+        self._gc_thread = None
+        self._stop = threading.Event()
+
+        self._load_index()
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Artifact index unreadable, starting empty: {e}")
+            return
+
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]["accessed"]):
+            # One stat per indexed file - never a directory listing
+            if (self.root / entry["file"]).exists():
+                self._index[key] = entry
+                self.total_bytes += entry["size"]
+
+    def _flush_index(self, force=False):
+        """Persist the index atomically; debounced unless forced. Caller holds the lock."""
+        now = time.monotonic()
+        if not self._dirty or (not force and now - self._last_flush < self.index_flush_interval):
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+        self._last_flush = now
+
+    def _remove(self, key):
+        """Drop one entry and its file. Caller holds the lock."""
+        entry = self._index.pop(key)
+        self.total_bytes -= entry["size"]
+        self._dirty = True
+        try:
+            (self.root / entry["file"]).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict_over_budget(self):
+        while self.total_bytes > self.max_bytes and self._index:
+            key = next(iter(self._index))
+            self._remove(key)
+            metrics.counter("artifact_evictions_total", reason="size").inc()
+
+    def path(self, key, ext=None):
+        """Path of a stored artifact (marks it recently used), or None.
+
+        With ext given, a file written by another worker process (not yet in
+        this process's index) is adopted after a single stat.
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None and ext is not None:
+                entry = self._adopt(key, ext)
+            if entry is None:
+                metrics.counter("cache_lookups_total", cache="artifacts", outcome="miss").inc()
+                return None
+            entry["accessed"] = time.time()
+            self._index.move_to_end(key)
+            self._dirty = True
+        metrics.counter("cache_lookups_total", cache="artifacts", outcome="hit").inc()
+        return self.root / entry["file"]
+
+    def _adopt(self, key, ext):
+        """Index an existing file for key. Caller holds the lock."""
+        filename = f"{key}.{ext}"
+        try:
+            size = (self.root / filename).stat().st_size
+        except FileNotFoundError:
+            return None
+        entry = {"file": filename, "size": size, "accessed": time.time()}
+        self._index[key] = entry
+        self.total_bytes += size
+        self._dirty = True
+        return entry
+
+    def put(self, key, data, ext):
+        """Store bytes atomically; returns the final path"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=f".{ext}")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return self.put_file(key, tmp_path, ext)
+
+    def put_file(self, key, source_path, ext):
+        """Move an already-written file (same filesystem) into the store"""
+        filename = f"{key}.{ext}"
+        size = os.path.getsize(source_path)
+        os.replace(source_path, self.root / filename)
+
+        with self._lock:
+            if key in self._index:
+                self.total_bytes -= self._index.pop(key)["size"]
+            self._index[key] = {"file": filename, "size": size, "accessed": time.time()}
+            self.total_bytes += size
+            self._dirty = True
+            self._evict_over_budget()
+            self._flush_index()
+        return self.root / filename
+
+    def scratch_path(self, suffix=""):
+        """Temp path on the store's filesystem for tools that write files themselves"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=suffix)
+        os.close(fd)
+        return tmp_path
+
+    def gc(self):
+        """Remove artifacts idle for longer than the TTL; O(expired) since the index is LRU-ordered"""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        with self._lock:
+            while self._index:
+                key, entry = next(iter(self._index.items()))
+                if entry["accessed"] >= cutoff:
+                    break
+                self._remove(key)
+                removed += 1
+            self._flush_index(force=True)
+        if removed:
+            metrics.counter("artifact_evictions_total", reason="ttl").inc(removed)
+        self._gc_tmp()
+        return removed
+
+    def _gc_tmp(self):
+        """Delete scratch files nobody moved into the store within the grace period"""
+        cutoff = time.time() - self.tmp_grace
+        removed = 0
+        with os.scandir(self.tmp_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass  # moved into the store (or removed) meanwhile
+        if removed:
+            metrics.counter("artifact_evictions_total", reason="tmp").inc(removed)
+        return removed
+
+    def start_gc(self, interval=300.0):
+        """Run gc() every `interval` seconds in a daemon thread"""
+        if self._gc_thread is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.gc()
+                except Exception as e:
+                    print(f"Artifact GC error: {e}")
+
+        self._gc_thread = threading.Thread(target=loop, name="artifact-gc", daemon=True)
+        self._gc_thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            self._flush_index(force=True)
+
+    def stats(self):
+        return {"entries": len(self._index), "bytes": self.total_bytes}
+
+
+class SharedArtifactStore(ArtifactStore):
+    """ArtifactStore whose index is an LMDB table every worker process reads and writes
+
+    Per-process indexes over one directory would each spend the full budget,
+    overwrite each other's index.json and evict files that are hot in another
+    worker. Here budget, access times and eviction are decided in one write
+    transaction, and only the process that removes an entry deletes its file.
+    """
+
+    # Access times are refreshed at most this often, since each refresh is a write
+    TOUCH_INTERVAL = 60.0
+    _TOTAL = b"total_bytes"
+    _ACCESSED = struct.Struct(">d")
+
+    def __init__(self, root, max_bytes=512 * 1024 * 1024, ttl=24 * 3600, tmp_grace=3600.0,
+                 path=SHARED_CACHE_DIR, map_size_mb=SHARED_CACHE_MB):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir = self.root / ".tmp"
+        self.tmp_dir.mkdir(exist_ok=True)
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.tmp_grace = tmp_grace
+        self.path_lmdb = str(path)
+        self.map_size = map_size_mb * 1024 * 1024
+        self._handles = None  # (pid, env, index db, by_access db, meta db)
+        self._gc_thread = None
+        self._stop = threading.Event()
+
+    def _dbs(self):
+        handles = self._handles
+        if handles is None or handles[0] != os.getpid():
+            env = _open_env(self.path_lmdb, self.map_size)
+            index = env.open_db(b"artifacts:index")          # key -> entry JSON
+            by_access = env.open_db(b"artifacts:by_access")  # accessed + key -> b""
+            meta = env.open_db(b"artifacts:meta")
+            handles = self._handles = (os.getpid(), env, index, by_access, meta)
+        return handles[1:]
+
+    def _total(self, txn, meta):
+        raw = txn.get(self._TOTAL, db=meta)
+        return struct.unpack(">q", raw)[0] if raw is not None else 0
+
+    def _write(self, txn, key, entry):
+        """Insert or replace one entry, keeping by_access and the byte total in step"""
+        _, index, by_access, meta = self._dbs()
+        total = self._total(txn, meta)
+        old = txn.get(key, db=index)
+        if old is not None:
+            old = json.loads(old)
+            txn.delete(self._ACCESSED.pack(old["accessed"]) + key, db=by_access)
+            total -= old["size"]
+        txn.put(key, json.dumps(entry).encode("utf-8"), db=index)
+        txn.put(self._ACCESSED.pack(entry["accessed"]) + key, b"", db=by_access)
+        txn.put(self._TOTAL, struct.pack(">q", total + entry["size"]), db=meta)
+
+    def _remove_oldest(self, txn, stop):
+        """Remove entries least recently used first until stop(accessed, total) is true.
+
+        Returns the removed files; the caller unlinks them after the commit.
+        """
+        _, index, by_access, meta = self._dbs()
+        total = self._total(txn, meta)
+        victims = []
+        for access_key in txn.cursor(db=by_access).iternext(values=False):
+            access_key = bytes(access_key)
+            (accessed,) = self._ACCESSED.unpack_from(access_key)
+            if stop(accessed, total):
+                break
+            key = access_key[self._ACCESSED.size:]
+            entry = json.loads(txn.get(key, db=index))
+            victims.append((access_key, key, entry))
+            total -= entry["size"]
+        for access_key, key, _ in victims:
+            txn.delete(access_key, db=by_access)
+            txn.delete(key, db=index)
+        txn.put(self._TOTAL, struct.pack(">q", total), db=meta)
+        return [entry["file"] for _, _, entry in victims]
+
+    def _over_budget(self, txn):
+        return self._remove_oldest(txn, lambda accessed, total: total <= self.max_bytes)
+
+    def _unlink(self, files, reason):
+        for filename in files:
+            try:
+                (self.root / filename).unlink()
+            except FileNotFoundError:
+                pass
+        if files:
+            metrics.counter("artifact_evictions_total", reason=reason).inc(len(files))
+
+    def path(self, key, ext=None):
+        env, index, _, _ = self._dbs()
+        lmdb_key = key.encode("utf-8")
+        with env.begin(db=index) as txn:
+            raw = txn.get(lmdb_key)
+        entry = json.loads(raw) if raw is not None else None
+        evicted = []
+
+        now = time.time()
+        if entry is None and ext is not None:
+            # A file with no entry (e.g. from before shared mode): adopt it
+            filename = f"{key}.{ext}"
+            try:
+                entry = {"file": filename, "size": (self.root / filename).stat().st_size, "accessed": now}
+            except FileNotFoundError:
+                entry = None
+            if entry is not None:
+                with env.begin(write=True) as txn:
+                    self._write(txn, lmdb_key, entry)
+                    evicted = self._over_budget(txn)
+        elif entry is not None and now - entry["accessed"] > self.TOUCH_INTERVAL:
+            with env.begin(write=True) as txn:
+                raw = txn.get(lmdb_key, db=index)
+                entry = json.loads(raw) if raw is not None else None  # evicted meanwhile
+                if entry is not None:
+                    entry["accessed"] = now
+                    self._write(txn, lmdb_key, entry)
+        self._unlink(evicted, "size")
+
+        if entry is None or entry["file"] in evicted:
+            metrics.counter("cache_lookups_total", cache="artifacts", outcome="miss").inc()
+            return None
+        metrics.counter("cache_lookups_total", cache="artifacts", outcome="hit").inc()
+        return self.root / entry["file"]
+
+    def put_file(self, key, source_path, ext):
+        filename = f"{key}.{ext}"
+        size = os.path.getsize(source_path)
+        os.replace(source_path, self.root / filename)
+
+        env = self._dbs()[0]
+        with env.begin(write=True) as txn:
+            self._write(txn, key.encode("utf-8"), {"file": filename, "size": size, "accessed": time.time()})
+            evicted = self._over_budget(txn)
+        self._unlink(evicted, "size")
+        return self.root / filename
+
+    def gc(self):
+        cutoff = time.time() - self.ttl
+        env = self._dbs()[0]
+        with env.begin(write=True) as txn:
+            expired = self._remove_oldest(txn, lambda accessed, total: accessed >= cutoff)
+        self._unlink(expired, "ttl")
+        self._gc_tmp()
+        return len(expired)
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def total_bytes(self):
+        env, _, _, meta = self._dbs()
+        with env.begin() as txn:
+            return self._total(txn, meta)
+
+    def stats(self):
+        env, index, _, meta = self._dbs()
+        with env.begin() as txn:
+            return {"entries": txn.stat(index)["entries"], "bytes": self._total(txn, meta)}
+
+
+# Global instance
+artifact_store = None
+
+def get_artifact_store():
+    """Get or create the artifact store (call start_gc() once the serving process is up)"""
+    global artifact_store
+    if artifact_store is None:
+        store_class = SharedArtifactStore if shared_cache_enabled() else ArtifactStore
+        artifact_store = store_class(
+            os.environ.get("ARTIFACT_DIR", "out/artifacts"),
+            max_bytes=int(os.environ.get("ARTIFACT_MAX_MB", "512")) * 1024 * 1024,
+            ttl=float(os.environ.get("ARTIFACT_TTL_HOURS", "24")) * 3600,
+            tmp_grace=float(os.environ.get("ARTIFACT_TMP_GRACE_MINUTES", "60")) * 60
+        )
+    return artifact_store
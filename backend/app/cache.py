@@ -0,0 +1,89 @@
+"""
+In-Memory Caching Helpers
+Size-bounded LRU cache with hit-rate statistics and question normalization
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_question(text):
+    """Normalize a question so near-identical phrasings share a cache key"""
+    text = text.lower().strip()
+    text = re.sub(r"\s+", " ", text)
+    # Trailing punctuation and filler doesn't change the answer
+    text = re.sub(r"[\s?!.।,]+$", "", text)
+    return text
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and (optionally) total bytes"""
+
+    def __init__(self, max_entries=1024, max_bytes=None, sizeof=None, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.ttl = ttl
+
+        self._data = OrderedDict()  # key -> (value, size, stored_at)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None, max_age=None):
+        """Return a cached value, or default on miss/expiry"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (max_age is not None and time.time() - entry[2] > max_age):
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Never cache something bigger than the whole budget
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+
+            self._data[key] = (value, size, time.time())
+            self.total_bytes += size
+
+            while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
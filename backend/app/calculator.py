@@ -0,0 +1,351 @@
+"""
+Scenario Calculator
+Vectorized EMI, amortization, SIP and retirement maths over grids of scenarios
+
+Every function broadcasts its arguments with NumPy, so one call evaluates a
+single scenario or a grid of thousands with the same code path.
+"""
+import inspect
+import re
+
+import numpy as np
+
+MAX_SCENARIOS = 200000
+MAX_SCHEDULE_CELLS = 2_000_000  # scenarios x months for full amortization tables
+
+# Accepted (min, max) per parameter; the step-up loop and powers scale with these,
+# so the bounds also keep every result within a sane, finite range
+PARAM_RANGES = {
+    "principal": (0, 1e12), "monthly": (0, 1e10), "target": (0, 1e13),
+    "monthly_expense": (0, 1e10), "current_corpus": (0, 1e13),
+    "months": (1, 600),
+    "annual_rate": (0, 50), "annual_return": (-50, 50), "step_up": (0, 25),
+    "inflation": (-20, 50), "pre_return": (-50, 50), "post_return": (-50, 50),
+    "current_age": (0, 120), "retire_age": (0, 120), "life_expectancy": (0, 120),
+}
+
+
+class CalcError(ValueError):
+    """Invalid or oversized calculation request"""
+
+
+def _monthly(annual_rate_pct):
+    return np.asarray(annual_rate_pct, dtype=np.float64) / 1200.0
+
+
+def scenario_grid(**axes):
+    """Cartesian product of the given axes -> dict of flat, equally long arrays"""
+    names = list(axes)
+    values = [np.atleast_1d(np.asarray(axes[name], dtype=np.float64)) for name in names]
+    size = int(np.prod([len(v) for v in values]))
+    if size > MAX_SCENARIOS:
+        raise CalcError(f"{size} scenarios requested; the limit is {MAX_SCENARIOS}")
+    mesh = np.meshgrid(*values, indexing="ij")
+    return {name: grid.ravel() for name, grid in zip(names, mesh)}
+
+
+def emi(principal, annual_rate, months):
+    """EMI = P·r·(1+r)^n / ((1+r)^n − 1); zero-rate loans repay P/n"""
+    principal, r, n = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64), _monthly(annual_rate), np.asarray(months, dtype=np.float64)
+    )
+    growth = np.power(1.0 + r, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(r > 0, principal * r * growth / (growth - 1.0), principal / n)
+    return payment
+
+
+def loan_summary(principal, annual_rate, months):
+    payment = emi(principal, annual_rate, months)
+    total = payment * np.asarray(months, dtype=np.float64)
+    return {
+        "emi": payment,
+        "total_payment": total,
+        "total_interest": total - np.asarray(principal, dtype=np.float64)
+    }
+
+
+def amortization(principal, annual_rate, months):
+    """Month-by-month schedule for every scenario, shape (scenarios, max_months).
+
+    Uses the closed form for the outstanding balance after k payments,
+    B_k = P(1+r)^k − EMI·((1+r)^k − 1)/r, so there is no Python loop over
+    months. Months past a scenario's tenure are zero.
+    """
+    principal, r, n = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(principal, dtype=np.float64)),
+        np.atleast_1d(_monthly(annual_rate)),
+        np.atleast_1d(np.asarray(months, dtype=np.float64))
+    )
+    horizon = int(n.max())
+    if principal.size * horizon > MAX_SCHEDULE_CELLS:
+        raise CalcError("Schedule too large; request fewer scenarios or summaries only")
+
+    payment = emi(principal, annual_rate=r * 1200.0, months=n)[:, None]
+    k = np.arange(horizon + 1, dtype=np.float64)[None, :]
+    growth = np.power(1.0 + r[:, None], k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        paid_factor = np.where(r[:, None] > 0, (growth - 1.0) / r[:, None], k)
+    balance = np.clip(principal[:, None] * growth - payment * paid_factor, 0.0, None)
+
+    active = k[:, 1:] <= n[:, None]
+    interest = np.where(active, balance[:, :-1] * r[:, None], 0.0)
+    principal_paid = np.where(active, balance[:, :-1] - balance[:, 1:], 0.0)
+    return {
+        "emi": payment[:, 0],
+        "interest": interest,
+        "principal": principal_paid,
+        "balance": np.where(active, balance[:, 1:], 0.0)
+    }
+
+
+def _level_sip(amount, r, count):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(r > 0, amount * ((np.power(1.0 + r, count) - 1.0) / r) * (1.0 + r), amount * count)
+
+
+def sip_corpus(monthly, annual_return, months, step_up=0.0):
+    """Future value of a monthly SIP (paid at the start of each month).
+
+    step_up is the yearly % increase in the instalment; with a step-up the
+    value is the sum of one level SIP per year, compounded to the end.
+    """
+    monthly, r, n, g = np.broadcast_arrays(
+        np.asarray(monthly, dtype=np.float64), _monthly(annual_return),
+        np.asarray(months, dtype=np.float64), np.asarray(step_up, dtype=np.float64) / 100.0
+    )
+    if not np.any(g):
+        corpus = _level_sip(monthly, r, n)
+        invested = monthly * n
+    else:
+        # One pass per year of the longest tenure, vectorized across scenarios
+        corpus = np.zeros_like(monthly)
+        invested = np.zeros_like(monthly)
+        for year in range(int(np.ceil(n.max() / 12.0))):
+            count = np.clip(n - year * 12.0, 0.0, 12.0)
+            amount = monthly * np.power(1.0 + g, year)
+            remaining = np.clip(n - year * 12.0 - count, 0.0, None)
+            corpus += _level_sip(amount, r, count) * np.power(1.0 + r, remaining)
+            invested += amount * count
+    return {"corpus": corpus, "invested": invested, "gain": corpus - invested}
+
+
+def sip_required(target, annual_return, months):
+    """Monthly SIP needed to reach `target` (inverse of the level SIP formula)"""
+    target, r, n = np.broadcast_arrays(
+        np.asarray(target, dtype=np.float64), _monthly(annual_return), np.asarray(months, dtype=np.float64)
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(r > 0, ((np.power(1.0 + r, n) - 1.0) / r) * (1.0 + r), n)
+    return target / factor
+
+
+def sip_goal(target, annual_return, months):
+    monthly = sip_required(target, annual_return, months)
+    return {"monthly_sip": monthly, "invested": monthly * np.asarray(months, dtype=np.float64)}
+
+
+def retirement_plan(monthly_expense, current_age, retire_age, life_expectancy=85,
+                    inflation=6.0, pre_return=12.0, post_return=7.0, current_corpus=0.0):
+    """Corpus needed at retirement and the monthly SIP that gets there.
+
+    Expenses grow with inflation until retirement; the corpus then funds an
+    inflation-indexed monthly draw until life_expectancy (present value of a
+    growing annuity at the post-retirement return).
+    """
+    expense, age, retire, life, infl, pre, post, corpus_now = np.broadcast_arrays(*(
+        np.asarray(v, dtype=np.float64)
+        for v in (monthly_expense, current_age, retire_age, life_expectancy, inflation, pre_return, post_return, current_corpus)
+    ))
+    months_to_retire = np.clip((retire - age) * 12.0, 0.0, None)
+    months_retired = np.clip((life - retire) * 12.0, 0.0, None)
+
+    expense_at_retirement = expense * np.power(1.0 + infl / 100.0, months_to_retire / 12.0)
+    r = post / 1200.0
+    g = np.power(1.0 + infl / 100.0, 1.0 / 12.0) - 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = (1.0 + g) / (1.0 + r)
+        annuity = np.where(
+            np.isclose(r, g),
+            months_retired,
+            (1.0 - np.power(ratio, months_retired)) / (1.0 - ratio)
+        )
+    corpus_needed = expense_at_retirement * annuity  # withdrawals at the start of each month
+
+    existing_grows_to = corpus_now * np.power(1.0 + pre / 1200.0, months_to_retire)
+    gap = np.clip(corpus_needed - existing_grows_to, 0.0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        monthly_sip = np.where(months_to_retire > 0, sip_required(gap, pre, months_to_retire), gap)
+    return {
+        "expense_at_retirement": expense_at_retirement,
+        "corpus_needed": corpus_needed,
+        "monthly_sip": monthly_sip
+    }
+
+
+CALCULATIONS = {
+    "emi": (loan_summary, ("principal", "annual_rate", "months")),
+    "sip": (sip_corpus, ("monthly", "annual_return", "months", "step_up")),
+    "sip_required": (sip_goal, ("target", "annual_return", "months")),
+    "retirement": (retirement_plan, ("monthly_expense", "current_age", "retire_age", "life_expectancy",
+                                     "inflation", "pre_return", "post_return", "current_corpus")),
+}
+
+
+def run_calculation(kind, params, grid=True, schedule=False):
+    """Evaluate one calculation over scalar/list parameters.
+
+    grid=True takes the cartesian product of list-valued parameters;
+    otherwise lists are broadcast element-wise (equal lengths).
+    """
+    if kind not in CALCULATIONS:
+        raise CalcError(f"Unknown calculation: {kind}")
+    func, allowed = CALCULATIONS[kind]
+    unknown = set(params) - set(allowed)
+    if unknown:
+        raise CalcError(f"Unknown parameters for {kind}: {', '.join(sorted(unknown))}")
+    required = [name for name, parameter in inspect.signature(func).parameters.items()
+                if parameter.default is inspect.Parameter.empty]
+    missing = [name for name in required if name not in params]
+    if missing:
+        raise CalcError(f"Missing parameters for {kind}: {', '.join(missing)}")
+
+    try:
+        for name, value in params.items():
+            shape = np.shape(np.asarray(value, dtype=np.float64))
+            if len(shape) > 1 or 0 in shape:
+                raise CalcError(f"{name} must be a number or a non-empty flat list of numbers")
+        if grid:
+            inputs = scenario_grid(**params)
+        else:
+            arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in params.values()))
+            if arrays and arrays[0].size > MAX_SCENARIOS:
+                raise CalcError(f"{arrays[0].size} scenarios requested; the limit is {MAX_SCENARIOS}")
+            inputs = dict(zip(params, arrays))
+    except CalcError:
+        raise
+    except (TypeError, ValueError) as e:
+        raise CalcError(f"Invalid parameters: {e}")
+    for name, values in inputs.items():
+        low, high = PARAM_RANGES[name]
+        if not np.all(np.isfinite(values)) or values.min() < low or values.max() > high:
+            raise CalcError(f"{name} must be between {low:g} and {high:g}")
+    if kind == "retirement" and np.any(inputs["retire_age"] <= inputs["current_age"]):
+        raise CalcError("retire_age must be greater than current_age")
+
+    outputs = func(**inputs)
+    if not all(np.all(np.isfinite(values)) for values in outputs.values()):
+        raise CalcError("Result out of range; check the rates and tenure")
+    result = {
+        "scenarios": int(next(iter(outputs.values())).size),
+        "inputs": {name: values.tolist() for name, values in inputs.items()},
+        "outputs": {name: np.round(values, 2).tolist() for name, values in outputs.items()}
+    }
+    if schedule and kind == "emi":
+        table = amortization(inputs["principal"], inputs["annual_rate"], inputs["months"])
+        result["schedule"] = {name: np.round(table[name], 2).tolist() for name in ("interest", "principal", "balance")}
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Numeric questions in /ask: "EMI for 20 lakh at 8.5% for 20 years"
+# ---------------------------------------------------------------------------
+
+# An amount needs a currency marker or a unit: a bare "2023" is more likely a year
+AMOUNT = re.compile(r"(₹|\brs\.?|\binr)?\s*(\d[\d,]*(?:\.\d+)?)\s*(lakhs?|lac|l|crores?|cr|k|thousand|rupees?)?\b")
+RATE = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+TENURE = re.compile(r"(\d+(?:\.\d+)?)\s*(years?|yrs?|months?)\b")
+YEAR = re.compile(r"\b(?:in|since|from|by|till|until|of)\s+(?:19|20)\d{2}\b")
+UNITS = {"lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "l": 1e5, "crore": 1e7, "crores": 1e7, "cr": 1e7,
+         "k": 1e3, "thousand": 1e3, "rupee": 1.0, "rupees": 1.0}
+GOAL_WORDS = re.compile(r"\b(need|needed|required|target|goal|reach|achieve)\b")
+
+ANSWER_TEMPLATES = {
+    "emi": {
+        "en": "🧮 For a loan of ₹{principal:,.0f} at {rate}% for {months:.0f} months, the EMI is ₹{emi:,.0f}.\n"
+              "• Total repaid: ₹{total:,.0f}\n• Total interest: ₹{interest:,.0f}\n"
+              "• Keep all EMIs below 40% of your monthly income",
+        "hi": "🧮 ₹{principal:,.0f} के लोन पर {rate}% ब्याज और {months:.0f} महीनों के लिए EMI ₹{emi:,.0f} होगी।\n"
+              "• कुल भुगतान: ₹{total:,.0f}\n• कुल ब्याज: ₹{interest:,.0f}\n"
+              "• सभी EMI अपनी मासिक आय के 40% से कम रखें",
+        "kn": "🧮 ₹{principal:,.0f} ಸಾಲಕ್ಕೆ {rate}% ಬಡ್ಡಿಯಲ್ಲಿ {months:.0f} ತಿಂಗಳಿಗೆ EMI ₹{emi:,.0f}.\n"
+              "• ಒಟ್ಟು ಪಾವತಿ: ₹{total:,.0f}\n• ಒಟ್ಟು ಬಡ್ಡಿ: ₹{interest:,.0f}\n"
+              "• ಎಲ್ಲಾ EMI ಗಳನ್ನು ಮಾಸಿಕ ಆದಾಯದ 40% ಕ್ಕಿಂತ ಕಡಿಮೆ ಇಡಿ",
+    },
+    "sip": {
+        "en": "📈 A SIP of ₹{monthly:,.0f}/month for {months:.0f} months at {rate}% a year grows to about ₹{corpus:,.0f}.\n"
+              "• You invest: ₹{invested:,.0f}\n• Estimated gain: ₹{gain:,.0f}\n"
+              "• Returns are not guaranteed - stay invested through market falls",
+        "hi": "📈 ₹{monthly:,.0f}/माह की SIP {months:.0f} महीनों तक {rate}% सालाना पर लगभग ₹{corpus:,.0f} बनती है।\n"
+              "• आपका निवेश: ₹{invested:,.0f}\n• अनुमानित लाभ: ₹{gain:,.0f}\n"
+              "• रिटर्न की गारंटी नहीं है - बाज़ार गिरने पर भी निवेश जारी रखें",
+        "kn": "📈 ತಿಂಗಳಿಗೆ ₹{monthly:,.0f} SIP {months:.0f} ತಿಂಗಳು {rate}% ವಾರ್ಷಿಕ ದರದಲ್ಲಿ ಸುಮಾರು ₹{corpus:,.0f} ಆಗುತ್ತದೆ.\n"
+              "• ನಿಮ್ಮ ಹೂಡಿಕೆ: ₹{invested:,.0f}\n• ಅಂದಾಜು ಲಾಭ: ₹{gain:,.0f}\n"
+              "• ಲಾಭ ಖಚಿತವಲ್ಲ - ಮಾರುಕಟ್ಟೆ ಕುಸಿದಾಗಲೂ ಹೂಡಿಕೆ ಮುಂದುವರಿಸಿ",
+    },
+    "sip_required": {
+        "en": "🎯 To reach ₹{target:,.0f} in {months:.0f} months at {rate}% a year, invest about ₹{monthly:,.0f}/month in a SIP.\n"
+              "• You invest: ₹{invested:,.0f}\n• Growth does the rest: ₹{gain:,.0f}\n"
+              "• Increase the SIP with every salary hike to get there sooner",
+        "hi": "🎯 {months:.0f} महीनों में {rate}% सालाना पर ₹{target:,.0f} के लिए लगभग ₹{monthly:,.0f}/माह की SIP करें।\n"
+              "• आपका निवेश: ₹{invested:,.0f}\n• बाकी ग्रोथ से: ₹{gain:,.0f}\n"
+              "• हर वेतन वृद्धि पर SIP बढ़ाएं",
+        "kn": "🎯 {months:.0f} ತಿಂಗಳಲ್ಲಿ {rate}% ವಾರ್ಷಿಕ ದರದಲ್ಲಿ ₹{target:,.0f} ತಲುಪಲು ತಿಂಗಳಿಗೆ ಸುಮಾರು ₹{monthly:,.0f} SIP ಮಾಡಿ.\n"
+              "• ನಿಮ್ಮ ಹೂಡಿಕೆ: ₹{invested:,.0f}\n• ಉಳಿದದ್ದು ಬೆಳವಣಿಗೆಯಿಂದ: ₹{gain:,.0f}\n"
+              "• ಪ್ರತಿ ಸಂಬಳ ಏರಿಕೆಯಲ್ಲಿ SIP ಹೆಚ್ಚಿಸಿ",
+    },
+}
+
+
+def _parse_terms(text):
+    """(amount, annual rate %, months) from free text, or None if any is missing or ambiguous"""
+    rates = RATE.findall(text)
+    tenures = TENURE.findall(text)
+    if len(set(rates)) != 1 or len(set(tenures)) != 1:
+        return None
+    taken = [match.span() for pattern in (RATE, TENURE, YEAR) for match in pattern.finditer(text)]
+    amounts = set()
+    for match in AMOUNT.finditer(text):
+        if any(start <= match.start(2) < end for start, end in taken):
+            continue  # that number is the rate, the tenure or a year
+        currency, unit = match.group(1), (match.group(3) or "").lower()
+        if currency or unit:
+            amounts.add(float(match.group(2).replace(",", "")) * UNITS.get(unit, 1.0))
+    if len(amounts) != 1:
+        return None  # no amount, or several we can't tell apart: let the LLM read it
+    value, unit = tenures[0]
+    months = float(value) * (1 if unit.startswith("month") else 12)
+    return amounts.pop(), float(rates[0]), months
+
+
+def answer_numeric_question(question, lang="en"):
+    """Exact answer for simple EMI/SIP questions, or None to fall through to the LLM"""
+    text = question.lower()
+    if re.search(r"\bemi\b", text):
+        kind = "emi"
+    elif re.search(r"\bsip\b", text):
+        kind = "sip_required" if GOAL_WORDS.search(text) else "sip"
+    else:
+        return None
+
+    terms = _parse_terms(text)
+    if terms is None:
+        return None
+    amount, rate, months = terms
+    if amount <= 0 or months <= 0 or months > 600 or rate > 50:
+        return None
+
+    if kind == "emi":
+        summary = loan_summary(amount, rate, months)
+        values = {"principal": amount, "emi": summary["emi"], "total": summary["total_payment"],
+                  "interest": summary["total_interest"]}
+    elif kind == "sip":
+        growth = sip_corpus(amount, rate, months)
+        values = {"monthly": amount, "corpus": growth["corpus"], "invested": growth["invested"], "gain": growth["gain"]}
+    else:
+        monthly = float(sip_required(amount, rate, months))
+        values = {"target": amount, "monthly": monthly, "invested": monthly * months, "gain": amount - monthly * months}
+
+    values = {name: float(value) for name, value in values.items()}
+    templates = ANSWER_TEMPLATES[kind]
+    return templates.get(lang, templates["en"]).format(rate=rate, months=months, **values)
@@ -0,0 +1,490 @@
+"""
+Regulatory Circulars Index
+Streams RBI/SEBI feed entries into a chunked, embedded, persistent retrieval index
+
+On-disk layout (CIRCULARS_DIR):
+    vectors-<n>.f32    append-only float32 matrix, one row per chunk
+    chunks-<n>.jsonl   append-only chunk text + document id, one line per row
+    manifest.json      data file generation n, row count, documents,
+                       tombstoned rows (replaced atomically)
+
+The manifest is the commit point. Only the first `rows` rows of the data
+files it names are valid, so a crash between an append and the manifest
+write leaves no half-indexed documents. Changed or withdrawn documents are
+tombstoned. Compaction writes the surviving rows to the next generation's
+files, commits a manifest naming them, and only then deletes the old ones,
+so a reader always sees a manifest and data files that match.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+
+from .metrics import metrics, stage_timer
+
+CIRCULARS_DIR = Path(os.environ.get("CIRCULARS_DIR", "out/circulars"))
+EMBED_MODEL = os.environ.get("CIRCULARS_EMBED_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+EMBED_BATCH = 32
+CHUNK_CHARS = 900
+CHUNK_OVERLAP = 150
+MAX_DOCUMENT_BYTES = 4 * 1024 * 1024
+COMPACT_DEAD_RATIO = 0.25
+LOCK_STALE_SECONDS = 3600
+
+# Feeds to ingest. "complete" feeds list every current document, so entries
+# that disappear from them (superseded master circulars) are tombstoned.
+CIRCULAR_FEEDS = {
+    "rbi": {"url": os.environ.get("RBI_CIRCULARS_FEED", "https://www.rbi.org.in/Scripts/RSS/RBIMasterCirculars.xml"),
+            "complete": True},
+    "sebi": {"url": os.environ.get("SEBI_CIRCULARS_FEED", "https://www.sebi.gov.in/rss/all.rss"),
+             "complete": False},
+}
+
+
+class IndexLocked(Exception):
+    """Another process is already writing the index"""
+
+
+def chunk_text(text, size=CHUNK_CHARS, overlap=CHUNK_OVERLAP):
+    """Paragraph-aware fixed-size chunks with overlap"""
+    text = re.sub(r"[ \t]+", " ", text)
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n|\n", text) if p.strip()]
+    chunks, current = [], ""
+    for paragraph in paragraphs:
+        while len(paragraph) > size:
+            # Very long paragraph: hard split, carrying overlap forward
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:size])
+            paragraph = paragraph[size - overlap:]
+        if len(current) + len(paragraph) + 1 > size and current:
+            chunks.append(current)
+            current = current[-overlap:] + " " + paragraph
+        else:
+            current = f"{current} {paragraph}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def extract_text(data, content_type=""):
+    """Plain text from an HTML page or PDF"""
+    if "pdf" in content_type or data[:5] == b"%PDF-":
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            return ""
+        reader = PdfReader(io.BytesIO(data))
+        return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(data, "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer"]):
+        tag.decompose()
+    return soup.get_text("\n")
+
+
+def fetch_document(url, timeout=20):
+    """Download a circular (size-capped) and return its text, or "" on failure"""
+    try:
+        with requests.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            data = b""
+            for block in response.iter_content(64 * 1024):
+                data += block
+                if len(data) > MAX_DOCUMENT_BYTES:
+                    break
+            return extract_text(data, response.headers.get("Content-Type", ""))
+    except Exception as e:
+        metrics.counter("upstream_errors_total", upstream="circular_fetch").inc()
+        print(f"Circular fetch error for {url}: {e}")
+        return ""
+
+
+def stream_feed_entries(feeds=None, fetch_pages=True):
+    """Yield (source, doc_id, meta, load_text) per feed entry, one feed at a time.
+
+    load_text is only called for new or changed entries, so an unchanged
+    circular costs no page download on later passes. When the page download
+    fails it falls back to title + summary and sets meta["partial"].
+    """
+    import feedparser
+    for source, feed in (feeds or CIRCULAR_FEEDS).items():
+        parsed = feedparser.parse(feed["url"])
+        if parsed.bozo and not parsed.entries:
+            metrics.counter("upstream_errors_total", upstream=f"rss_{source}").inc()
+            print(f"Circular feed {source} error: {parsed.get('bozo_exception')}")
+            continue
+        for entry in parsed.entries:
+            link = entry.get("link", "")
+            doc_id = hashlib.sha1(f"{source}|{entry.get('id') or link}".encode("utf-8")).hexdigest()[:16]
+            summary = entry.get("summary", "")
+            meta = {
+                "source": source.upper(),
+                "title": entry.get("title", ""),
+                "url": link,
+                "published": entry.get("published", ""),
+                "fingerprint": hashlib.sha256("|".join(
+                    [entry.get("title", ""), summary, entry.get("published", ""), entry.get("updated", "")]
+                ).encode("utf-8")).hexdigest()[:16]
+            }
+
+            def load_text(meta=meta, link=link, summary=summary):
+                body = fetch_document(link) if fetch_pages and link else ""
+                if fetch_pages and link and not body:
+                    meta["partial"] = True
+                return f"{meta['title']}\n\n{body or summary}"
+
+            yield source, doc_id, meta, load_text
+
+
+class SentenceEmbedder:
+    """Normalized sentence-transformer embeddings, loaded on first use"""
+
+    def __init__(self, model_name=EMBED_MODEL):
+        self.model_name = model_name
+        self._model = None
+
+    def __call__(self, texts):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(
+            texts, batch_size=EMBED_BATCH, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+class CircularIndex:
+    def __init__(self, root=CIRCULARS_DIR, embedder=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.root / "manifest.json"
+        self.lock_path = self.root / ".writer.lock"
+        self.embedder = embedder or SentenceEmbedder()
+
+        self._lock = threading.Lock()
+        self._loaded_mtime = None
+        self._checked = 0.0
+        self.manifest = self._empty_manifest()
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.chunks = []
+        self.alive = np.zeros(0, dtype=bool)
+
+    def _empty_manifest(self):
+        return {"generation": 0, "data": 0, "model": getattr(self.embedder, "model_name", ""), "dim": 0,
+                "rows": 0, "docs": {}, "tombstones": []}
+
+    def _data_paths(self, manifest):
+        """(vectors, chunks) files of the manifest's data generation"""
+        if "data" not in manifest:  # written before data files were generation-suffixed
+            return self.root / "vectors.f32", self.root / "chunks.jsonl"
+        data = manifest["data"]
+        return self.root / f"vectors-{data}.f32", self.root / f"chunks-{data}.jsonl"
+
+    # -- Reading -------------------------------------------------------------
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return self._empty_manifest()
+
+    def _read_data(self, manifest):
+        rows, dim = manifest["rows"], manifest["dim"]
+        if not (rows and dim):
+            return np.zeros((0, dim), dtype=np.float32), []
+        vectors_path, chunks_path = self._data_paths(manifest)
+        vectors = np.fromfile(vectors_path, dtype=np.float32, count=rows * dim).reshape(rows, dim)
+        chunks = []
+        with open(chunks_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if len(chunks) == rows:
+                    break
+                chunks.append(json.loads(line))
+        return vectors, chunks
+
+    def load(self, attempts=3):
+        """(Re)load the committed part of the index into memory"""
+        for attempt in range(attempts):
+            mtime = self._manifest_mtime()  # before reading, so a commit racing us triggers a reload
+            manifest = self._read_manifest()
+            try:
+                vectors, chunks = self._read_data(manifest)
+                break
+            except FileNotFoundError:
+                # A compaction committed and removed this generation's files
+                # between our manifest read and opening them: read the new manifest
+                if attempt == attempts - 1:
+                    raise
+        alive = np.ones(manifest["rows"], dtype=bool)
+        if manifest["tombstones"]:
+            alive[np.asarray(manifest["tombstones"], dtype=np.int64)] = False
+
+        with self._lock:
+            self.manifest, self.vectors, self.chunks, self.alive = manifest, vectors, chunks, alive
+            self._loaded_mtime = mtime
+        return self
+
+    def _manifest_mtime(self):
+        try:
+            return self.manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def refresh(self, min_interval=30.0):
+        """Reload if another process committed since the last load (cheap stat, rate-limited)"""
+        now = time.monotonic()
+        if now - self._checked < min_interval:
+            return
+        self._checked = now
+        if self._manifest_mtime() != self._loaded_mtime:
+            self.load()
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def search(self, query, k=3, min_score=0.35):
+        """Top-k live chunks by cosine similarity"""
+        with self._lock:
+            vectors, chunks, alive, docs = self.vectors, self.chunks, self.alive, self.manifest["docs"]
+        if not alive.any():
+            return []
+        query_vector = self.embedder([query])[0]
+        scores = vectors @ query_vector
+        scores[~alive] = -1.0
+        top = np.argpartition(-scores, min(k, len(scores) - 1))[:k]
+        results = []
+        for row in top[np.argsort(-scores[top])]:
+            if scores[row] < min_score:
+                break
+            chunk = chunks[row]
+            doc = docs.get(chunk["doc"], {})
+            results.append({
+                "text": chunk["text"],
+                "title": doc.get("title", ""),
+                "url": doc.get("url", ""),
+                "source": doc.get("source", ""),
+                "score": round(float(scores[row]), 3)
+            })
+        return results
+
+    # -- Writing (one process at a time) ---------------------------------------
+
+    def _acquire_writer(self):
+        try:
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if time.time() - self.lock_path.stat().st_mtime < LOCK_STALE_SECONDS:
+                raise IndexLocked(str(self.lock_path))
+            self.lock_path.unlink()  # writer died without cleaning up
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+
+    def _write_manifest(self, manifest):
+        manifest["generation"] += 1
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _truncate_to(self, manifest):
+        """Drop bytes/lines past the committed row count (left by an interrupted writer)"""
+        rows, dim = manifest["rows"], manifest["dim"]
+        vectors_path, chunks_path = self._data_paths(manifest)
+        if vectors_path.exists():
+            with open(vectors_path, "r+b") as f:
+                f.truncate(rows * dim * 4)
+        if chunks_path.exists():
+            with open(chunks_path, "r+b") as f:
+                offset = 0
+                for _ in range(rows):
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                f.truncate(offset)
+
+    def _append(self, manifest, batch):
+        """Embed and append [(doc_id, meta, text_hash, chunks)], then commit the manifest"""
+        texts = [chunk for _, _, _, chunks in batch for chunk in chunks]
+        if not texts:
+            return
+        with stage_timer("circulars_embed"):
+            vectors = self.embedder(texts)
+        if not manifest["dim"]:
+            manifest["dim"] = int(vectors.shape[1])
+
+        vectors_path, chunks_path = self._data_paths(manifest)
+        with open(vectors_path, "ab") as vf, open(chunks_path, "a", encoding="utf-8") as cf:
+            vf.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            row = manifest["rows"]
+            for doc_id, meta, text_hash, chunks in batch:
+                previous = manifest["docs"].get(doc_id)
+                if previous:
+                    manifest["tombstones"].extend(previous["rows"])
+                rows = list(range(row, row + len(chunks)))
+                for chunk in chunks:
+                    cf.write(json.dumps({"doc": doc_id, "text": chunk}, ensure_ascii=False) + "\n")
+                manifest["docs"][doc_id] = dict(meta, hash=text_hash, rows=rows, indexed_at=time.time())
+                row += len(chunks)
+            vf.flush()
+            cf.flush()
+            os.fsync(vf.fileno())
+            os.fsync(cf.fileno())
+        manifest["rows"] = row
+        self._write_manifest(manifest)
+        metrics.counter("circular_chunks_indexed_total").inc(len(texts))
+
+    def delete(self, manifest, doc_id):
+        doc = manifest["docs"].pop(doc_id, None)
+        if doc:
+            manifest["tombstones"].extend(doc["rows"])
+
+    def ingest(self, entries, feeds=None):
+        """Index new/changed entries from a (source, doc_id, meta, text) stream.
+
+        text may be a string or a zero-argument callable. Entries whose feed
+        fingerprint or content hash is unchanged are skipped; changed ones are
+        re-chunked and their old rows tombstoned in the same commit. A partial
+        entry (body fetch failed) is stored without its fingerprint, so the
+        next pass fetches it again, and never replaces a complete copy.
+        """
+        feeds = feeds or CIRCULAR_FEEDS
+        self._acquire_writer()
+        try:
+            manifest = self._read_manifest()
+            self._truncate_to(manifest)
+            seen = {source: set() for source in feeds}
+            stats = {"added": 0, "updated": 0, "unchanged": 0, "deleted": 0, "partial": 0}
+            batch, pending = [], 0
+
+            for source, doc_id, meta, text in entries:
+                seen.setdefault(source, set()).add(doc_id)
+                previous = manifest["docs"].get(doc_id)
+                if previous and meta.get("fingerprint") and previous.get("fingerprint") == meta["fingerprint"]:
+                    stats["unchanged"] += 1
+                    continue
+                if callable(text):
+                    text = text()
+                if meta.get("partial"):
+                    stats["partial"] += 1
+                    meta = {name: value for name, value in meta.items() if name != "fingerprint"}
+                    if previous and not previous.get("partial"):
+                        continue  # keep the full copy; its old fingerprint makes the next pass retry
+                text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+                if previous and previous["hash"] == text_hash:
+                    stats["unchanged"] += 1
+                    continue
+                chunks = chunk_text(text)
+                if not chunks:
+                    continue
+                stats["updated" if previous else "added"] += 1
+                batch.append((doc_id, meta, text_hash, chunks))
+                pending += len(chunks)
+                if pending >= EMBED_BATCH:
+                    self._append(manifest, batch)
+                    batch, pending = [], 0
+            self._append(manifest, batch)
+
+            # Withdrawn/superseded documents: gone from a feed that lists everything current
+            for source, feed in feeds.items():
+                if not feed.get("complete") or not seen.get(source):
+                    continue
+                for doc_id, doc in list(manifest["docs"].items()):
+                    if doc.get("source") == source.upper() and doc_id not in seen[source]:
+                        self.delete(manifest, doc_id)
+                        stats["deleted"] += 1
+            if stats["deleted"]:
+                self._write_manifest(manifest)
+
+            if manifest["rows"] and len(manifest["tombstones"]) / manifest["rows"] > COMPACT_DEAD_RATIO:
+                self._compact(manifest)
+            return stats
+        finally:
+            self.lock_path.unlink(missing_ok=True)
+
+    def _compact(self, manifest):
+        """Rewrite vectors/chunks without tombstoned rows; caller holds the writer lock"""
+        rows, dim = manifest["rows"], manifest["dim"]
+        old_vectors, old_chunks = self._data_paths(manifest)
+        vectors = np.fromfile(old_vectors, dtype=np.float32, count=rows * dim).reshape(rows, dim)
+        with open(old_chunks, "r", encoding="utf-8") as f:
+            lines = [next(f) for _ in range(rows)]
+
+        keep = np.ones(rows, dtype=bool)
+        keep[np.asarray(manifest["tombstones"], dtype=np.int64)] = False
+        new_row = np.cumsum(keep) - 1
+
+        # New generation's files under new names: the live ones are never touched
+        manifest["data"] = manifest.get("data", 0) + 1
+        new_vectors, new_chunks = self._data_paths(manifest)
+        with open(new_vectors, "wb") as f:
+            f.write(np.ascontiguousarray(vectors[keep]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(new_chunks, "w", encoding="utf-8") as f:
+            f.writelines(line for line, kept in zip(lines, keep) if kept)
+            f.flush()
+            os.fsync(f.fileno())
+
+        for doc in manifest["docs"].values():
+            doc["rows"] = [int(new_row[row]) for row in doc["rows"]]
+        manifest["rows"] = int(keep.sum())
+        manifest["tombstones"] = []
+        self._write_manifest(manifest)  # commit point: readers switch to the new files here
+        old_vectors.unlink(missing_ok=True)
+        old_chunks.unlink(missing_ok=True)
+        metrics.counter("circular_compactions_total").inc()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self.manifest["docs"]),
+                "rows": self.manifest["rows"],
+                "live_rows": int(self.alive.sum()),
+                "generation": self.manifest["generation"]
+            }
+
+
+def grounding_context(index, question, k=3):
+    """Relevant circular excerpts for the prompt, plus their citations"""
+    index.refresh()
+    if not len(index):
+        return "", []
+    with stage_timer("circulars_search"):
+        hits = index.search(question, k=k)
+    context = "\n".join(f"[{hit['source']}] {hit['title']}: {hit['text']}" for hit in hits)
+    sources = [{"topic": hit["title"], "url": hit["url"], "confidence": hit["score"]} for hit in hits]
+    return context, sources
+
+
+# Global instance
+circular_index = None
+
+def get_circular_index():
+    """Get or load the circulars index"""
+    global circular_index
+    if circular_index is None:
+        circular_index = CircularIndex().load()
+    return circular_index
+
+
+def ingest_circulars(fetch_pages=True):
+    """One incremental ingestion pass over all circular feeds (job handler entry point)"""
+    index = CircularIndex().load()
+    try:
+        with stage_timer("circulars_ingest"):
+            return index.ingest(stream_feed_entries(fetch_pages=fetch_pages))
+    except IndexLocked:
+        return {"skipped": "another ingestion is running"}
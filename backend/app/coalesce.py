@@ -0,0 +1,42 @@
+"""
+Request Coalescing (single-flight)
+Concurrent callers with the same key share one in-flight computation
+"""
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self._pending = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def run(self, key, factory):
+        """Run factory() once per key; callers arriving while it runs share its result"""
+        task = self._pending.get(key)
+
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(factory())
+            self._pending[key] = task
+            # Drop the key as soon as the work finishes so later calls recompute
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            self.followers += 1
+
+        # shield: one caller disconnecting must not cancel the shared work
+        return await asyncio.shield(task)
+
+    def running(self, key):
+        """True if a call for key is already in flight (the next run() would join it)"""
+        return key in self._pending
+
+    def in_flight(self):
+        return len(self._pending)
+
+    def stats(self):
+        return {
+            "in_flight": len(self._pending),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
@@ -0,0 +1,121 @@
+"""
+Conversation Memory
+Per-session ring of recent turns plus an incrementally updated rolling summary
+"""
+import os
+import threading
+from collections import deque
+
+from .cache import LRUCache
+from .metrics import metrics
+from .prompting import estimate_tokens, clip_to_tokens
+
+RECENT_TURNS = int(os.environ.get("SESSION_RECENT_TURNS", "3"))
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("SESSION_CONTEXT_TOKENS", "350"))
+SUMMARY_MAX_WORDS = 80
+SUMMARY_MODEL = os.environ.get("SESSION_SUMMARY_MODEL", "llama-3.1-8b-instant")
+
+
+class Session:
+    def __init__(self, recent_turns=RECENT_TURNS):
+        self.turns = deque(maxlen=recent_turns)
+        self.summary = ""
+        self.pending_fold = []  # turns pushed out of the ring, not yet summarized
+        self.version = 0        # bumps on every turn; part of cache/coalescing keys
+        self.folding = False    # a fold_summary() call owns the summary
+        self.lock = threading.Lock()
+
+
+class ConversationStore:
+    def __init__(self, max_sessions=10000, idle_ttl=3600, llm=None):
+        self.sessions = LRUCache(max_entries=max_sessions, ttl=idle_ttl)
+        self.llm = llm
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = Session()
+        # Re-set on every use so the TTL measures idle time, not session age
+        self.sessions.set(session_id, session)
+        return session
+
+    def pack_context(self, session, budget=CONTEXT_TOKEN_BUDGET):
+        """Summary + newest turns that fit the token budget; cost stays constant per turn"""
+        with session.lock:
+            summary = session.summary
+            turns = list(session.turns)
+
+        parts = []
+        used = 0
+        if summary:
+            summary = clip_to_tokens(summary, budget // 3)
+            parts.append(f"Earlier in this conversation: {summary}")
+            used += estimate_tokens(parts[0])
+
+        recent = []
+        for question, answer in reversed(turns):
+            remaining = budget - used
+            if remaining <= 20:
+                break
+            turn = f"User: {question}\nAssistant: {clip_to_tokens(answer, max(10, remaining - estimate_tokens(question) - 5))}"
+            recent.append(turn)
+            used += estimate_tokens(turn)
+        parts.extend(reversed(recent))
+        return "\n".join(parts)
+
+    def record(self, session, question, answer):
+        """Add a turn; returns True when an older turn needs folding into the summary"""
+        with session.lock:
+            if len(session.turns) == session.turns.maxlen:
+                session.pending_fold.append(session.turns[0])
+            session.turns.append((question, answer))
+            session.version += 1
+            return bool(session.pending_fold)
+
+    def fold_summary(self, session):
+        """Fold evicted turns into the rolling summary (small LLM calls, off the request path)
+
+        One fold runs per session at a time: a call that finds another in
+        progress returns at once, and the running one picks up whatever was
+        queued meanwhile, so no fold overwrites another's turns.
+        """
+        with session.lock:
+            if session.folding or not session.pending_fold:
+                return
+            session.folding = True
+            pending, session.pending_fold = session.pending_fold, []
+            summary = session.summary
+        try:
+            while pending:
+                summary = self._fold(summary, pending)
+                with session.lock:
+                    session.summary = summary
+                    pending, session.pending_fold = session.pending_fold, []
+        finally:
+            with session.lock:
+                session.folding = False
+
+    def _fold(self, summary, pending):
+        exchanges = "\n".join(f"User: {q}\nAssistant: {clip_to_tokens(a, 120)}" for q, a in pending)
+        try:
+            response = self.llm.chat(
+                model=SUMMARY_MODEL,
+                messages=[{"role": "user", "content": (
+                    f"Update this running summary of a personal-finance chat with the new exchange. "
+                    f"Keep facts about the user's money situation and goals. Max {SUMMARY_MAX_WORDS} words.\n\n"
+                    f"Summary so far: {summary or '(empty)'}\n\nNew exchange:\n{exchanges}\n\nUpdated summary:"
+                )}],
+                temperature=0.2,
+                max_tokens=160,
+                deadline=10
+            )
+            updated = response.choices[0].message.content.strip()
+            metrics.counter("session_summaries_total", method="llm").inc()
+        except Exception as e:
+            # Extractive fallback: keep the user's questions, trimmed to the budget
+            print(f"Session summary error: {e}")
+            updated = " ".join([summary] + [f"Asked: {q}" for q, _ in pending]).strip()
+            metrics.counter("session_summaries_total", method="extractive").inc()
+
+        # Hard cap so the summary can never grow without bound; newest words win
+        return " ".join(updated.split()[-SUMMARY_MAX_WORDS * 2:])
@@ -1,6 +1,8 @@
 import graphviz
 import os
 
+from .artifacts import get_artifact_store, artifact_key
+
 def generate_flowchart(income, expenses, emi, savings, emi_share, savings_rate, output_path="out/flowchart"):
     """Generate financial health flowchart"""
     try:
@@ -59,3 +61,21 @@ def generate_flowchart(income, expenses, emi, savings, emi_share, savings_rate,
     except Exception as e:
         print(f"Flowchart generation error: {e}")
         return None
+
+
+def flowchart_artifact(income, expenses, emi, savings, emi_share, savings_rate):
+    """Render into the artifact store, reusing an identical chart if one exists"""
+    store = get_artifact_store()
+    key = artifact_key("flowchart", income, expenses, emi, savings, emi_share, savings_rate)
+    
+    existing = store.path(key)
+    if existing is not None:
+        return str(existing)
+    
+    # graphviz appends ".png" to the output path itself
+    scratch = store.scratch_path()
+    os.remove(scratch)
+    rendered = generate_flowchart(income, expenses, emi, savings, emi_share, savings_rate, output_path=scratch)
+    if rendered is None:
+        return None
+    return str(store.put_file(key, rendered, "png"))
@@ -0,0 +1,320 @@
+"""
+Background Jobs
+Durable SQLite job queue with priorities and retries, run by a local process pool
+"""
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from .metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 5,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    result TEXT,
+    error TEXT,
+    run_after REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, created_at);
+"""
+
+
+class UnknownJobKind(Exception):
+    """Raised when enqueuing a job kind with no registered handler"""
+
+
+# ---------------------------------------------------------------------------
+# Handlers - module-level so they pickle into worker processes. Artifacts are
+# written to scratch paths and registered by the parent, which owns the index.
+# ---------------------------------------------------------------------------
+
+def run_tts_job(payload):
+    from .tts import tts_synthesize, get_tts_engine
+    engine = get_tts_engine()
+    path = tts_synthesize(payload["text"], payload.get("lang", "en"), output_path=payload["scratch"])
+    if path is None:
+        raise RuntimeError("TTS synthesis failed")
+    return {"artifact": {"key": payload["key"], "path": path, "ext": engine.extension}}
+
+
+def run_flowchart_job(payload):
+    from .flowchart import generate_flowchart
+    args = {k: payload[k] for k in ("income", "expenses", "emi", "savings", "emi_share", "savings_rate")}
+    path = generate_flowchart(**args, output_path=payload["scratch"])
+    if path is None:
+        raise RuntimeError("Flowchart rendering failed")
+    return {"artifact": {"key": payload["key"], "path": path, "ext": "png"}}
+
+
+def run_news_refresh_job(payload):
+    from .news_service import FinancialNewsService
+    service = FinancialNewsService()
+    service.cache_duration = 0  # Force a fresh fetch; the result refreshes the shared cache file
+    news = service.fetch_all_news()
+    return {"articles": len(news)}
+
+
+def run_circulars_job(payload):
+    from .circulars import ingest_circulars
+    return ingest_circulars(fetch_pages=payload.get("fetch_pages", True))
+
+
+JOB_HANDLERS = {
+    "tts": run_tts_job,
+    "flowchart": run_flowchart_job,
+    "news_refresh": run_news_refresh_job,
+    "circulars_ingest": run_circulars_job,
+}
+
+
+def _execute(kind, payload):
+    return JOB_HANDLERS[kind](payload)
+
+
+class JobQueue:
+    def __init__(self, db_path):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._connect()
+        self.wakeup = threading.Event()
+        # SQLite connections must not be shared across fork (preloaded multi-worker mode)
+        os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")  # several API processes may write at once
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def requeue_abandoned(self):
+        """Jobs left running by a crashed/restarted dispatcher go back in the queue"""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+
+    def enqueue(self, kind, payload, priority=5, max_attempts=3):
+        if kind not in JOB_HANDLERS:
+            raise UnknownJobKind(kind)
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, priority, max_attempts, run_after, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), priority, max_attempts, now, now, now)
+            )
+        metrics.counter("jobs_enqueued_total", kind=kind).inc()
+        self.wakeup.set()
+        return job_id
+
+    def claim(self):
+        """Atomically take the highest-priority ready job, or None"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' AND run_after <= ? "
+                    "ORDER BY priority DESC, created_at LIMIT 1", (now,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (now, row["id"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return dict(row) if row is not None else None
+
+    def complete(self, job_id, result):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), job_id)
+            )
+
+    def fail(self, job, error):
+        """Retry with exponential backoff until max_attempts, then mark failed"""
+        now = time.time()
+        attempts = job["attempts"] + 1  # claim() incremented it in the database
+        if attempts < job["max_attempts"]:
+            status, run_after = "queued", now + 2 ** attempts
+        else:
+            status, run_after = "failed", now
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, run_after = ?, updated_at = ? WHERE id = ?",
+                (status, error, run_after, now, job["id"])
+            )
+        return status
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+class WorkerPool:
+    """Dispatcher thread feeding a process pool, so CPU-heavy jobs stay off the event loop"""
+
+    def __init__(self, queue, workers=2, on_result=None):
+        self.queue = queue
+        self.workers = workers
+        self.on_result = on_result  # parent-side hook, e.g. registering artifacts
+        self._slots = threading.Semaphore(workers)
+        self._stop = threading.Event()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._thread = None
+
+    def _new_executor(self):
+        # Forked children would inherit open LMDB handles from the shared caches
+        from .shared_cache import shared_cache_enabled
+        context = multiprocessing.get_context("spawn") if shared_cache_enabled() else None
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    def _replace_broken(self, executor):
+        """A worker died (e.g. OOM-killed): the whole pool is unusable, start a new one"""
+        with self._executor_lock:
+            if self._executor is not executor or self._stop.is_set():
+                return  # already replaced by another callback
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+        metrics.counter("jobs_pool_restarts_total").inc()
+        print("Job worker pool broken, restarted")
+
+    def start(self):
+        self.queue.requeue_abandoned()
+        self._executor = self._new_executor()
+        self._thread = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.queue.wakeup.set()
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch(self):
+        while not self._stop.is_set():
+            self._slots.acquire()
+            job = None
+            executor = self._executor
+            try:
+                job = self.queue.claim()
+                if job is None:
+                    self._slots.release()
+                    # Sleep until something is enqueued (or a retry becomes due)
+                    self.queue.wakeup.wait(timeout=1.0)
+                    self.queue.wakeup.clear()
+                    continue
+
+                future = executor.submit(_execute, job["kind"], json.loads(job["payload"]))
+                future.add_done_callback(lambda f, job=job, executor=executor: self._finish(job, f, executor))
+            except Exception as e:
+                # Never let one bad claim/submit kill the dispatcher: give the slot
+                # back, retry the job later, and keep going
+                self._slots.release()
+                metrics.counter("jobs_dispatch_errors_total").inc()
+                print(f"Job dispatch error: {e}")
+                if job is not None:
+                    try:
+                        self.queue.fail(job, f"dispatch: {e}")
+                    except Exception as fail_error:
+                        print(f"Job bookkeeping error: {fail_error}")
+                if isinstance(e, BrokenProcessPool):
+                    self._replace_broken(executor)
+                self._stop.wait(1.0)  # a persistent error (e.g. database locked) shouldn't spin
+
+    def _finish(self, job, future, executor=None):
+        try:
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                self._replace_broken(executor)
+            if error is None:
+                result = future.result()
+                if self.on_result is not None:
+                    result = self.on_result(job, result) or result
+                self.queue.complete(job["id"], result)
+                metrics.counter("jobs_completed_total", kind=job["kind"]).inc()
+            else:
+                status = self.queue.fail(job, str(error))
+                metrics.counter("jobs_failed_total", kind=job["kind"], final=str(status == "failed")).inc()
+                print(f"Job {job['id']} ({job['kind']}) error: {error}")
+        except Exception as e:
+            print(f"Job bookkeeping error: {e}")
+        finally:
+            self._slots.release()
+
+
+# Global instances
+job_queue = None
+worker_pool = None
+_role_locks = []  # flock'd descriptors, held for the life of the process
+
+def get_job_queue():
+    """Get or create the job queue"""
+    global job_queue
+    if job_queue is None:
+        job_queue = JobQueue(os.environ.get("JOB_DB", "out/jobs.sqlite3"))
+    return job_queue
+
+def claim_process_role(name):
+    """True in exactly one process per host: the first to lock the role file keeps it until exit"""
+    try:
+        import fcntl
+    except ImportError:
+        return True  # No flock (Windows) - single-process deployments only
+    path = Path(os.environ.get("JOB_DB", "out/jobs.sqlite3")).parent / f".{name}.lock"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _role_locks.append(fd)
+    return True
+
+def start_worker_pool(on_result=None):
+    """Start the process-pool workers in one API process per host; None elsewhere"""
+    global worker_pool
+    if worker_pool is None:
+        if not claim_process_role("job-dispatcher"):
+            return None
+        worker_pool = WorkerPool(
+            get_job_queue(),
+            workers=int(os.environ.get("JOB_WORKERS", str(max(1, (os.cpu_count() or 2) // 2)))),
+            on_result=on_result
+        )
+        worker_pool.start()
+    return worker_pool
@@ -0,0 +1,157 @@
+"""
+LLM Gateway
+Pooled Groq client with per-call deadlines, budgeted retries and hedged requests
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import groq
+import httpx
+from groq import Groq
+
+from .metrics import metrics
+
+# Errors worth retrying - everything else (bad request, auth) fails fast
+RETRYABLE_ERRORS = (
+    groq.APIConnectionError,  # includes APITimeoutError
+    groq.RateLimitError,
+    groq.InternalServerError,
+)
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM could not answer within the deadline/retry budget"""
+
+
+class RetryBudget:
+    """Token bucket capping retries to a fraction of overall traffic"""
+
+    def __init__(self, ratio=0.2, min_tokens=10, max_tokens=100):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = float(min_tokens)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class LLMGateway:
+    def __init__(self, api_key="", base_url=None, timeout=20.0, max_retries=2,
+                 hedge=False, hedge_min_samples=20, pool_size=20):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.budget = RetryBudget()
+
+        # One pooled HTTP client shared by every call (keep-alive to Groq)
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(timeout, connect=5.0)
+        )
+        # Retries are handled here, under the shared budget
+        self.client = Groq(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.http_client,
+            max_retries=0
+        )
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="llm-hedge")
+
+    def chat(self, model, messages, deadline=None, **params):
+        """Chat completion that respects an overall deadline in seconds"""
+        deadline_at = time.monotonic() + (deadline or self.timeout)
+        self.budget.deposit()
+        attempt = 0
+
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                metrics.counter("llm_errors_total", model=model, error="deadline").inc()
+                raise LLMUnavailableError(f"{model}: deadline exceeded")
+
+            try:
+                return self._call_hedged(model, messages, remaining, params)
+            except RETRYABLE_ERRORS as e:
+                metrics.counter("llm_errors_total", model=model, error=type(e).__name__).inc()
+                if attempt >= self.max_retries or not self.budget.withdraw():
+                    raise LLMUnavailableError(f"{model}: {e}") from e
+
+                # Full jitter backoff, never sleeping past the deadline
+                backoff = random.uniform(0, 0.25 * (2 ** attempt))
+                time.sleep(min(backoff, max(0.0, deadline_at - time.monotonic())))
+                attempt += 1
+                metrics.counter("llm_retries_total", model=model).inc()
+
+    def _call(self, model, messages, timeout, params):
+        start = time.perf_counter()
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            timeout=timeout,
+            **params
+        )
+        metrics.histogram("llm_request_seconds", model=model).observe(time.perf_counter() - start)
+        return response
+
+    def _call_hedged(self, model, messages, timeout, params):
+        latency = metrics.histogram("llm_request_seconds", model=model)
+        if not self.hedge or latency.count < self.hedge_min_samples:
+            return self._call(model, messages, timeout, params)
+
+        hedge_delay = latency.quantile(0.95)
+        primary = self._executor.submit(self._call, model, messages, timeout, params)
+        done, _ = wait([primary], timeout=hedge_delay)
+        if done or not self.budget.withdraw():
+            return primary.result()
+
+        # Primary is slower than p95 - race a second request against it
+        metrics.counter("llm_hedges_total", model=model).inc()
+        hedged = self._executor.submit(self._call, model, messages, max(0.1, timeout - hedge_delay), params)
+        pending = {primary, hedged}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def latency_stats(self):
+        """Per-model latency snapshot"""
+        return {
+            dict(labels)["model"]: metric.snapshot()
+            for (kind, name, labels), metric in metrics.items()
+            if kind == "histogram" and name == "llm_request_seconds"
+        }
+
+
+# Global instance
+llm_gateway = None
+
+def get_llm_gateway():
+    """Get or create the LLM gateway"""
+    global llm_gateway
+    if llm_gateway is None:
+        llm_gateway = LLMGateway(
+            api_key=os.environ.get("GROQ_API_KEY", ""),
+            # Point at a local mock server for testing, e.g. http://127.0.0.1:9000
+            base_url=os.environ.get("GROQ_BASE_URL") or None,
+            timeout=float(os.environ.get("LLM_TIMEOUT", "20")),
+            max_retries=int(os.environ.get("LLM_MAX_RETRIES", "2")),
+            hedge=os.environ.get("LLM_HEDGE", "0") == "1"
+        )
+    return llm_gateway
@@ -1,15 +1,37 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from pathlib import Path
 from dotenv import load_dotenv
-from gtts import gTTS
-from groq import Groq
-import requests
+import asyncio
+import json
 import os
-from datetime import datetime
+import time
+
+from .cache import normalize_question
+from .shared_cache import make_cache, shared_cache_enabled
+from .coalesce import SingleFlight
+from .llm_gateway import get_llm_gateway, LLMUnavailableError
+from .admission import get_admission_controller, client_id_from, AdmissionRejected
+from .fallbacks import get_fallback_response
+from .metrics import metrics, stage_timer, cache_collector
+from .profiler import profiler_service, ProfilerBusy
+from .tts import get_tts_engine, tts_synthesize, AUDIO_EXTENSIONS, AUDIO_MEDIA_TYPES
+from .safety import safety_filter
+from .static_audio import get_static_bundle
+from .artifacts import get_artifact_store, artifact_key
+from .jobs import get_job_queue, start_worker_pool, UnknownJobKind, JOB_HANDLERS
+from .conversation import ConversationStore
+from .prompting import build_messages, answer_token_limit, prompt_tokens
+from .calculator import run_calculation, answer_numeric_question, CalcError, CALCULATIONS
+from .circulars import get_circular_index, grounding_context
+from .news_stream import get_news_broadcaster
+from .payloads import PreparedPayload
+from .model_registry import get_model_registry, UnknownModel, FINLIT_PUBLIC_MODELS
+from .analytics import get_analytics_sink, annotate, top_questions, latency_distribution
+from .prewarm import curated_questions, mined_questions, expand, PREWARM_ON_STARTUP, PREWARM_CONCURRENCY, PREWARM_LANGUAGES
 
 load_dotenv()
 
@@ -24,12 +46,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-route latency histogram and in-flight gauge"""
+    in_flight = metrics.gauge("http_requests_in_flight")
+    in_flight.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        in_flight.dec()
+        # Route template (not raw path) keeps label cardinality bounded
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        metrics.histogram(
+            "http_request_duration_seconds",
+            route=route_path, method=request.method, status=str(status)
+        ).observe(time.perf_counter() - start)
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Lets an armed request-scoped profiling session sample this request"""
+    with profiler_service.request_scope(request.url.path):
+        return await call_next(request)
+
 # API Keys - Set these as environment variables (e.g., in Vercel dashboard or .env file)
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")
-NEWS_API_KEY = os.environ.get("NEWS_API_KEY", "")
 
-# Initialize Groq client
-groq_client = Groq(api_key=GROQ_API_KEY)
+# Admin endpoints (profiling) are disabled unless this is set
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# Pooled Groq client with deadlines, retries and optional hedging
+llm_gateway = get_llm_gateway()
 
 # Pydantic models
 class UserProfile(BaseModel):
@@ -41,168 +92,886 @@ class QuestionRequest(BaseModel):
     question: str
     language: str = "en"
     user_profile: Optional[UserProfile] = None
+    session_id: Optional[str] = None
+
+class JobRequest(BaseModel):
+    kind: str
+    payload: Dict = {}
+    priority: int = 5
+
+class BatchQuestion(QuestionRequest):
+    id: Optional[str] = None
+
+class BatchAskRequest(BaseModel):
+    questions: List[BatchQuestion]
+    include_audio: bool = False
+
+class CalcRequest(BaseModel):
+    kind: str  # emi | sip | sip_required | retirement
+    params: Dict[str, object]  # each value a number or a list of numbers
+    grid: bool = True  # cartesian product of list values (False = element-wise)
+    schedule: bool = False  # full amortization table (emi only)
+
+class LocalQuestionRequest(QuestionRequest):
+    model: Optional[str] = None  # registry name; omitted = canary/language/default routing
+
+class ModelSpecRequest(BaseModel):
+    name: str
+    checkpoint: str  # hub id or local directory
+    quantize: Optional[str] = None  # "int8"
+    languages: List[str] = []
+
+class PrewarmRequest(BaseModel):
+    questions: List[str] = []  # empty = curated list (+ mined from analytics if mine_hours is set)
+    languages: List[str] = list(PREWARM_LANGUAGES)
+    with_profiles: bool = False  # also warm the common profile bands
+    mine_hours: Optional[float] = None
+    with_audio: bool = True
+    concurrency: int = PREWARM_CONCURRENCY
+
+class SafetyScoreRequest(BaseModel):
+    questions: List[str]
+
+# Bulk /ask/batch limits
+ASK_BATCH_MAX = int(os.environ.get("ASK_BATCH_MAX", "500"))
+SAFETY_SCORE_MAX = int(os.environ.get("SAFETY_SCORE_MAX", "20000"))
+ASK_BATCH_CONCURRENCY = int(os.environ.get("ASK_BATCH_CONCURRENCY", "8"))
+# How old a cached answer may be and still be reused by batch requests
+ANSWER_CACHE_TTL = float(os.environ.get("ANSWER_CACHE_TTL", "3600"))
+
+# Prompt size histogram buckets (estimated tokens)
+TOKEN_BUCKETS = (50, 100, 200, 300, 400, 600, 800, 1200)
+
+# Concurrent identical questions share one Groq call + TTS run
+ask_inflight = SingleFlight()
+
+# Rate limiting / in-flight cap for /ask
+admission = get_admission_controller()
+
+# Pre-rendered audio for static (fallback) responses, loaded once at startup
+static_bundle = get_static_bundle()
+
+# Generated audio/charts: size-bounded, TTL-collected, content-addressed
+artifact_store = get_artifact_store()
+metrics.register_collector(lambda: [
+    ("artifact_store_bytes", {}, artifact_store.total_bytes),
+    ("artifact_store_entries", {}, artifact_store.stats()["entries"]),
+])
+
+# Latest answer audio per extension, for /audio/speech.<ext>
+latest_audio = {}
+
+# Durable queue for TTS / flowchart / news refresh work, run in a process pool
+job_queue = get_job_queue()
+# 1 = /ask returns text immediately and renders audio as a background job
+ASK_ASYNC_AUDIO = os.environ.get("ASK_ASYNC_AUDIO", "0") == "1"
+metrics.register_collector(lambda: [
+    ("jobs", {"status": status}, count) for status, count in job_queue.counts().items()
+])
+
+# Last answer per question key - served to /ask and batches (within ANSWER_CACHE_TTL),
+# pre-filled by prewarm_caches(), and used at any age when shedding load.
+# Shared by all workers when SHARED_CACHE_DIR is set
+answer_cache = make_cache("answers", max_entries=2000)
+
+metrics.register_collector(cache_collector("answer", answer_cache.stats))
+
+# Multi-turn memory for /ask (opt-in via session_id): recent turns + rolling summary
+conversations = ConversationStore(
+    max_sessions=int(os.environ.get("SESSION_MAX", "10000")),
+    idle_ttl=float(os.environ.get("SESSION_IDLE_TTL", "3600")),
+    llm=llm_gateway
+)
+metrics.register_collector(cache_collector("sessions", conversations.sessions.stats))
+
+# RBI/SEBI circulars index, refreshed by a background ingestion job;
+# CIRCULARS_GROUNDING=0 keeps /ask prompts free of retrieved excerpts
+CIRCULARS_GROUNDING = os.environ.get("CIRCULARS_GROUNDING", "1") == "1"
+CIRCULARS_REFRESH_MINUTES = float(os.environ.get("CIRCULARS_REFRESH_MINUTES", "60"))
+circular_index = get_circular_index() if CIRCULARS_GROUNDING else None
+
+# Single news snapshot, refreshed in the background and pushed to /news/stream clients
+news_broadcaster = get_news_broadcaster()
+# /news body is serialized + compressed once per snapshot change, not per request
+news_payload = PreparedPayload(cache_control="public, max-age=60")
+news_broadcaster.add_listener(lambda snapshot, version: news_payload.update(snapshot))
+NEWS_FIRST_LOAD_TIMEOUT = 15.0
+
+# One Parquet row per /ask, written by a background thread
+analytics_sink = get_analytics_sink()
+
+metrics.register_collector(lambda: [
+    ("ask_in_flight", {}, admission.in_flight),
+    ("ask_queue_waiting", {}, admission.waiting),
+    ("ask_rejected_total", {}, admission.rejected),
+    ("ask_coalesced_in_flight", {}, ask_inflight.in_flight()),
+    ("ask_coalesced_followers_total", {}, ask_inflight.followers),
+    ("analytics_buffered_rows", {}, analytics_sink.stats()["buffered"]),
+    ("analytics_dropped_rows_total", {}, analytics_sink.dropped),
+])
+
+def compute_metrics(profile: UserProfile) -> Dict:
+    savings = profile.income - profile.expenses - profile.emi
+    savings_rate = round((savings / profile.income * 100), 1) if profile.income > 0 else 0
+    emi_share = round((profile.emi / profile.income * 100), 1) if profile.income > 0 else 0
+    expense_ratio = round((profile.expenses / profile.income * 100), 1) if profile.income > 0 else 0
+    
+    return {
+        "savings": int(savings),
+        "savings_rate": savings_rate,
+        "emi_share": emi_share,
+        "expense_ratio": expense_ratio
+    }
+
+def profile_bucket(profile: Optional[UserProfile]):
+    """Coarse profile band so near-identical profiles can share an answer"""
+    if not profile:
+        return None
+    # Income to the nearest ₹5,000, expense/EMI share to the nearest 5%
+    income = max(profile.income, 1)
+    return (
+        int(round(profile.income / 5000)),
+        int(round(profile.expenses / income * 20)),
+        int(round(profile.emi / income * 20))
+    )
+
+def synthesize_audio(text: str, language: str) -> Optional[str]:
+    """Generate audio with correct language; returns the artifact filename"""
+    engine = get_tts_engine()
+    key = artifact_key("tts", engine.backend.name, engine.output_format, engine.bitrate, language, text)
+    
+    # Same text + language already rendered - no synthesis at all
+    existing = artifact_store.path(key, engine.extension)
+    if existing is None:
+        scratch = artifact_store.scratch_path(f".{engine.extension}")
+        if tts_synthesize(text, language, output_path=scratch) is None:
+            os.remove(scratch)
+            return None
+        existing = artifact_store.put_file(key, scratch, engine.extension)
+    
+    latest_audio[engine.extension] = existing.name
+    return existing.name
 
-# Language mapping for gTTS
-LANG_MAP = {
-    "en": "en",
-    "hi": "hi",
-    "kn": "kn"
-}
+async def generate_answer(question: str, language: str, profile: Optional[UserProfile], with_audio: bool = True,
+                          history: str = "", context: str = ""):
+    """Groq answer + audio -> (text, audio_file, complete); blocking calls run in worker threads
 
-# Language names for prompts
-LANG_NAMES = {
-    "en": "English",
-    "hi": "Hindi",
-    "kn": "Kannada"
-}
+    An answer cut off at max_tokens is retried once with twice the allowance;
+    if it is still cut off it is served but complete=False keeps it out of the
+    answer cache.
+    """
+    with stage_timer("ask_prompt"):
+        messages = build_messages(question, language, profile, history, context)
+        max_tokens = answer_token_limit(question, language, has_profile=profile is not None)
+    metrics.histogram("llm_prompt_tokens_estimated", buckets=TOKEN_BUCKETS).observe(prompt_tokens(messages))
+    
+    for attempt in range(2):
+        with stage_timer("ask_llm"):
+            response = await asyncio.to_thread(
+                llm_gateway.chat,
+                model="llama-3.3-70b-versatile",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=max_tokens
+            )
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            metrics.counter("llm_tokens_total", kind="prompt").inc(usage.prompt_tokens)
+            metrics.counter("llm_tokens_total", kind="completion").inc(usage.completion_tokens)
+            annotate(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+        complete = getattr(response.choices[0], "finish_reason", None) != "length"
+        if complete:
+            break
+        metrics.counter("llm_truncated_total", retried=str(attempt == 0)).inc()
+        max_tokens *= 2
+    response_text = response.choices[0].message.content.strip()
+    
+    if not with_audio:
+        return response_text, None, complete
+    audio_file = await asyncio.to_thread(synthesize_audio, response_text, language)
+    return response_text, audio_file, complete
+
+def find_grounding(question: str):
+    """Circular excerpts for the prompt + citations; retrieval problems never fail /ask"""
+    if circular_index is None:
+        return "", []
+    try:
+        return grounding_context(circular_index, question)
+    except Exception as e:
+        print(f"Circular retrieval error: {e}")
+        return "", []
+
+def answer_key(question: str, language: str, profile: Optional[UserProfile]):
+    return (normalize_question(question), language, profile_bucket(profile))
+
+def cached_answer(key, max_age: Optional[float] = None):
+    """(text, citations) from the answer cache, or None"""
+    cached = answer_cache.get(key, max_age=max_age)
+    if isinstance(cached, str):
+        return cached, []  # entry written before citations were cached with the text
+    return cached
+
+def cache_answer(key, text: str, citations: List[Dict]):
+    answer_cache.set(key, (text, citations))
+
+def attach_static_audio(result: Dict, text: str, language: str):
+    """Point at pre-rendered audio when this exact static text is in the bundle"""
+    filename = static_bundle.lookup(text, language)
+    if filename:
+        result["audio"] = True
+        result["audio_url"] = f"/audio/static/{filename}"
+
+def crisis_answer(question: str, language: str) -> Optional[Dict]:
+    """Helpline response for self-harm questions, with pre-rendered audio; None otherwise"""
+    text = safety_filter.detect_crisis(question)
+    if text is None:
+        return None
+    metrics.counter("ask_crisis_total").inc()
+    result = {
+        "text": text,
+        "language": language,
+        "audio": False,
+        "safety": "crisis",
+        "sources": [{"topic": "Crisis Support", "confidence": 1.0}]
+    }
+    attach_static_audio(result, text, language)
+    return result
+
+def degraded_answer(request: QuestionRequest) -> Dict:
+    """Cheap answer while overloaded: last cached answer, else static fallback"""
+    annotate(outcome="degraded")
+    key = answer_key(request.question, request.language, request.user_profile)
+    cached = cached_answer(key)
+    text = cached[0] if cached else get_fallback_response(request.question, request.language)
+    
+    result = {
+        "text": text,
+        "language": request.language,
+        "audio": False,
+        "degraded": True,
+        "sources": [{"topic": "Financial Literacy", "confidence": 0.80}]
+    }
+    attach_static_audio(result, text, request.language)
+    if request.user_profile:
+        result["metrics"] = compute_metrics(request.user_profile)
+    return result
 
 @app.post("/ask")
+async def ask_question(request: QuestionRequest, http_request: Request):
+    with analytics_sink.track(request.question, request.language):
+        return await _ask(request, http_request)
+
+async def _ask(request: QuestionRequest, http_request: Request):
+    # Never rate-limited or shed: no generation, and the audio is pre-rendered
+    crisis = crisis_answer(request.question, request.language)
+    if crisis:
+        annotate(outcome="crisis")
+        return crisis
+    
+    calculated = None
+    try:
+        admission.check_rate(client_id_from(http_request))
+        # "EMI for 20 lakh at 9% for 15 years" is arithmetic, not a job for the LLM;
+        # its audio and session summary still go through the same admission
+        with stage_timer("ask_calculator"):
+            calculated = answer_numeric_question(request.question, request.language)
+        async with admission.slot():
+            if calculated:
+                metrics.counter("ask_calculator_answers_total").inc()
+                annotate(outcome="calculator")
+                return await calculator_answer(request, calculated)
+            return await answer_question(request)
+    except AdmissionRejected as e:
+        if admission.shed and e.status_code == 503:
+            metrics.counter("ask_degraded_total", reason="saturated").inc()
+            if calculated:
+                # The numbers are free; only audio and session work are shed
+                return calculator_answer_text(request, calculated, degraded=True)
+            return degraded_answer(request)
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+def calculator_answer_text(request: QuestionRequest, text: str, degraded: bool = False) -> Dict:
+    result = {
+        "text": text,
+        "language": request.language,
+        "audio": False,
+        "sources": [{"topic": "Calculator", "confidence": 1.0}]
+    }
+    if degraded:
+        result["degraded"] = True
+    if request.user_profile:
+        result["metrics"] = compute_metrics(request.user_profile)
+    return result
+
+async def calculator_answer(request: QuestionRequest, text: str) -> Dict:
+    """Exact numbers from the scenario engine; audio as for LLM answers"""
+    result = calculator_answer_text(request, text)
+    if ASK_ASYNC_AUDIO:
+        result["audio_job"] = enqueue_job("tts", {"text": text, "lang": request.language}, priority=8)
+    else:
+        audio_file = await asyncio.to_thread(synthesize_audio, text, request.language)
+        if audio_file:
+            result["audio"] = True
+            result["audio_url"] = f"/audio/artifacts/{audio_file}"
+    
+    if request.session_id:
+        # Keep the numbers in the conversation so follow-ups can refer to them
+        session = conversations.get(request.session_id)
+        if conversations.record(session, request.question, text):
+            asyncio.ensure_future(asyncio.to_thread(conversations.fold_summary, session))
+        result["session_id"] = request.session_id
+    return result
 
+async def answer_question(request: QuestionRequest) -> Dict:
+    with stage_timer("ask_question"):
+        return await _answer_question(request)
 
-async def ask_question(request: QuestionRequest):
+async def _answer_question(request: QuestionRequest) -> Dict:
     try:
         question = request.question
         language = request.language
         profile = request.user_profile
         
         # Calculate financial metrics if profile provided
-        metrics = None
-        profile_context = ""
+        profile_metrics = compute_metrics(profile) if profile else None
         
-        if profile:
-            savings = profile.income - profile.expenses - profile.emi
-            savings_rate = round((savings / profile.income * 100), 1) if profile.income > 0 else 0
-            emi_share = round((profile.emi / profile.income * 100), 1) if profile.income > 0 else 0
-            expense_ratio = round((profile.expenses / profile.income * 100), 1) if profile.income > 0 else 0
-            
-            metrics = {
-                "savings": int(savings),
-                "savings_rate": savings_rate,
-                "emi_share": emi_share,
-                "expense_ratio": expense_ratio
-            }
-            
-            profile_context = f"""
-User's Financial Profile:
-- Monthly Income: ₹{profile.income:,.0f}
-- Monthly Expenses: ₹{profile.expenses:,.0f}
-- Monthly EMI: ₹{profile.emi:,.0f}
-- Monthly Savings: ₹{savings:,.0f}
-- Savings Rate: {savings_rate}%
-"""
+        key = answer_key(question, language, profile)
+        with_audio = not ASK_ASYNC_AUDIO
         
-        # Create prompt
-        prompt = f"""You are a financial literacy assistant for Indian users. Answer in {LANG_NAMES.get(language, 'English')}.
-
-{profile_context}
-
-Question: {question}
-
-Rules:
-1. Answer in {LANG_NAMES.get(language, 'English')} language ONLY
-2. Keep answers simple and practical (under 150 words)
-3. Use Indian financial terms (₹, SIP, mutual funds, FD, PPF, etc.)
-4. If profile is provided, give personalized advice
-5. Use 1-2 emojis maximum
-6. Format: Main advice + 2-3 bullet points if needed
-
-Answer:"""
-
-        # Get response from Groq
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=500
-        )
+        session = conversations.get(request.session_id) if request.session_id else None
+        history = conversations.pack_context(session) if session else ""
+        if history:
+            # Answer depends on this session's history: only coalesce within the
+            # session, and keep it out of the shared answer cache
+            flight_key = key + (with_audio, request.session_id, session.version)
+        else:
+            flight_key = key + (with_audio,)
         
-        response_text = response.choices[0].message.content.strip()
+        cached = None if history else cached_answer(key, max_age=ANSWER_CACHE_TTL)
+        if cached is not None:
+            # Already answered (or pre-warmed); audio for the same text is an artifact store hit
+            annotate(outcome="cache")
+            response_text, citations = cached
+            audio_file = await asyncio.to_thread(synthesize_audio, response_text, language) if with_audio else None
+        else:
+            context, citations = await asyncio.to_thread(find_grounding, question)
+            annotate(outcome="coalesced" if ask_inflight.running(flight_key) else "llm")
+            response_text, audio_file, complete = await ask_inflight.run(
+                flight_key, lambda: generate_answer(question, language, profile, with_audio, history, context)
+            )
+            if complete and not history:
+                cache_answer(key, response_text, citations)
         
-        # Generate audio with correct language
-        lang_code = LANG_MAP.get(language, "en")
-        audio_path = Path("audio/speech.mp3")
-        audio_path.parent.mkdir(exist_ok=True)
-        
-        try:
-            tts = gTTS(text=response_text, lang=lang_code, slow=False)
-            tts.save(str(audio_path))
-            audio_generated = True
-        except Exception as audio_error:
-            print(f"Audio generation failed: {audio_error}")
-            audio_generated = False
+        if session and conversations.record(session, question, response_text):
+            # Summarize the evicted turn in the background; the next turn uses
+            # whatever summary is ready by then
+            asyncio.ensure_future(asyncio.to_thread(conversations.fold_summary, session))
         
         # Prepare response
         result = {
             "text": response_text,
             "language": language,
-            "audio": audio_generated,
-            "sources": [
+            "audio": audio_file is not None,
+            "sources": citations + [
                 {"topic": "Financial Literacy", "confidence": 0.95},
                 {"topic": "Personal Finance", "confidence": 0.90}
             ]
         }
         
-        if metrics:
-            result["metrics"] = metrics
+        if audio_file:
+            result["audio_url"] = f"/audio/artifacts/{audio_file}"
+        elif ASK_ASYNC_AUDIO:
+            # Client polls /jobs/<id> for the audio_url
+            result["audio_job"] = enqueue_job("tts", {"text": response_text, "lang": language}, priority=8)
+        
+        if profile_metrics:
+            result["metrics"] = profile_metrics
+        
+        if session:
+            result["session_id"] = request.session_id
         
         return result
         
+    except LLMUnavailableError as e:
+        print(f"LLM unavailable in ask_question: {str(e)}")
+        if admission.shed:
+            metrics.counter("ask_degraded_total", reason="llm_unavailable").inc()
+            return degraded_answer(request)
+        raise HTTPException(status_code=503, detail="AI service is temporarily unavailable, please retry")
     except Exception as e:
         print(f"Error in ask_question: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/audio/speech.mp3")
-async def get_audio():
-    audio_path = Path("audio/speech.mp3")
-    if not audio_path.exists():
+def register_job_artifact(job: Dict, result: Dict) -> Dict:
+    """Runs in the API process: move a worker's scratch file into the artifact store"""
+    artifact = result.get("artifact")
+    if not artifact:
+        return result
+    path = artifact_store.put_file(artifact["key"], artifact["path"], artifact["ext"])
+    if artifact["ext"] == "png":
+        return {"url": f"/artifacts/{path.name}"}
+    return {"audio_url": f"/audio/artifacts/{path.name}"}
+
+def enqueue_job(kind: str, payload: Dict, priority: int = 5) -> str:
+    """Fill in artifact key/scratch path for file-producing jobs, then enqueue"""
+    payload = dict(payload)
+    if kind == "tts":
+        engine = get_tts_engine()
+        lang = payload.get("lang", "en")
+        payload["key"] = artifact_key("tts", engine.backend.name, engine.output_format, engine.bitrate, lang, payload["text"])
+        payload["scratch"] = artifact_store.scratch_path(f".{engine.extension}")
+    elif kind == "flowchart":
+        payload["key"] = artifact_key(
+            "flowchart", *(payload[k] for k in ("income", "expenses", "emi", "savings", "emi_share", "savings_rate"))
+        )
+        scratch = artifact_store.scratch_path()
+        os.remove(scratch)  # graphviz adds the .png itself
+        payload["scratch"] = scratch
+    return job_queue.enqueue(kind, payload, priority=priority)
+
+@app.on_event("startup")
+async def start_jobs():
+    # Background threads start here, after any pre-fork preload (see gunicorn.conf.py)
+    artifact_store.start_gc()
+    # With several workers, only one process per host runs the job dispatcher + schedules
+    pool = start_worker_pool(on_result=register_job_artifact)
+    if pool is not None and circular_index is not None and CIRCULARS_REFRESH_MINUTES > 0:
+        asyncio.ensure_future(schedule_circular_ingest())
+    news_broadcaster.start()
+    analytics_sink.start()
+    # With a shared cache one warm-up (by the job-role holder) serves every worker
+    if PREWARM_ON_STARTUP and (pool is not None or not shared_cache_enabled()):
+        asyncio.ensure_future(prewarm_caches(prewarm_targets(PrewarmRequest())))
+
+prewarm_status = {"running": False}
+
+async def prewarm_caches(targets, concurrency: int = PREWARM_CONCURRENCY, with_audio: bool = True) -> Dict:
+    """Generate answers (and audio) for [(question, lang, profile)] into the answer/audio caches"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    counts = {"generated": 0, "cached": 0, "skipped": 0, "truncated": 0, "failed": 0}
+    prewarm_status.update(running=True, total=len(targets), counts=counts, started=time.time())
+    
+    async def warm(question, language, profile_fields):
+        profile = UserProfile(**profile_fields) if profile_fields else None
+        if answer_numeric_question(question, language):
+            counts["skipped"] += 1  # never reaches the LLM anyway
+            return
+        key = answer_key(question, language, profile)
+        if cached_answer(key, max_age=ANSWER_CACHE_TTL) is not None:
+            counts["cached"] += 1
+            return
+        async with semaphore:
+            try:
+                context, citations = await asyncio.to_thread(find_grounding, question)
+                # Same flight key as /ask, so a live request for this key joins the warm-up call
+                text, _, complete = await ask_inflight.run(
+                    key + (with_audio,), lambda: generate_answer(question, language, profile, with_audio, "", context)
+                )
+                if not complete:
+                    counts["truncated"] += 1  # not cached; /ask will try again
+                    return
+                cache_answer(key, text, citations)
+                counts["generated"] += 1
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"Prewarm error for {question!r} ({language}): {e}")
+    
+    try:
+        with stage_timer("prewarm"):
+            await asyncio.gather(*(warm(*target) for target in targets))
+    finally:
+        prewarm_status.update(running=False, finished=time.time())
+    metrics.counter("prewarm_answers_total").inc(counts["generated"])
+    return counts
+
+def prewarm_targets(request: PrewarmRequest):
+    if request.questions:
+        questions = [(q, lang) for q in request.questions for lang in request.languages]
+    else:
+        questions = curated_questions(request.languages)
+        if request.mine_hours is not None:
+            questions += mined_questions(hours=request.mine_hours, languages=request.languages)
+    return expand(questions, request.with_profiles)
+
+@app.on_event("shutdown")
+async def flush_analytics():
+    # Close the open Parquet file so its rows become readable
+    await asyncio.to_thread(analytics_sink.flush, True)
+
+async def schedule_circular_ingest():
+    """Incremental circular ingestion; unchanged documents cost one hash each"""
+    while True:
+        try:
+            enqueue_job("circulars_ingest", {}, priority=2)
+        except Exception as e:
+            print(f"Circular ingest scheduling error: {e}")
+        await asyncio.sleep(CIRCULARS_REFRESH_MINUTES * 60)
+
+# Job kinds any client may enqueue; the rest spend upstream quota or a full crawl
+CLIENT_JOB_KINDS = {"tts", "flowchart"}
+
+@app.post("/jobs")
+async def create_job(request: JobRequest, http_request: Request, x_admin_token: Optional[str] = Header(None)):
+    # Unknown kinds are a client error whether or not an admin token is configured
+    if request.kind not in JOB_HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {request.kind}")
+    if request.kind in CLIENT_JOB_KINDS:
+        # Each client job is a synthesis/render: same per-client budget as /ask
+        try:
+            admission.check_rate(client_id_from(http_request))
+        except AdmissionRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+    else:
+        require_admin(x_admin_token)
+    try:
+        job_id = enqueue_job(request.kind, request.payload, request.priority)
+    except UnknownJobKind:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {request.kind}")
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Missing payload field: {e}")
+    return {"id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "result": job["result"],
+        "error": job["error"]
+    }
+
+@app.get("/artifacts/{filename}")
+async def get_artifact(filename: str):
+    key, _, ext = filename.rpartition(".")
+    path = artifact_store.path(key, ext) if ext == "png" else None
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(path, media_type="image/png")
+
+@app.post("/ask/batch")
+async def ask_batch(request: BatchAskRequest, http_request: Request):
+    """Bulk questions; results stream back as NDJSON lines in completion order"""
+    if len(request.questions) > ASK_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {ASK_BATCH_MAX} questions per batch")
+    try:
+        admission.check_rate(client_id_from(http_request))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+    
+    return StreamingResponse(stream_batch(request), media_type="application/x-ndjson")
+
+def batch_line(index: int, item: BatchQuestion, text: Optional[str], source: str,
+               audio_file: Optional[str] = None, error: Optional[str] = None,
+               citations: Optional[List[Dict]] = None, audio_url: Optional[str] = None) -> str:
+    result = {
+        "index": index,
+        "id": item.id,
+        "status": "error" if error else "ok",
+        "language": item.language,
+        "source": source
+    }
+    if error:
+        result["error"] = error
+    else:
+        result["text"] = text
+        if audio_file:
+            result["audio_url"] = f"/audio/artifacts/{audio_file}"
+        elif audio_url:
+            result["audio_url"] = audio_url
+        if citations:
+            result["citations"] = citations
+        if item.user_profile:
+            result["metrics"] = compute_metrics(item.user_profile)
+    return json.dumps(result, ensure_ascii=False) + "\n"
+
+async def batch_generate(item: BatchQuestion, key, with_audio: bool, semaphore: asyncio.Semaphore):
+    """One LLM answer for a batch key -> (text, audio_file, source, error, citations)
+
+    Grounded and cached exactly like /ask, so either endpoint's cache entry
+    serves the other with the same sources.
+    """
+    async with semaphore:
+        try:
+            async with admission.slot():
+                context, citations = await asyncio.to_thread(find_grounding, item.question)
+                text, audio_file, complete = await ask_inflight.run(
+                    key + (with_audio,),
+                    lambda: generate_answer(item.question, item.language, item.user_profile, with_audio,
+                                            context=context)
+                )
+            if complete:
+                cache_answer(key, text, citations)
+            return text, audio_file, "llm", None, citations
+        except (AdmissionRejected, LLMUnavailableError) as e:
+            if admission.shed:
+                return get_fallback_response(item.question, item.language), None, "fallback", None, []
+            return None, None, "llm", str(e), []
+        except Exception as e:
+            print(f"Error in ask_batch: {str(e)}")
+            return None, None, "llm", str(e), []
+
+async def stream_batch(request: BatchAskRequest):
+    metrics.counter("ask_batch_questions_total").inc(len(request.questions))
+    
+    # Pass 1, in bulk: the safety pass (one classifier call for the whole batch),
+    # then answer cache hits are answered immediately, the rest are grouped by
+    # key so duplicates share one LLM call
+    crises = safety_filter.detect_crisis_batch(item.question for item in request.questions)
+    groups = {}
+    for index, item in enumerate(request.questions):
+        if crises[index]:
+            metrics.counter("ask_crisis_total").inc()
+            filename = static_bundle.lookup(crises[index], item.language) if request.include_audio else None
+            yield batch_line(index, item, crises[index], "crisis",
+                             audio_url=f"/audio/static/{filename}" if filename else None)
+            continue
+        key = answer_key(item.question, item.language, item.user_profile)
+        cached = cached_answer(key, max_age=ANSWER_CACHE_TTL)
+        if cached is not None and not request.include_audio:
+            yield batch_line(index, item, cached[0], "cache", citations=cached[1])
+            continue
+        groups.setdefault(key, []).append((index, item))
+    
+    # Pass 2: fan out under the concurrency cap, stream each group as it completes
+    semaphore = asyncio.Semaphore(ASK_BATCH_CONCURRENCY)
+    
+    async def run_group(key, members):
+        answer = await batch_generate(members[0][1], key, request.include_audio, semaphore)
+        return members, answer
+    
+    tasks = [asyncio.ensure_future(run_group(key, members)) for key, members in groups.items()]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            members, (text, audio_file, source, error, citations) = await finished
+            for index, item in members:
+                yield batch_line(index, item, text, source, audio_file, error, citations)
+    finally:
+        # Client went away - don't keep burning LLM quota for nobody
+        for task in tasks:
+            task.cancel()
+
+@app.post("/calc")
+async def calculate(request: CalcRequest):
+    """EMI / SIP / retirement maths over one scenario or a grid of thousands"""
+    # Checked before kind becomes a metric label
+    if request.kind not in CALCULATIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown calculation: {request.kind}")
+    try:
+        with stage_timer("calc", kind=request.kind):
+            return await asyncio.to_thread(
+                run_calculation, request.kind, request.params, request.grid, request.schedule
+            )
+    except CalcError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/ask/local")
+async def ask_local(request: LocalQuestionRequest, http_request: Request,
+                    x_admin_token: Optional[str] = Header(None)):
+    """Answer with a local checkpoint from the model registry (no Groq call)"""
+    # Picking an arbitrary checkpoint can force loads and evictions for everyone
+    if request.model and request.model not in FINLIT_PUBLIC_MODELS:
+        require_admin(x_admin_token)
+    crisis = crisis_answer(request.question, request.language)
+    if crisis:
+        return crisis
+    registry = get_model_registry()
+    try:
+        name = registry.resolve(request.model, request.language, request.session_id or client_id_from(http_request))
+    except UnknownModel:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {request.model}")
+    
+    try:
+        admission.check_rate(client_id_from(http_request))
+        async with admission.slot():
+            text = await asyncio.to_thread(registry.generate, name, request.question, request.language)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+    
+    return {
+        "text": text,
+        "language": request.language,
+        "audio": False,
+        "model": name,
+        "sources": [{"topic": "Financial Literacy", "confidence": 0.80}]
+    }
+
+@app.get("/audio/speech.{ext}")
+async def get_audio(ext: str):
+    """Most recently generated answer audio (kept for older clients)"""
+    filename = latest_audio.get(ext)
+    if not filename:
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    return await get_audio_artifact(filename)
+
+@app.get("/audio/artifacts/{filename}")
+async def get_audio_artifact(filename: str):
+    key, _, ext = filename.rpartition(".")
+    formats = {extension: audio_format for audio_format, extension in AUDIO_EXTENSIONS.items()}
+    audio_path = artifact_store.path(key, ext) if ext in formats else None
+    if audio_path is None or not audio_path.exists():
+        raise HTTPException(status_code=404, detail="Audio file not found")
+    return FileResponse(
+        audio_path,
+        media_type=AUDIO_MEDIA_TYPES[formats[ext]],
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
+
+@app.get("/audio/static/{filename}")
+async def get_static_audio(filename: str):
+    """Pre-rendered clips are content-addressed, so they can be cached forever"""
+    audio = static_bundle.audio(filename)
+    if audio is None:
         raise HTTPException(status_code=404, detail="Audio file not found")
-    return FileResponse(audio_path, media_type="audio/mpeg")
+    return Response(
+        content=audio,
+        media_type=static_bundle.media_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
 
 @app.get("/news")
-async def get_news(lang: str):
-    try:
-        url = f"https://newsapi.org/v2/top-headlines"
-        params = {
-            "country": "in",
-            "category": "business",
-            "apiKey": NEWS_API_KEY,
-            "pageSize": 10
-        }
-        
-        response = requests.get(url, params=params)
-        data = response.json()
-        
-        if data.get("status") != "ok":
-            raise HTTPException(status_code=500, detail="Failed to fetch news")
-        
-        articles = data.get("articles", [])[:5]
-        breaking_news = []
-        
-        for article in articles:
-            breaking_news.append({
-                "title": article.get("title", ""),
-                "source": article.get("source", {}).get("name", "Unknown"),
-                "url": article.get("url", ""),
-                "published_at": article.get("publishedAt", "")
-            })
-        
-        market_summary = {
-            "sensex": "81,455 ▲ 0.8%",
-            "nifty": "24,857 ▲ 0.6%",
-            "gold": "₹73,450/10g ▼ 0.3%",
-            "crude_oil": "$74.25 ▲ 1.2%",
-            "usd_inr": "₹83.15 ▲ 0.1%"
-        }
-        
-        return {
-            "breaking_news": breaking_news,
-            "market_summary": market_summary,
-            "last_updated": datetime.now().isoformat()
-        }
-        
+async def get_news(lang: str = "en", if_none_match: Optional[str] = Header(None),
+                   accept_encoding: Optional[str] = Header(None)):
+    """Latest snapshot as pre-compressed bytes; 304 when the client already has it"""
+    if not news_payload.ready:
+        try:
+            await asyncio.wait_for(news_broadcaster.ready.wait(), timeout=NEWS_FIRST_LOAD_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="News is loading, please retry", headers={"Retry-After": "5"})
+    return news_payload.respond(if_none_match, accept_encoding)
+
+@app.get("/news/stream")
+async def news_stream(request: Request, last_event_id: Optional[str] = Header(None)):
+    """Server-sent events: a snapshot, then article/market diffs as they happen"""
+    return StreamingResponse(
+        news_broadcaster.stream(last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def require_admin(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.post("/admin/profile")
+async def profile_worker(seconds: float = 10.0, x_admin_token: Optional[str] = Header(None)):
+    """Sample every thread + asyncio task for N seconds; returns collapsed stacks"""
+    require_admin(x_admin_token)
+    try:
+        collapsed = await profiler_service.profile_for(seconds)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(collapsed, headers={"Content-Disposition": "attachment; filename=profile.folded"})
+
+@app.post("/admin/profile/requests")
+async def profile_next_requests(count: int = 10, path: str = "/ask", timeout: float = 60.0,
+                                x_admin_token: Optional[str] = Header(None)):
+    """Sample only while the next `count` requests to `path` (/ask or /news) run"""
+    require_admin(x_admin_token)
+    try:
+        collapsed = await profiler_service.profile_requests(count, [path], timeout)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(collapsed, headers={"Content-Disposition": "attachment; filename=profile.folded"})
+
+@app.get("/admin/models")
+async def list_models(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    return get_model_registry().status()
+
+@app.post("/admin/models")
+async def register_model(spec: ModelSpecRequest, x_admin_token: Optional[str] = Header(None)):
+    """Add or repoint a named checkpoint; loaded on first use"""
+    require_admin(x_admin_token)
+    registry = get_model_registry()
+    registry.register(spec.name, spec.checkpoint, spec.quantize, spec.languages)
+    return registry.status()["models"][spec.name]
+
+@app.post("/admin/models/{name}/reload")
+async def reload_model(name: str, checkpoint: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """Hot-swap: load beside the live copy, then switch new requests over"""
+    require_admin(x_admin_token)
+    registry = get_model_registry()
+    try:
+        generation = await asyncio.to_thread(registry.reload, name, checkpoint)
+    except UnknownModel:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {name}")
     except Exception as e:
-        print(f"Error fetching news: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=400, detail=f"Reload failed, previous copy still serving: {e}")
+    return {"model": name, "generation": generation}
+
+@app.delete("/admin/models/{name}/loaded")
+async def unload_model(name: str, x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    try:
+        return {"model": name, "unloaded": get_model_registry().unload(name)}
+    except UnknownModel:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {name}")
+
+@app.post("/admin/prewarm")
+async def start_prewarm(request: PrewarmRequest, x_admin_token: Optional[str] = Header(None)):
+    """Fill the answer/audio caches in the background; poll GET /admin/prewarm for progress"""
+    require_admin(x_admin_token)
+    if prewarm_status["running"]:
+        raise HTTPException(status_code=409, detail="Prewarm already running")
+    prewarm_status["running"] = True
+    try:
+        targets = await asyncio.to_thread(prewarm_targets, request)
+    except Exception:
+        prewarm_status["running"] = False
+        raise
+    asyncio.ensure_future(prewarm_caches(targets, request.concurrency, request.with_audio))
+    return {"targets": len(targets)}
+
+@app.get("/admin/prewarm")
+async def prewarm_progress(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    return prewarm_status
+
+@app.get("/admin/analytics/top-questions")
+async def analytics_top_questions(n: int = 20, hours: Optional[float] = None, lang: Optional[str] = None,
+                                  x_admin_token: Optional[str] = Header(None)):
+    """Most asked questions (from closed analytics files) with outcome mix and latency"""
+    require_admin(x_admin_token)
+    return await asyncio.to_thread(top_questions, n, hours, lang)
+
+@app.get("/admin/analytics/latency")
+async def analytics_latency(stage: Optional[str] = None, hours: Optional[float] = None,
+                            x_admin_token: Optional[str] = Header(None)):
+    """Latency quantiles for /ask overall or one stage (e.g. ask_llm), split by outcome"""
+    require_admin(x_admin_token)
+    return await asyncio.to_thread(latency_distribution, stage, hours)
+
+@app.post("/admin/safety/score")
+async def score_safety(request: SafetyScoreRequest, x_admin_token: Optional[str] = Header(None)):
+    """Classifier probabilities for a batch of (e.g. logged) questions, scored in one pass"""
+    require_admin(x_admin_token)
+    model = safety_filter.model
+    if model is None:
+        raise HTTPException(status_code=404, detail="No safety model; run: python -m app.safety_model train")
+    if len(request.questions) > SAFETY_SCORE_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {SAFETY_SCORE_MAX} questions per request")
+    with stage_timer("safety_score_batch"):
+        probabilities = await asyncio.to_thread(model.score_batch, request.questions)
+    return {
+        "labels": list(model.labels),
+        "scores": [[round(float(p), 4) for p in row] for row in probabilities]
+    }
 
 @app.get("/")
 async def root():
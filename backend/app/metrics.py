@@ -0,0 +1,191 @@
+"""
+Lightweight Metrics
+Thread-safe counters, gauges and latency histograms with Prometheus text export
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds - covers sub-millisecond cache hits up to slow upstream calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1.0):
+        with self._lock:
+            self.value -= amount
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    return
+            self.counts[-1] += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        with self._lock:
+            if self.count == 0:
+                return None
+            target = q * self.count
+            seen = 0
+            lower = 0.0
+            for i, bound in enumerate(self.buckets):
+                if seen + self.counts[i] >= target:
+                    fraction = (target - seen) / self.counts[i] if self.counts[i] else 0
+                    return lower + (bound - lower) * fraction
+                seen += self.counts[i]
+                lower = bound
+            return self.buckets[-1]
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}  # (kind, name, labels) -> metric
+        self._collectors = []
+
+    def _get(self, kind, factory, name, labels):
+        key = (kind, name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, factory())
+        return metric
+
+    def counter(self, name, **labels):
+        return self._get("counter", Counter, name, labels)
+
+    def histogram(self, name, buckets=DEFAULT_BUCKETS, **labels):
+        """Buckets only apply when the series is first created"""
+        return self._get("histogram", lambda: Histogram(buckets), name, labels)
+
+    def gauge(self, name, **labels):
+        return self._get("gauge", Gauge, name, labels)
+
+    def register_collector(self, collector):
+        """collector() -> iterable of (name, labels, value), read at scrape time"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def items(self):
+        with self._lock:
+            return list(self._metrics.items())
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (kind, name, labels), metric in sorted(self.items(), key=lambda item: item[0]):
+            header(name, kind)
+            if kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), metric.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {metric.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {metric.count}")
+            else:
+                lines.append(f"{name}{_labels(labels)} {metric.value}")
+
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                for name, labels, value in collector():
+                    header(name, "gauge")
+                    lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {value}")
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    escaped = []
+    for key, value in pairs:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def cache_collector(cache_name, stats):
+    """Expose a cache's stats() dict (hits, misses, hit_rate, ...) as gauges"""
+    def collect():
+        for field, value in stats().items():
+            if isinstance(value, (int, float)):
+                yield f"cache_{field}", {"cache": cache_name}, value
+    return collect
+
+
+# Global registry
+metrics = MetricsRegistry()
+
+# Per-request {stage: seconds}, set by whoever wants a breakdown (analytics.track)
+stage_trace = ContextVar("stage_trace", default=None)
+
+
+@contextmanager
+def stage_timer(stage, **labels):
+    """Record how long a block takes in stage_duration_seconds{stage=...}"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.histogram("stage_duration_seconds", stage=stage, **labels).observe(elapsed)
+        trace = stage_trace.get()
+        if trace is not None:
+            trace[stage] = trace.get(stage, 0.0) + elapsed
@@ -0,0 +1,271 @@
+"""
+Model Registry
+Named local checkpoints loaded on demand under one memory budget
+
+Names map to (checkpoint, quantization) specs: the base hub model, the
+fine-tuned models/finlit_model written by training/train_model.py, an int8
+variant of it, or anything added at runtime. Names that point at the same
+checkpoint and quantization share one loaded copy.
+
+Loaded models are evicted least-recently-used once FINLIT_MODEL_MEMORY_MB
+would be exceeded; a model with requests in flight is never evicted. reload()
+builds the replacement next to the live copy and swaps it in one step: new
+requests get the new weights, in-flight ones finish on the old, which is
+freed when the last of them returns. A reload that cannot fit both copies in
+the budget fails before loading anything.
+
+Selection per request: an explicit name (admin, or one of FINLIT_PUBLIC_MODELS),
+else a canary share
+(FINLIT_MODEL_CANARY="name:percent", sticky per key), else the model
+registered for the question's language, else FINLIT_DEFAULT_MODEL.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from .metrics import metrics, stage_timer, cache_collector
+
+FINETUNED_CHECKPOINT = Path(__file__).parent.parent.parent / "models" / "finlit_model"
+FINLIT_MODELS = os.environ.get("FINLIT_MODELS", "")  # JSON: {"name": {"checkpoint", "quantize", "languages"}}
+FINLIT_DEFAULT_MODEL = os.environ.get("FINLIT_DEFAULT_MODEL", "")
+FINLIT_MODEL_CANARY = os.environ.get("FINLIT_MODEL_CANARY", "")
+FINLIT_MODEL_MEMORY_MB = int(os.environ.get("FINLIT_MODEL_MEMORY_MB", "1024"))
+# Names clients may request explicitly; any other explicit name needs the admin token
+FINLIT_PUBLIC_MODELS = {name.strip() for name in os.environ.get("FINLIT_PUBLIC_MODELS", "").split(",") if name.strip()}
+
+
+class UnknownModel(KeyError):
+    pass
+
+
+class ModelBudgetExceeded(RuntimeError):
+    """Raised by reload() when the replacement can't fit beside the live copy"""
+
+
+def default_specs():
+    from .model_server import BASE_CHECKPOINT
+    specs = {"base": {"checkpoint": BASE_CHECKPOINT}}
+    if FINETUNED_CHECKPOINT.exists():
+        specs["finetuned"] = {"checkpoint": str(FINETUNED_CHECKPOINT)}
+        specs["finetuned-int8"] = {"checkpoint": str(FINETUNED_CHECKPOINT), "quantize": "int8"}
+    if FINLIT_MODELS:
+        specs.update(json.loads(FINLIT_MODELS))
+    return specs
+
+
+class _Loaded:
+    def __init__(self, model, generation):
+        self.model = model
+        self.generation = generation
+        self.leases = 0
+
+
+class ModelRegistry:
+    def __init__(self, specs, default=None, budget_mb=FINLIT_MODEL_MEMORY_MB, canary=FINLIT_MODEL_CANARY):
+        self.specs = dict(specs)
+        self.default = default or ("finetuned" if "finetuned" in self.specs else "base")
+        self.budget = budget_mb * 1024 * 1024
+        self.canary = None  # (name, percent)
+        if canary:
+            name, _, percent = canary.partition(":")
+            self.canary = (name, float(percent or 0))
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict()  # (checkpoint, quantize) -> _Loaded, least recently used first
+        self._load_locks = {}  # one loader per checkpoint key at a time
+        self._sizes = {}  # last measured bytes per key, to make room before loading
+        self._generation = 0
+        metrics.register_collector(self._collect)
+
+    @staticmethod
+    def _key(spec):
+        return (str(spec["checkpoint"]), spec.get("quantize"))
+
+    def _spec(self, name):
+        name = name or self.default
+        if name not in self.specs:
+            raise UnknownModel(name)
+        return name, self.specs[name]
+
+    def resolve(self, name=None, lang="en", key=""):
+        """Which model serves this request"""
+        if name:
+            return self._spec(name)[0]
+        if self.canary and self.canary[0] in self.specs:
+            bucket = int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:2], "big") % 10000
+            if bucket < self.canary[1] * 100:
+                return self.canary[0]
+        for candidate, spec in self.specs.items():
+            if lang in spec.get("languages", ()):
+                return candidate
+        return self.default
+
+    def _evict_for(self, needed, keep=()):
+        """Drop idle models not in `keep`, oldest use first, until `needed` more bytes fit.
+
+        Returns whether they fit (call with _lock held).
+        """
+        used = sum(self._sizes.get(key, 0) for key in self._loaded)
+        for key in list(self._loaded):
+            if used + needed <= self.budget:
+                break
+            entry = self._loaded[key]
+            if key in keep or entry.leases:
+                continue
+            del self._loaded[key]
+            used -= self._sizes.get(key, 0)
+            metrics.counter("model_evictions_total").inc()
+        if used + needed > self.budget:
+            print(f"Model registry over budget: {(used + needed) >> 20} MB of {self.budget >> 20} MB")
+            return False
+        return True
+
+    def _load(self, key, generation, keep=(), strict=False, lease=False):
+        """Load `key`, evicting idle models outside `keep`; with strict, refuse to go over budget"""
+        from .model_server import FinLitModel
+        checkpoint, quantize = key
+        with self._lock:
+            # A checkpoint never loaded before is assumed to be as big as the largest
+            # one seen, so room is made before the load rather than after it
+            estimate = self._sizes.get(key) or max(self._sizes.values(), default=0)
+            if not self._evict_for(estimate, keep=keep) and strict:
+                raise ModelBudgetExceeded(f"{Path(checkpoint).name} does not fit in the remaining budget")
+        with stage_timer("model_load", checkpoint=Path(checkpoint).name):
+            model = FinLitModel(checkpoint=checkpoint, quantize=quantize)
+        size = model.memory_bytes + model.encoder_cache.max_bytes
+        with self._lock:
+            self._sizes[key] = size
+            if strict and not self._evict_for(size, keep=keep):
+                raise ModelBudgetExceeded(f"{Path(checkpoint).name} needs {size >> 20} MB, more than remains")
+            entry = _Loaded(model, generation)
+            if lease:
+                entry.leases = 1  # taken before the entry is visible to eviction
+            self._loaded[key] = entry
+            self._loaded.move_to_end(key)
+            self._evict_for(0, keep={key, *keep})
+        metrics.counter("model_loads_total", checkpoint=Path(checkpoint).name, quantize=quantize or "none").inc()
+        return entry
+
+    def _entry(self, name, lease=False):
+        """Loaded entry for `name`; with lease, its lease is taken under the same lock hold"""
+        _, spec = self._spec(name)
+        key = self._key(spec)
+        with self._lock:
+            entry = self._loaded.get(key)
+            if entry is not None:
+                self._loaded.move_to_end(key)
+                if lease:
+                    entry.leases += 1
+                return entry
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                entry = self._loaded.get(key)  # loaded by whoever held the lock before us
+                if entry is not None:
+                    if lease:
+                        entry.leases += 1
+                    return entry
+                self._generation += 1
+                generation = self._generation
+            return self._load(key, generation, lease=lease)
+
+    def get(self, name=None):
+        """The loaded FinLitModel for `name` (loading it if needed)"""
+        return self._entry(name).model
+
+    @contextmanager
+    def lease(self, name=None):
+        """Use a model without it being evicted mid-request"""
+        # Leased inside _entry: releasing the lock in between would let eviction
+        # drop the model we are about to use
+        entry = self._entry(name, lease=True)
+        try:
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.leases -= 1
+
+    def generate(self, name, text, lang="en", **kwargs):
+        name, _ = self._spec(name)
+        metrics.counter("model_requests_total", model=name).inc()
+        with self.lease(name) as model:
+            return model.generate(text, lang, **kwargs)
+
+    def register(self, name, checkpoint, quantize=None, languages=()):
+        """Add or repoint a name; takes effect for the next request that resolves it"""
+        with self._lock:
+            self.specs[name] = {"checkpoint": str(checkpoint), "quantize": quantize, "languages": list(languages)}
+
+    def reload(self, name, checkpoint=None):
+        """Load `name` (optionally from a new checkpoint) beside the live copy, then swap atomically"""
+        name, spec = self._spec(name)
+        new_spec = dict(spec, checkpoint=str(checkpoint)) if checkpoint else dict(spec)
+        old_key, new_key = self._key(spec), self._key(new_spec)
+        with self._lock:
+            load_lock = self._load_locks.setdefault(new_key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                self._generation += 1
+                generation = self._generation
+            # The old copy keeps serving until this returns (and is never evicted to make
+            # room); a failed or over-budget load leaves it in place
+            self._load(new_key, generation, keep={old_key}, strict=True)
+        with self._lock:
+            self.specs[name] = new_spec
+            if old_key != new_key and all(self._key(other) != old_key for other in self.specs.values()):
+                self._loaded.pop(old_key, None)
+        return generation
+
+    def unload(self, name):
+        _, spec = self._spec(name)
+        with self._lock:
+            return self._loaded.pop(self._key(spec), None) is not None
+
+    def status(self):
+        with self._lock:
+            loaded = {key: entry for key, entry in self._loaded.items()}
+            sizes = dict(self._sizes)
+        models = {}
+        for name, spec in self.specs.items():
+            entry = loaded.get(self._key(spec))
+            models[name] = {
+                "checkpoint": spec["checkpoint"],
+                "quantize": spec.get("quantize"),
+                "languages": list(spec.get("languages", ())),
+                "loaded": entry is not None,
+                "generation": entry.generation if entry else None,
+                "in_flight": entry.leases if entry else 0,
+                "memory_mb": round(sizes.get(self._key(spec), 0) / 2**20, 1) if entry else 0.0,
+            }
+        return {
+            "default": self.default,
+            "canary": {"model": self.canary[0], "percent": self.canary[1]} if self.canary else None,
+            "budget_mb": self.budget >> 20,
+            "used_mb": round(sum(sizes.get(key, 0) for key in loaded) / 2**20, 1),
+            "models": models,
+        }
+
+    def _collect(self):
+        with self._lock:
+            loaded = list(self._loaded.items())
+            used = sum(self._sizes.get(key, 0) for key, _ in loaded)
+        yield "model_registry_bytes", {}, used
+        yield "model_registry_loaded", {}, len(loaded)
+        for (checkpoint, quantize), entry in loaded:
+            name = Path(checkpoint).name + (f"-{quantize}" if quantize else "")
+            yield from cache_collector(f"encoder_{name}", entry.model.encoder_cache.stats)()
+
+
+# Global instance
+model_registry = None
+_registry_lock = threading.Lock()
+
+def get_model_registry():
+    global model_registry
+    with _registry_lock:
+        if model_registry is None:
+            model_registry = ModelRegistry(default_specs(), default=FINLIT_DEFAULT_MODEL or None)
+    return model_registry
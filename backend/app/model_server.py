@@ -1,124 +1,231 @@
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, StoppingCriteria, StoppingCriteriaList
+from transformers.modeling_outputs import BaseModelOutput
 import torch
+import os
 from pathlib import Path
 
+from .cache import LRUCache, normalize_question
+from .fallbacks import get_fallback_response
+from .metrics import metrics, stage_timer
+
+# Decoding profiles - trade answer quality for throughput per deployment.
+# Select with FINLIT_DECODING_PROFILE (default: "small_beam").
+DECODING_PROFILES = {
+    "greedy": {
+        "num_beams": 1,
+        "do_sample": False,
+        "max_new_tokens": 128,
+    },
+    "small_beam": {
+        "num_beams": 2,
+        "do_sample": False,
+        "no_repeat_ngram_size": 3,
+        "early_stopping": True,
+        "max_new_tokens": 160,
+    },
+    "sampled": {
+        "num_beams": 1,
+        "do_sample": True,
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "no_repeat_ngram_size": 3,
+        "max_new_tokens": 200,
+    },
+}
+
+DEFAULT_DECODING_PROFILE = os.environ.get("FINLIT_DECODING_PROFILE", "small_beam")
+
+# Encoder cache memory cap (MB) - hidden states are ~1-2 KB per token for flan-t5-small
+ENCODER_CACHE_MB = int(os.environ.get("FINLIT_ENCODER_CACHE_MB", "64"))
+
+# Instruction prefix per language
+PROMPT_PREFIXES = {
+    "en": "Explain in simple terms for beginners:",
+    "hi": "हिंदी में सरल भाषा में उत्तर दें:",
+    "kn": "ಸರಳ ಕನ್ನಡದಲ್ಲಿ ಉತ್ತರಿಸಿ:",
+}
+
+MAX_INPUT_TOKENS = 512
+
+BASE_CHECKPOINT = "google/flan-t5-small"
+
+
+def _encoded_size(entry):
+    """Approximate memory held by a cached (attention_mask, hidden_states) pair"""
+    attention_mask, hidden_states = entry
+    return (attention_mask.element_size() * attention_mask.nelement()
+            + hidden_states.element_size() * hidden_states.nelement())
+
+
+def is_valid_response(response):
+    """Check if a decoded model response is usable"""
+    return bool(response) and len(response) > 20 and '<' not in response and 'extra_id' not in response.lower()
+
+
+class InvalidOutputStopping(StoppingCriteria):
+    """Stop decoding as soon as every beam has emitted a sentinel (<extra_id_N>) token
+
+    Checked on token ids, so eos/pad/unk never count as invalid: a finished
+    answer, or a Hindi/Kannada one with <unk> pieces, is left alone.
+    """
+
+    def __init__(self, tokenizer, prompt_length=0, check_every=8):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.check_every = check_every
+        self.sentinel_ids = {
+            token_id for token, token_id in zip(tokenizer.additional_special_tokens,
+                                                tokenizer.additional_special_tokens_ids)
+            if "extra_id" in token
+        }
+        self.triggered = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        generated = input_ids.shape[-1] - self.prompt_length
+        if generated <= 0 or generated % self.check_every != 0 or not self.sentinel_ids:
+            return False
+
+        # Only stop if every beam already went bad
+        for sequence in input_ids:
+            tokens = sequence[self.prompt_length:].tolist()
+            if self.tokenizer.eos_token_id in tokens:
+                return False  # finished; the final validity check decides
+            if not self.sentinel_ids.intersection(tokens):
+                return False
+
+        self.triggered = True
+        return True
+
+
+def model_bytes(model):
+    """Bytes held by a model's weights and buffers (dynamic-quantized packed weights included)"""
+    def tensor_bytes(value):
+        if isinstance(value, torch.Tensor):
+            return value.element_size() * value.nelement()
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(item) for item in value)
+        return 0
+    return sum(tensor_bytes(value) for value in model.state_dict().values())
+
+
 class FinLitModel:
-    def __init__(self):
-        print("Loading model...")
-        self.model_name = "google/flan-t5-small"
+    def __init__(self, decoding_profile=None, checkpoint=BASE_CHECKPOINT, quantize=None):
+        """checkpoint: hub id or a local directory (e.g. models/finlit_model from train_model.py);
+        quantize="int8" applies dynamic int8 quantization to the Linear layers"""
+        print(f"Loading model {checkpoint}...")
+        self.model_name = str(checkpoint)
+        self.quantize = quantize
         
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
         self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
         self.device = "cpu"
         self.model.to(self.device)
+        self.model.eval()
+        if quantize == "int8":
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif quantize:
+            print(f"Unknown quantization '{quantize}', loading full precision")
+        self.memory_bytes = model_bytes(self.model)
+
+        self.decoding_profile = decoding_profile or DEFAULT_DECODING_PROFILE
+        if self.decoding_profile not in DECODING_PROFILES:
+            print(f"Unknown decoding profile '{self.decoding_profile}', using small_beam")
+            self.decoding_profile = "small_beam"
+
+        # Prefix token ids are tokenized once; only the question is tokenized per call
+        self.prefix_ids = {
+            lang: self.tokenizer(prefix, add_special_tokens=False)["input_ids"]
+            for lang, prefix in PROMPT_PREFIXES.items()
+        }
+        self.encoder_cache = LRUCache(
+            max_entries=4096,
+            max_bytes=ENCODER_CACHE_MB * 1024 * 1024,
+            sizeof=_encoded_size
+        )
         print("Model loaded successfully!")
+
+    def encode_prompt(self, text, lang="en"):
+        """Return (attention_mask, encoder hidden states) for a prompt, cached by normalized text"""
+        lang = lang if lang in PROMPT_PREFIXES else "en"
+        key = (lang, normalize_question(text))
+
+        cached = self.encoder_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # prefix + question + </s>, truncated like the tokenizer would
+        question_ids = self.tokenizer(text, add_special_tokens=False)["input_ids"]
+        ids = (self.prefix_ids[lang] + question_ids)[:MAX_INPUT_TOKENS - 1]
+        ids.append(self.tokenizer.eos_token_id)
+
+        input_ids = torch.tensor([ids], device=self.device)
+        attention_mask = torch.ones_like(input_ids)
+
+        with torch.inference_mode():
+            hidden_states = self.model.get_encoder()(
+                input_ids=input_ids, attention_mask=attention_mask
+            ).last_hidden_state
+
+        entry = (attention_mask, hidden_states)
+        self.encoder_cache.set(key, entry)
+        return entry
+
+    def cache_stats(self):
+        """Hit-rate metrics for the encoder cache"""
+        return self.encoder_cache.stats()
     
-    def generate(self, text, lang="en", max_length=200):
+    def generate(self, text, lang="en", max_length=200, profile=None, max_new_tokens=None):
         """Generate financial advice with strong fallback"""
-        
-        # Build prompt
-        if lang == "hi":
-            prompt = f"हिंदी में सरल भाषा में उत्तर दें: {text}"
-        elif lang == "kn":
-            prompt = f"ಸರಳ ಕನ್ನಡದಲ್ಲಿ ಉತ್ತರಿಸಿ: {text}"
-        else:
-            prompt = f"Explain in simple terms for beginners: {text}"
+        with stage_timer("model_generate", profile=profile or self.decoding_profile):
+            return self._generate(text, lang, max_length, profile, max_new_tokens)
+    
+    def _generate(self, text, lang, max_length, profile, max_new_tokens):
+        settings = dict(DECODING_PROFILES.get(profile or self.decoding_profile, DECODING_PROFILES["small_beam"]))
+        budget = settings.pop("max_new_tokens")
+        if max_new_tokens is not None:
+            budget = max_new_tokens
+        # max_length still caps the total output length for older callers
+        budget = min(budget, max_length)
         
         try:
-            inputs = self.tokenizer(prompt, return_tensors="pt", max_length=512, truncation=True)
-            inputs = inputs.to(self.device)
+            # Repeated questions skip tokenization and the encoder pass
+            attention_mask, hidden_states = self.encode_prompt(text, lang)
+
+            # T5 decoder starts from a single start token
+            stopper = InvalidOutputStopping(self.tokenizer, prompt_length=1)
             
-            outputs = self.model.generate(
-                **inputs,
-                max_length=max_length,
-                num_beams=4,
-                temperature=0.7,
-                do_sample=True,
-                top_p=0.9,
-                no_repeat_ngram_size=3,
-                early_stopping=True
-            )
+            with torch.inference_mode():
+                outputs = self.model.generate(
+                    encoder_outputs=BaseModelOutput(last_hidden_state=hidden_states),
+                    attention_mask=attention_mask,
+                    max_new_tokens=budget,
+                    stopping_criteria=StoppingCriteriaList([stopper]),
+                    **settings
+                )
+
+            if stopper.triggered:
+                return self.get_fallback_response(text, lang)
             
             response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
             
             # Check if response is valid
-            if response and len(response) > 20 and '<' not in response and 'extra_id' not in response.lower():
+            if is_valid_response(response):
                 return response
             else:
                 # Use fallback if model fails
                 return self.get_fallback_response(text, lang)
         
         except Exception as e:
+            metrics.counter("model_errors_total").inc()
             print(f"Model generation error: {e}")
             return self.get_fallback_response(text, lang)
     
     def get_fallback_response(self, text, lang):
         """Comprehensive fallback responses for all common questions"""
-        
-        fallback_responses = {
-            "en": {
-                # Basic Concepts
-                "asset": "An asset is anything valuable you own that can make money or increase in value over time. Common assets include:\n\n• Cash in bank (savings, FD)\n• Real estate (house, land, property)\n• Gold and jewelry\n• Vehicles (car, bike)\n• Investments (mutual funds, stocks, bonds)\n• Business ownership\n\nAssets help build wealth and financial security. They can generate income (like rent from property or dividends from stocks) or appreciate in value. Focus on building appreciating assets (grow in value) rather than depreciating assets (lose value like cars).",
-                
-                "liability": "A liability is money you owe to others - any debt or financial obligation. Types include:\n\n• Home loans/mortgages\n• Car loans\n• Personal loans\n• Education loans\n• Credit card debt\n• EMIs (monthly installments)\n\nLiabilities reduce your net worth and create financial stress. Important rules:\n• Keep total EMI below 40% of monthly income\n• Pay high-interest debt first (credit cards)\n• Avoid lifestyle loans (for vacations, gadgets)\n\nYour Net Worth = Total Assets - Total Liabilities. Focus on increasing assets and reducing liabilities for financial freedom.",
-                
-                "emi": "EMI = Equated Monthly Installment. It's a fixed amount you pay every month to repay a loan.\n\nEMI has two parts:\n• Principal (original loan amount)\n• Interest (cost of borrowing)\n\nExample: ₹10 lakh loan at 10% interest for 5 years = ₹21,247 monthly EMI\n\nImportant rules:\n• Keep total EMI below 40% of income\n• Higher EMI = faster loan closure but less savings\n• Prepay high-interest loans first\n\nIf you earn ₹50,000/month, maximum EMI should be ₹20,000. This leaves money for savings and emergencies.",
-                
-                "saving": "Savings are the portion of income you don't spend. Financial experts recommend:\n\n**50-30-20 Rule:**\n• 50% for Needs (rent, food, EMI)\n• 30% for Wants (entertainment, shopping)\n• 20% for Savings & Investments\n\n**By Age:**\n• 20s-30s: Save 20-30%\n• 30s-40s: Save 25-35%\n• 40s-50s: Save 30-40%\n\n**Priority Order:**\n1. Build 6-month emergency fund\n2. Clear high-interest debt\n3. Start SIP in mutual funds\n4. Increase savings with salary hikes\n\nMinimum: Save at least 15-20% of income. If earning ₹50,000/month, save ₹10,000 minimum.",
-                
-                "investment": "Investment means putting money into assets that can grow over time. Unlike savings (keep money safe), investments aim to beat inflation and build wealth.\n\n**Types:**\n• Equity (stocks, equity mutual funds): High risk, 12-15% returns\n• Debt (bonds, FDs, debt funds): Low risk, 6-8% returns\n• Gold: Hedge against inflation, 8-10% returns\n• Real Estate: Long-term, 7-9% returns\n\n**Investment Strategy by Time:**\n• Emergency fund: Savings account (need liquidity)\n• 1-2 years: Fixed deposits, debt funds\n• 3-5 years: Hybrid mutual funds\n• 5+ years: Equity mutual funds, stocks\n\n**Golden Rule:** Don't invest money you need in next 3 years in stocks. Start early - even ₹500/month SIP grows to ₹10+ lakhs in 20 years!",
-                
-                "mutual fund": "Mutual funds pool money from many investors to buy securities (stocks, bonds, gold). Managed by professional fund managers.\n\n**Types:**\n• Equity Funds: Invest in stocks (high risk, 12-15% returns)\n• Debt Funds: Invest in bonds (low risk, 6-8% returns)\n• Hybrid Funds: Mix of stocks+bonds (medium risk, 8-10% returns)\n• Index Funds: Copy Nifty/Sensex (low cost, market returns)\n\n**Benefits:**\n• Professional management\n• Diversification (spreads risk)\n• Start small (₹500/month SIP)\n• Easy to buy and sell (1-3 day)\n• SEBI regulated (safe)\n\n**How to invest:**\nUse apps like Groww, Zerodha, Paytm Money or directly from AMC websites. Best for long-term wealth creation!",
-                
-                "sip": "SIP = Systematic Investment Plan. Invest fixed amount monthly in mutual funds automatically.\n\n**How it works:**\n1. Choose mutual fund scheme\n2. Set monthly amount (₹500, ₹1000, ₹5000)\n3. Auto-debit from bank on fixed date\n4. Units credited at current NAV price\n\n**Benefits:**\n• Rupee Cost Averaging: Buy more when price low, less when high\n• Power of Compounding: Returns generate more returns\n• Disciplined investing: Automatic habit\n• Start small: Begin with ₹500\n\n**Example:** ₹5000/month SIP for 20 years at 12% = ₹1.49 crores!\n\nBest for salaried individuals and first-time investors. Never stop SIP during market falls - that's when you get cheapest units!",
-                
-                "emergency fund": "Emergency fund is money set aside for unexpected expenses:\n• Medical emergencies\n• Job loss (cover 6-12 months expenses)\n• Urgent home/vehicle repairs\n• Family emergencies\n\n**Target Amount:** 6-12 months of monthly expenses\nIf you spend ₹30,000/month, keep ₹1.8-3.6 lakhs\n\n**Where to keep:**\n• Savings account (instant access)\n• Liquid mutual funds (withdraw in 1 day)\n• Sweep-in FD (earns interest + liquid)\n\n**DON'T:**\n• Invest in stocks (too risky)\n• Put in long lock-in schemes\n• Use for lifestyle expenses\n\nBuild gradually by saving 10-15% monthly. This fund gives peace of mind and prevents debt during crises.",
-                
-                "insurance": "Insurance protects against financial loss from unexpected events.\n\n**Life Insurance (Term):**\n• If you die, family gets money (₹50L - ₹1 crore)\n• Coverage: 10-15 times annual income\n• Cost: ₹500-1000/month for ₹1 crore cover (age 30)\n• Buy when young (cheaper premiums)\n• DON'T mix with investment (avoid LIC endowment)\n\n**Health Insurance:**\n• Covers medical expenses (₹5-10 lakh minimum)\n• Family floater available\n• Cashless at network hospitals\n• Medical inflation is 10-15% yearly\n\n**Why needed:**\n• One serious illness can wipe out savings\n• Insurance is cheapest when young and healthy\n• Provides financial protection to family\n\nPriority: Term life insurance if you have dependents + health insurance for everyone.",
-                
-                "budget": "Budgeting is planning how to spend your money wisely.\n\n**50-30-20 Rule:**\n• 50% Needs: Rent, food, utilities, EMI, insurance, transport\n• 30% Wants: Entertainment, dining, shopping, hobbies, vacations\n• 20% Savings: Emergency fund, investments, retirement\n\n**Example: ₹50,000 salary**\n• ₹25,000 for needs\n• ₹15,000 for wants\n• ₹10,000 for savings\n\n**Budgeting Steps:**\n1. Track all expenses for 1 month\n2. Categorize into needs/wants/savings\n3. Set spending limits for each category\n4. Review monthly and adjust\n5. Use apps like Walnut, Money Manager\n\n**Tips:**\n• Pay yourself first (save before spending)\n• Avoid impulse purchases\n• Use cash for wants (limits spending)\n• Automate savings on salary day",
-                
-                "credit score": "Credit score is a 3-digit number (300-900) showing creditworthiness. Banks check it before giving loans.\n\n**Score Ranges:**\n• 750-900: Excellent (instant approval, lowest rates)\n• 650-749: Good (likely approval, moderate rates)\n• 550-649: Average (difficult approval, high rates)\n• Below 550: Poor (rejection likely)\n\n**Factors (CIBIL):**\n• Payment history (35%): Pay EMIs/cards on time\n• Credit utilization (30%): Use <30% of credit limit\n• Credit history (15%): Keep old accounts active\n• Credit mix (10%): Mix of secured/unsecured loans\n• New credit (10%): Don't apply multiple loans together\n\n**Check Free:** CIBIL.com, Experian, Paisa Bazaar (once yearly)\n\n**Improve Score:**\n• Pay all bills on time\n• Keep credit card usage low\n• Don't close old credit cards\n• Check for errors and dispute",
-                
-                "tax": "Taxes reduce your income. Smart planning can save ₹50,000+ yearly!\n\n**Section 80C (₹1.5L limit):**\n• ELSS mutual funds (best: 3 year lock-in, high returns)\n• PPF (7-8%, 15 year lock-in)\n• Life insurance premium\n• Home loan principal\n• NSC, FD (5 years)\n\n**Section 80D:**\n• Health insurance: ₹25,000 (self)\n• Parents insurance: ₹25,000 more (₹50K if senior citizens)\n\n**Section 80CCD(1B):**\n• NPS: Additional ₹50,000 deduction\n\n**Home Loan:**\n• Interest: ₹2 lakhs deduction (Section 24)\n• First-time buyer: ₹1.5L additional (80EEA)\n\n**Total Possible Savings:** ₹1.5L (80C) + ₹50K (NPS) + ₹2L (home loan) + ₹50K (health) = ₹3.5L deductions = ₹1L+ tax saved!",
-                
-                "retirement": "Retirement planning ensures financial independence in old age.\n\n**How Much Needed:**\nRule of thumb: 25-30X annual expenses\nIf ₹50,000/month expenses = ₹1.5-1.8 crores needed at retirement\n\n**Start Age Matters:**\n• At 25: ₹5000/month SIP = ₹1.5 crores by 60\n• At 35: ₹15,000/month SIP = ₹1.5 crores by 60\n• At 45: ₹50,000/month SIP = ₹1.5 crores by 60\n\n**Investment Options:**\n• EPF (mandatory for salaried): 8-9% returns\n• NPS (extra ₹50K tax benefit): 8-10% returns\n• PPF (₹1.5L yearly): 7-8%, tax-free\n• Equity mutual funds: 10-12% long-term\n\n**Strategy by Age:**\n• 20s-40s: 70-80% equity (growth)\n• 40s-50s: 60-70% equity (balanced)\n• 50s-60s: 40-50% equity (conservative)\n\nStart NOW! Time is your biggest asset in retirement planning.",
-                
-                "loan": "Loans let you borrow money to buy things now and pay later with interest.\n\n**Secured Loans (backed by asset):**\n• Home loan: 8-10% interest, 15-30 years\n• Car loan: 8-12% interest, 5-7 years\n• Gold loan: 7-9% interest, 1-3 years\n\n**Unsecured Loans (no asset):**\n• Personal loan: 12-24% interest, 1-5 years\n• Credit card debt: 36-42% interest (HIGHEST!)\n• Education loan: 8-12% interest, 5-15 years\n\n**Loan Rules:**\n• Keep total EMI < 40% of monthly income\n• Compare interest rates (even 1% difference = ₹lakhs saved)\n• Read fine print (processing fee, prepayment charges)\n• Avoid loans for lifestyle (vacation, wedding, gadgets)\n• Good debt: Home, education (builds assets)\n• Bad debt: Credit cards, personal loans (no asset)\n\n**Priority:** Pay off high-interest debt first (credit cards, personal loans) before investing.",
-                
-                "default": "I'm your AI financial literacy assistant! I can help you understand:\n\n**Basic Concepts:**\n• What is an asset?\n• What is a liability?\n• How to calculate EMI?\n• Emergency fund planning\n\n**Investing:**\n• Mutual funds explained\n• SIP benefits\n• Stock vs mutual funds\n• Tax-saving options (80C)\n\n**Planning:**\n• How much to save?\n• Budget planning (50-30-20 rule)\n• Retirement planning\n• Insurance needs\n\n**Banking:**\n• Credit score importance\n• Types of loans\n• UPI and digital payments\n\nTry asking: 'What is an asset?' or 'Explain EMI simply' or 'How much should I save?'\n\nI provide simple, clear answers for financial literacy - perfect for beginners!"
-            },
-            "hi": {
-                "asset": "संपत्ति वह मूल्यवान चीज है जो आपके पास है और जो समय के साथ आय उत्पन्न कर सकती है या मूल्य बढ़ा सकती है। मुख्य संपत्तियां:\n\n• नकद और बैंक जमा (बचत खाता, FD)\n• रियल एस्टेट (घर, जमीन, प्रॉपर्टी)\n• सोना और आभूषण\n• वाहन (कार, बाइक)\n• निवेश (म्यूचुअल फंड, शेयर, बॉन्ड)\n• व्यापार\n\nसंपत्ति धन निर्माण और वित्तीय सुरक्षा में मदद करती है। यह आय उत्पन्न कर सकती है (प्रॉपर्टी से किराया, शेयरों से डिविडेंड) या समय के साथ मूल्य बढ़ सकती है।",
-                
-                "emi": "EMI का मतलब Equated Monthly Installment है। यह लोन चुकाने के लिए हर महीने pay की जाने वाली fixed राशि है।\n\nEMI में दो हिस्से हैं:\n• Principal (मूल लोन राशि)\n• Interest (उधार लेने की लागत)\n\nउदाहरण: ₹10 लाख लोन, 10% सालाना ब्याज, 5 साल = ₹21,247 मासिक EMI\n\nमहत्वपूर्ण नियम:\n• कुल EMI मासिक आय के 40% से कम रखें\n• ज्यादा EMI = जल्दी लोन खत्म पर कम बचत\n• High-interest loans पहले चुकाएं",
-                
-                "default": "मैं आपका AI वित्तीय साक्षरता सहायक हूं! मैं मदद कर सकता हूं:\n\n• संपत्ति क्या है?\n• देनदारी क्या है?\n• EMI कैसे calculate करें?\n• बचत कैसे करें?\n• Mutual funds क्या हैं?\n• निवेश कैसे शुरू करें?\n\nकुछ पूछें जैसे 'संपत्ति क्या है?' या 'EMI समझाएं' या 'कितनी बचत करूं?'"
-            },
-            "kn": {
-                "asset": "ಆಸ್ತಿ ಎಂದರೆ ನೀವು ಹೊಂದಿರುವ ಮೌಲ್ಯವುಳ್ಳ ವಸ್ತು ಮತ್ತು ಇದು ಕಾಲಾನಂತರದಲ್ಲಿ ಆದಾಯ ಉತ್ಪಾದಿಸಬಹುದು ಅಥವಾ ಮೌಲ್ಯ ಹೆಚ್ಚಿಸಬಹುದು। ಮುಖ್ಯ ಆಸ್ತಿಗಳು:\n\n• ನಗದು ಮತ್ತು ಬ್ಯಾಂಕ್ ಠೇವಣಿ (ಉಳಿತಾಯ, FD)\n• ರಿಯಲ್ ಎಸ್ಟೇಟ್ (ಮನೆ, ಜಮೀನು)\n• ಚಿನ್ನ ಮತ್ತು ಆಭರಣಗಳು\n• ವಾಹನಗಳು (ಕಾರು, ಬೈಕ್)\n• ಹೂಡಿಕೆಗಳು (ಮ್ಯೂಚುಯಲ್ ಫಂಡ್, ಷೇರುಗಳು)\n\nಆಸ್ತಿಗಳು wealth ಹೆಚ್ಚಿಸುತ್ತವೆ ಮತ್ತು ಆದಾಯ ಉತ್ಪಾದಿಸುತ್ತವೆ।",
-                
-                "emi": "EMI ಎಂದರೆ ಸಾಲವನ್ನು ತಿರುಗಿ ಪಾವತಿಸಲು ಪ್ರತಿ ತಿಂಗಳು ನೀಡುವ ನಿಗದಿತ ಮೊತ್ತ।\n\nEMI ಯಲ್ಲಿ ಎರಡು ಭಾಗಗಳು:\n• Principal (ಮೂಲ ಸಾಲ)\n• Interest (ಬಡ್ಡಿ)\n\nಉದಾಹರಣೆ: ₹10 ಲಕ್ಷ ಸಾಲ, 10% ವಾರ್ಷಿಕ ಬಡ್ಡಿ, 5 ವರ್ಷ = ₹21,247 ಮಾಸಿಕ EMI\n\nಮುಖ್ಯ ನಿಯಮ: ಒಟ್ಟು EMI ನಿಮ್ಮ ಮಾಸಿಕ ಆದಾಯದ 40% ಕ್ಕಿಂತ ಕಡಿಮೆ ಇರಬೇಕು।",
-                
-                "default": "ನಾನು ನಿಮ್ಮ AI ಹಣಕಾಸು ಸಾಕ್ಷರತೆ ಸಹಾಯಕ! ನಾನು ಸಹಾಯ ಮಾಡಬಲ್ಲೆ:\n\n• ಆಸ್ತಿ ಎಂದರೇನು?\n• ಹೊಣೆಗಾರಿಕೆ ಎಂದರೇನು?\n• EMI ಹೇಗೆ ಲೆಕ್ಕ ಹಾಕುವುದು?\n• ಉಳಿತಾಯ ಹೇಗೆ ಮಾಡುವುದು?\n• Mutual funds ಎಂದರೇನು?\n\nಕೇಳಿ: 'ಆಸ್ತಿ ಎಂದರೇನು?' ಅಥವಾ 'EMI ವಿವರಿಸಿ'"
-            }
-        }
-        
-        text_lower = text.lower()
-        
-        # Match keywords to responses
-        for key in fallback_responses[lang].keys():
-            if key in text_lower or key.replace(' ', '') in text_lower.replace(' ', ''):
-                return fallback_responses[lang][key]
-        
-        # Default response if no match
-        return fallback_responses[lang].get("default", fallback_responses["en"]["default"])
-
+        return get_fallback_response(text, lang)
 
-model_instance = None
 
-def get_model():
-    global model_instance
-    if model_instance is None:
-        model_instance = FinLitModel()
-    return model_instance
+def get_model(name=None):
+    """The registry's default model (or a named one); see model_registry.py"""
+    from .model_registry import get_model_registry
+    return get_model_registry().get(name)
@@ -11,6 +11,8 @@ import json
 from pathlib import Path
 from dotenv import load_dotenv
 
+from .metrics import metrics, stage_timer
+
 load_dotenv()
 
 class FinancialNewsService:
@@ -18,6 +20,7 @@ class FinancialNewsService:
         # NewsAPI.org - Get FREE API key at https://newsapi.org/
         # Sign up and get your key (100 requests/day FREE)
         self.newsapi_key = os.environ.get("NEWS_API_KEY", "")
+        self.newsapi_url = os.environ.get("NEWS_API_URL", "https://newsapi.org/v2/top-headlines")
         
         # RSS Feeds (No API key needed - always FREE)
         self.rss_feeds = {
@@ -31,15 +34,20 @@ class FinancialNewsService:
         self.cache_file = Path("out/news_cache.json")
         self.cache_duration = 1800  # 30 minutes cache
     
-def get_cached_news(self):
-    if self.cache_file.exists():
-        with open(self.cache_file, 'r', encoding='utf-8') as f:
-            cache = json.load(f)  # <-- can raise JSONDecodeError
-            cache_time = datetime.fromisoformat(cache['timestamp'])  # <-- KeyError/ValueError
-            if datetime.now() - cache_time < timedelta(seconds=self.cache_duration):
-                return cache['news']
-    return None
-
+    def get_cached_news(self):
+        """Load news from cache if still fresh"""
+        if not self.cache_file.exists():
+            return None
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            cache_time = datetime.fromisoformat(cache['timestamp'])
+        except (OSError, json.JSONDecodeError, KeyError, ValueError) as e:
+            print(f"News cache unreadable: {e}")
+            return None
+        if datetime.now() - cache_time < timedelta(seconds=self.cache_duration):
+            return cache['news']
+        return None
     
     def save_cache(self, news):
         """Save news to cache"""
@@ -57,7 +65,7 @@ def get_cached_news(self):
             return []  # Skip if no key configured
         
         try:
-            url = "https://newsapi.org/v2/top-headlines"
+            url = self.newsapi_url
             params = {
                 "apiKey": self.newsapi_key,
                 "country": "in",
@@ -80,6 +88,7 @@ def get_cached_news(self):
                     })
                 return articles
         except Exception as e:
+            metrics.counter("upstream_errors_total", upstream="newsapi").inc()
             print(f"NewsAPI error: {e}")
         
         return []
@@ -107,16 +116,23 @@ def get_cached_news(self):
             
             return articles
         except Exception as e:
+            metrics.counter("upstream_errors_total", upstream=f"rss_{feed_name}").inc()
             print(f"RSS feed {feed_name} error: {e}")
         
         return []
     
     def fetch_all_news(self) -> List[Dict]:
         """Fetch news from all sources"""
+        with stage_timer("fetch_all_news"):
+            return self._fetch_all_news()
+    
+    def _fetch_all_news(self) -> List[Dict]:
         # Check cache first
         cached = self.get_cached_news()
         if cached:
+            metrics.counter("cache_lookups_total", cache="news", outcome="hit").inc()
             return cached
+        metrics.counter("cache_lookups_total", cache="news", outcome="miss").inc()
         
         all_news = []
         
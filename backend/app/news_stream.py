@@ -0,0 +1,177 @@
+"""
+News Broadcast
+One background refresher keeps a single news snapshot and pushes diffs to every subscriber
+
+Subscribers get a bounded queue. A client too slow to drain it is not allowed
+to hold up the others or grow memory: its backlog is dropped and replaced
+by one fresh snapshot (resync), the same thing a reconnecting client gets.
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+from .metrics import metrics, stage_timer
+from .news_service import FinancialNewsService
+
+NEWS_REFRESH_SECONDS = float(os.environ.get("NEWS_REFRESH_SECONDS", "300"))
+MARKET_REFRESH_SECONDS = float(os.environ.get("MARKET_REFRESH_SECONDS", "60"))
+NEWS_STREAM_QUEUE = int(os.environ.get("NEWS_STREAM_QUEUE", "16"))
+NEWS_STREAM_HEARTBEAT = 15.0
+BREAKING_NEWS_COUNT = 5
+
+
+def breaking_news(articles):
+    return [
+        {
+            "title": article.get("title", ""),
+            "source": article.get("source", "Unknown"),
+            "url": article.get("url", ""),
+            "published_at": article.get("published_at", "")
+        }
+        for article in articles[:BREAKING_NEWS_COUNT]
+    ]
+
+
+def sse_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscriber:
+    def __init__(self, max_queue=NEWS_STREAM_QUEUE):
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.resyncs = 0
+
+
+class NewsBroadcaster:
+    def __init__(self, service=None):
+        self.service = service or FinancialNewsService()
+        # The shared file cache doubles as the refresh interval
+        self.service.cache_duration = NEWS_REFRESH_SECONDS
+        self.version = 0
+        self.snapshot = None  # {"breaking_news", "market_summary", "last_updated"}
+        self.subscribers = set()
+        self.ready = asyncio.Event()  # set once the first snapshot exists
+        self._task = None
+        self._listeners = []  # sync callbacks run on every new snapshot
+
+    def add_listener(self, callback):
+        """callback(snapshot, version) after every change (e.g. re-serializing /news)"""
+        self._listeners.append(callback)
+
+    def subscribe(self):
+        subscriber = Subscriber()
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def _publish(self, event, data):
+        self.version += 1
+        self.snapshot["last_updated"] = datetime.now().isoformat()
+        for listener in self._listeners:
+            try:
+                listener(self.snapshot, self.version)
+            except Exception as e:
+                print(f"News listener error: {e}")
+
+        message = (self.version, event, data)
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow client: collapse its backlog into a single resync
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait((self.version, "snapshot", self.snapshot))
+                subscriber.resyncs += 1
+                metrics.counter("news_stream_resyncs_total").inc()
+        metrics.counter("news_stream_events_total", event=event).inc()
+
+    def _apply_articles(self, articles):
+        latest = breaking_news(articles)
+        if self.snapshot is None:
+            self.snapshot = {"breaking_news": latest, "market_summary": {}, "last_updated": None}
+            self._publish("snapshot", self.snapshot)
+            self.ready.set()
+            return
+        previous = {item["url"] for item in self.snapshot["breaking_news"]}
+        current = {item["url"] for item in latest}
+        added = [item for item in latest if item["url"] not in previous]
+        removed = [url for url in previous if url not in current]
+        if added or removed:
+            self.snapshot = dict(self.snapshot, breaking_news=latest)
+            self._publish("articles", {"added": added, "removed": removed})
+
+    def _apply_market(self, summary):
+        if not summary or self.snapshot is None:
+            return
+        old = self.snapshot["market_summary"]
+        changed = {key: value for key, value in summary.items() if old.get(key) != value}
+        if changed:
+            self.snapshot = dict(self.snapshot, market_summary=dict(old, **changed))
+            self._publish("market", changed)
+
+    async def refresh_articles(self):
+        with stage_timer("news_refresh"):
+            articles = await asyncio.to_thread(self.service.fetch_all_news)
+        self._apply_articles(articles)
+
+    async def refresh_market(self):
+        summary = await asyncio.to_thread(self.service.get_indian_financial_summary)
+        self._apply_market(summary)
+
+    async def _run(self):
+        next_articles = 0.0
+        while True:
+            now = time.monotonic()
+            try:
+                if now >= next_articles:
+                    await self.refresh_articles()
+                    next_articles = now + NEWS_REFRESH_SECONDS
+                await self.refresh_market()
+            except Exception as e:
+                print(f"News refresh error: {e}")
+            await asyncio.sleep(min(MARKET_REFRESH_SECONDS, NEWS_REFRESH_SECONDS))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stream(self, last_event_id=None, is_disconnected=None):
+        """SSE text for one client: a snapshot (unless already current), then diffs"""
+        subscriber = self.subscribe()
+        metrics.gauge("news_stream_clients").inc()
+        try:
+            if self.snapshot is not None and str(self.version) != str(last_event_id):
+                yield sse_event("snapshot", self.snapshot, self.version)
+            while True:
+                try:
+                    version, event, data = await asyncio.wait_for(subscriber.queue.get(), NEWS_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if is_disconnected is not None and await is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_event(event, data, version)
+        finally:
+            self.unsubscribe(subscriber)
+            metrics.gauge("news_stream_clients").dec()
+
+
+# Global instance
+news_broadcaster = None
+
+def get_news_broadcaster():
+    """Get or create the news broadcaster (call start() from the event loop)"""
+    global news_broadcaster
+    if news_broadcaster is None:
+        news_broadcaster = NewsBroadcaster()
+    return news_broadcaster
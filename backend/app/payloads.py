@@ -0,0 +1,84 @@
+"""
+Prepared Payloads
+JSON bodies serialized and compressed once per change, served with a strong ETag
+
+Each encoding gets its own strong validator ("<hash>", "<hash>-gzip",
+"<hash>-br"), so caches never mix up variants. A conditional request whose
+If-None-Match names any variant of the current content gets a 304.
+"""
+import gzip
+import hashlib
+import json
+import threading
+
+from fastapi import Response
+
+try:
+    import brotli  # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+
+class PreparedPayload:
+    def __init__(self, cache_control="public, max-age=60"):
+        self.cache_control = cache_control
+        self._lock = threading.Lock()
+        self._variants = None  # encoding -> bytes ("identity", "gzip", "br")
+        self._etag_base = None
+
+    @property
+    def ready(self):
+        return self._variants is not None
+
+    def update(self, data):
+        """Serialize + compress now so requests only copy bytes"""
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag_base = hashlib.sha256(body).hexdigest()[:32]
+        if etag_base == self._etag_base:
+            return False
+        variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+        with self._lock:
+            self._variants, self._etag_base = variants, etag_base
+        return True
+
+    def _etag(self, encoding, base):
+        return f'"{base}"' if encoding == "identity" else f'"{base}-{encoding}"'
+
+    @staticmethod
+    def _negotiate(accept_encoding, variants):
+        accepted = {}
+        for part in (accept_encoding or "").lower().split(","):
+            name, _, params = part.strip().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            if name:
+                accepted[name] = quality
+        for encoding in ("br", "gzip"):
+            if encoding in variants and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return "identity"
+
+    def respond(self, if_none_match=None, accept_encoding=None):
+        with self._lock:
+            variants, base = self._variants, self._etag_base
+        encoding = self._negotiate(accept_encoding, variants)
+        headers = {
+            "ETag": self._etag(encoding, base),
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in tags or any(tag.strip('"').split("-")[0] == base for tag in tags):
+                return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=variants[encoding], media_type="application/json", headers=headers)
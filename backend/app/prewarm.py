@@ -0,0 +1,80 @@
+"""
+Cache Pre-warming
+Which (question, language, profile band) answers to generate before traffic arrives
+
+The question list is either curated (the suggestions every fallback "default"
+answer already advertises, in each language) or mined from the /ask
+analytics files. Each question is expanded across languages and, optionally,
+representative profile bands. main.prewarm_caches() does the generating.
+"""
+import os
+import re
+
+from .cache import normalize_question
+from .fallbacks import FALLBACK_RESPONSES
+
+PREWARM_ON_STARTUP = os.environ.get("PREWARM_ON_STARTUP", "0") == "1"
+PREWARM_CONCURRENCY = int(os.environ.get("PREWARM_CONCURRENCY", "4"))
+PREWARM_LANGUAGES = tuple(os.environ.get("PREWARM_LANGUAGES", "en,hi,kn").split(","))
+PREWARM_MINE_TOP = int(os.environ.get("PREWARM_MINE_TOP", "50"))
+
+# One profile per common band (see main.profile_bucket): low, lower-middle, middle, upper income
+PROFILE_BANDS = [
+    {"income": 15000, "expenses": 12000, "emi": 0},
+    {"income": 30000, "expenses": 21000, "emi": 4500},
+    {"income": 60000, "expenses": 36000, "emi": 12000},
+    {"income": 120000, "expenses": 60000, "emi": 30000},
+]
+
+BULLET = re.compile(r"^• (.+)$", re.MULTILINE)
+# 'Example question' as a whole quoted phrase on one line: the opening quote
+# follows a space or colon, so apostrophes inside words ("I'm") never open one
+QUOTED = re.compile(r"(?:^|(?<=[\s:]))'([^'\n]+?)'(?=[\s.,!?]|$)", re.MULTILINE)
+MAX_SUGGESTION_CHARS = 80
+
+
+def _suggestion(text):
+    """A bullet/quote that reads like a question: not a stray word, not a paragraph"""
+    text = text.strip()
+    return text if len(text.split()) >= 2 and len(text) <= MAX_SUGGESTION_CHARS else None
+
+
+def curated_questions(languages=PREWARM_LANGUAGES):
+    """[(question, lang)]: each language's advertised questions, plus the English ones in every language"""
+    suggested = {}
+    for lang, responses in FALLBACK_RESPONSES.items():
+        text = responses.get("default", "")
+        candidates = (_suggestion(q) for q in BULLET.findall(text) + QUOTED.findall(text))
+        suggested[lang] = [q for q in candidates if q]
+    questions = []
+    for lang in languages:
+        # English questions asked with a Hindi/Kannada answer language are common too
+        for question in suggested.get(lang, []) + (suggested["en"] if lang != "en" else []):
+            questions.append((question, lang))
+    return questions
+
+
+def mined_questions(top=PREWARM_MINE_TOP, hours=None, languages=PREWARM_LANGUAGES):
+    """[(question, lang)]: the most asked questions per language from the analytics files"""
+    from .analytics import top_questions
+    questions = []
+    for lang in languages:
+        try:
+            questions.extend((row["question"], lang) for row in top_questions(top, hours, lang))
+        except Exception as e:
+            print(f"Prewarm mining error: {e}")
+    return questions
+
+
+def expand(questions, with_profiles=False):
+    """[(question, lang, profile dict or None)], deduplicated on what the answer cache keys on"""
+    profiles = [None] + (PROFILE_BANDS if with_profiles else [])
+    seen = set()
+    targets = []
+    for question, lang in questions:
+        for profile in profiles:
+            key = (normalize_question(question), lang, tuple(sorted(profile.items())) if profile else None)
+            if key not in seen:
+                seen.add(key)
+                targets.append((question, lang, profile))
+    return targets
@@ -0,0 +1,192 @@
+"""
+On-Demand Sampling Profiler
+Samples thread and asyncio task stacks into flamegraph-compatible collapsed stacks
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+MAX_PROFILE_SECONDS = 120
+
+
+class ProfilerBusy(Exception):
+    """Only one profiling session can run per worker"""
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame):
+    """Root-first frame labels for one stack"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _await_chain(coro):
+    """Root-first frame labels for a suspended coroutine and everything it awaits
+
+    A suspended task's frame has no f_back, so the chain is followed through
+    cr_await / gi_yieldfrom / ag_await instead.
+    """
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break  # finished, or reached a Future
+        labels.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return labels
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005, task_every=10):
+        self.interval = interval
+        # Task stacks need a hop onto the event loop, so sample them less often
+        self.task_every = task_every
+
+        self.samples = Counter()
+        self.sample_count = 0
+        self.recording = True  # request-scoped sessions toggle this
+        self._stop = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._task_snapshot_pending = False
+
+    def start(self, loop=None):
+        self._loop = loop
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        tick = 0
+
+        while not self._stop.wait(self.interval):
+            if not self.recording:
+                continue
+            tick += 1
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = [f"thread:{names.get(thread_id, thread_id)}"] + _collapse(frame)
+                self.samples[";".join(stack)] += 1
+            self.sample_count += 1
+
+            if self._loop is not None and tick % self.task_every == 0 and not self._task_snapshot_pending:
+                # If the loop is blocked this waits - the blocking frame is already
+                # visible in the MainThread stacks above
+                self._task_snapshot_pending = True
+                self._loop.call_soon_threadsafe(self._snapshot_tasks)
+
+    def _snapshot_tasks(self):
+        try:
+            for task in asyncio.all_tasks(self._loop):
+                chain = _await_chain(task.get_coro())
+                if not chain:
+                    continue
+                stack = [f"task:{task.get_name()}"] + chain
+                self.samples[";".join(stack)] += self.task_every
+        finally:
+            self._task_snapshot_pending = False
+
+    def collapsed(self):
+        """Brendan Gregg collapsed-stack format: 'frame;frame;frame count'"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+class ProfilerService:
+    """Runs at most one profile at a time: timed, or scoped to the next K requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.profiler = None
+        self._paths = None
+        self._remaining = 0
+        self._active = 0
+        self._done = None
+
+    def _begin(self, recording, paths=None, count=0):
+        with self._lock:
+            if self.profiler is not None:
+                raise ProfilerBusy("A profiling session is already running")
+            # Session state is only touched once we own the profiler
+            self._done = asyncio.Event()
+            self._remaining = count
+            self._active = 0
+            self._paths = tuple(paths) if paths else None
+            self.profiler = SamplingProfiler()
+            self.profiler.recording = recording
+        self.profiler.start(asyncio.get_running_loop())
+        return self.profiler
+
+    def _end(self):
+        profiler = self.profiler
+        profiler.stop()
+        with self._lock:
+            self.profiler = None
+            self._paths = None
+        return profiler.collapsed()
+
+    async def profile_for(self, seconds):
+        seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+        self._begin(recording=True)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            result = self._end()
+        return result
+
+    async def profile_requests(self, count, paths, timeout):
+        """Sample only while one of the next `count` requests to `paths` is running"""
+        self._begin(recording=False, paths=paths, count=count)
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=min(timeout, MAX_PROFILE_SECONDS))
+        except asyncio.TimeoutError:
+            pass  # Return whatever was captured so far
+        finally:
+            result = self._end()
+        return result
+
+    @contextmanager
+    def request_scope(self, path):
+        """Wrap request handling; records samples if a request-scoped session wants this path"""
+        profiler = self.profiler
+        paths = self._paths
+        if profiler is None or not paths or self._remaining <= 0 or not path.startswith(paths):
+            yield
+            return
+
+        self._remaining -= 1
+        self._active += 1
+        profiler.recording = True
+        try:
+            yield
+        finally:
+            self._active -= 1
+            if self._active == 0:
+                profiler.recording = False
+                if self._remaining <= 0:
+                    self._done.set()
+
+
+# Global instance
+profiler_service = ProfilerService()
@@ -0,0 +1,125 @@
+"""
+Prompt Assembly
+Precompiled system prompts, token estimates and per-request prompt budgets for Groq calls
+
+The static instructions go in a system message that is byte-identical for every
+request in a language, so the provider can reuse it as a cached prefix. Only
+the compact user message varies.
+"""
+import os
+import re
+
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", "600"))
+
+LANG_NAMES = {
+    "en": "English",
+    "hi": "Hindi",
+    "kn": "Kannada"
+}
+
+# The LLM tokenizer spends several tokens per Devanagari/Kannada word,
+# so the same ~150-word answer needs a bigger completion allowance
+LANG_TOKEN_FACTOR = {
+    "en": 1.0,
+    "hi": 2.0,
+    "kn": 2.5
+}
+
+# English completion allowance per question type. Answers are capped at 150
+# words (~200 tokens plus bullets and emojis), so no type goes below that;
+# generate_answer() retries with more if the model still hits the limit
+ANSWER_TOKENS = {
+    "definition": 230,
+    "comparison": 280,
+    "plan": 320,
+    "general": 260
+}
+
+QUESTION_TYPES = [
+    ("comparison", re.compile(r"\b(vs|versus|compare|comparison|difference|better|which)\b|बेहतर|अंतर|ವ್ಯತ್ಯಾಸ")),
+    ("plan", re.compile(r"\b(how (should|can|do|much|to)|plan|save|invest|budget|reduce|strategy|should i)\b|कैसे|कितना|ಹೇಗೆ|ಎಷ್ಟು")),
+    ("definition", re.compile(r"^\s*(what (is|are|does)|define|meaning of|explain)\b|क्या है|ಎಂದರೇನು")),
+]
+
+SYSTEM_TEMPLATE = """You are a financial literacy assistant for Indian users.
+Rules:
+1. Answer in {language} ONLY
+2. Keep answers simple and practical (under 150 words)
+3. Use Indian financial terms (₹, SIP, mutual funds, FD, PPF, etc.)
+4. If a profile is given, personalize the advice
+5. Use 1-2 emojis maximum
+6. Format: Main advice + 2-3 bullet points if needed"""
+
+# Built once at import; identical bytes on every request = cacheable prefix
+SYSTEM_PROMPTS = {lang: SYSTEM_TEMPLATE.format(language=name) for lang, name in LANG_NAMES.items()}
+
+
+def estimate_tokens(text):
+    """~4 characters per token for English; Indic scripts tokenize denser, so count those double"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) + non_ascii) // 4 + 1
+
+
+def clip_to_tokens(text, max_tokens):
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # Binary search isn't worth it for a few hundred chars - shrink proportionally
+    ratio = max_tokens / estimate_tokens(text)
+    return text[:max(0, int(len(text) * ratio) - 3)].rstrip() + "..."
+
+
+def question_type(question):
+    text = question.lower()
+    for name, pattern in QUESTION_TYPES:
+        if pattern.search(text):
+            return name
+    return "general"
+
+
+def answer_token_limit(question, language, has_profile=False):
+    """max_tokens for the completion, sized to the question type and script"""
+    tokens = ANSWER_TOKENS[question_type(question)]
+    if has_profile:
+        tokens += 40  # room to quote the user's own numbers
+    return int(tokens * LANG_TOKEN_FACTOR.get(language, 1.0))
+
+
+def profile_line(profile):
+    """One-line profile; the model needs the numbers, not a formatted table"""
+    savings = profile.income - profile.expenses - profile.emi
+    savings_rate = round((savings / profile.income * 100), 1) if profile.income > 0 else 0
+    return (f"Profile (monthly): income ₹{profile.income:,.0f}, expenses ₹{profile.expenses:,.0f}, "
+            f"EMI ₹{profile.emi:,.0f}, savings ₹{savings:,.0f} ({savings_rate}%)")
+
+
+def build_messages(question, language, profile=None, history="", context="", budget=PROMPT_TOKEN_BUDGET):
+    """System + user messages fitted to `budget` prompt tokens.
+
+    Background context (regulatory excerpts) is trimmed first, then
+    conversation history, then the question itself. The profile line is
+    never dropped.
+    """
+    system = SYSTEM_PROMPTS.get(language, SYSTEM_PROMPTS["en"])
+    fixed = [profile_line(profile)] if profile else []
+    remaining = budget - estimate_tokens(system) - sum(estimate_tokens(part) for part in fixed)
+
+    question = clip_to_tokens(question.strip(), max(32, remaining // 2))
+    remaining -= estimate_tokens(question) + 4
+
+    sections = []
+    if history and remaining > 24:
+        history = clip_to_tokens(history, (remaining * 2 // 5 if context else remaining) - 8)
+        remaining -= estimate_tokens(history) + 8
+        sections.append(f"Conversation so far:\n{history}")
+    if context and remaining > 40:
+        sections.insert(0, f"Relevant RBI/SEBI excerpts (cite when used):\n{clip_to_tokens(context, remaining - 12)}")
+
+    user = "\n\n".join(fixed + sections + [f"Question: {question}"])
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user}
+    ]
+
+
+def prompt_tokens(messages):
+    return sum(estimate_tokens(message["content"]) for message in messages)
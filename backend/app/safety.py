@@ -1,11 +1,37 @@
 """
 Safety and Content Moderation Module
 Handles out-of-scope questions and crisis situations
+
+Keyword rules decide first; the optional learned classifier (safety_model.py)
+only adds to them. SAFETY_MODEL_MODE=shadow scores every question and counts
+where the two disagree, enforce also acts on high-probability predictions the
+keywords missed, off skips the model.
 """
+import os
 import re
 
+from .metrics import metrics
+from .safety_model import get_safety_model
+
+SAFETY_MODEL_MODE = os.environ.get("SAFETY_MODEL_MODE", "shadow")
+SAFETY_MODEL_THRESHOLDS = {
+    "crisis": float(os.environ.get("SAFETY_CRISIS_THRESHOLD", "0.85")),
+    "mental_health": float(os.environ.get("SAFETY_MENTAL_HEALTH_THRESHOLD", "0.9")),
+    "out_of_scope": float(os.environ.get("SAFETY_OUT_OF_SCOPE_THRESHOLD", "0.8")),
+}
+
+
+def keyword_pattern(keywords):
+    """Latin keywords match whole words only ("app" must not hit "happens");
+    Hindi/Kannada ones stay substrings so inflected forms still match"""
+    return re.compile("|".join(
+        rf"(?<![a-z]){re.escape(keyword)}(?![a-z])" if keyword.isascii() else re.escape(keyword)
+        for keyword in keywords
+    ))
+
 class SafetyFilter:
-    def __init__(self):
+    def __init__(self, model=None):
+        self.model = model
         # Crisis keywords (suicide, self-harm, severe depression)
         self.crisis_keywords = [
             'suicide', 'kill myself', 'end my life', 'want to die', 'suicidal',
@@ -16,6 +42,7 @@ class SafetyFilter:
             # Kannada  
             'ಆತ್ಮಹತ್ಯೆ', 'ಸಾಯಲು ಬಯಸುತ್ತೇನೆ'
         ]
+        self.crisis_pattern = keyword_pattern(self.crisis_keywords)
         
         # Mild mental health keywords
         self.mental_health_keywords = [
@@ -58,13 +85,12 @@ class SafetyFilter:
         text_lower = text.lower()
         
         # Crisis detection (highest priority)
-        for keyword in self.crisis_keywords:
-            if keyword in text_lower:
-                return {
-                    'is_crisis': True,
-                    'severity': 'CRITICAL',
-                    'message': self.get_crisis_response()
-                }
+        if self.crisis_pattern.search(text_lower):
+            return {
+                'is_crisis': True,
+                'severity': 'CRITICAL',
+                'message': self.get_crisis_response()
+            }
         
         # Mental health concern (moderate priority)
         for keyword in self.mental_health_keywords:
@@ -103,7 +129,7 @@ class SafetyFilter:
                 }
         
         # If no keywords match, assume it's financial (give it benefit of doubt)
-        return {'in_scope': True}
+        return {'in_scope': True, 'default': True}
     
     def get_crisis_response(self):
         """Response for crisis situations"""
@@ -212,27 +238,85 @@ I understand financial stress can feel overwhelming, but there are ALWAYS soluti
 💡 **Or, let's talk finances:** What's your financial goal or concern?
 """
     
+    def detect_crisis(self, question):
+        """Crisis response when the question needs one, else None
+
+        The only check /ask acts on: crisis phrases are specific enough to
+        match without refusing ordinary money questions. The model adds
+        paraphrases in enforce mode and is counted in shadow mode.
+        """
+        return self._crisis(question, self.classify(question))
+
+    def detect_crisis_batch(self, questions):
+        """detect_crisis() for many questions, with one model pass over all of them"""
+        questions = list(questions)
+        if self.model is None or SAFETY_MODEL_MODE == "off" or not questions:
+            return [self._crisis(question, None) for question in questions]
+        probabilities = self.model.score_batch(questions)
+        return [
+            self._crisis(question, dict(zip(self.model.labels, (float(p) for p in row))))
+            for question, row in zip(questions, probabilities)
+        ]
+
+    def _crisis(self, question, scores):
+        if self.crisis_pattern.search(question.lower()):
+            return self.get_crisis_response()
+        if 'crisis' in self.model_flags(scores):
+            self._count_disagreement('crisis')
+            if SAFETY_MODEL_MODE == "enforce":
+                return self.get_crisis_response()
+        return None
+
+    def classify(self, question):
+        """Model probabilities per label, or None when no model is in use"""
+        if self.model is None or SAFETY_MODEL_MODE == "off":
+            return None
+        return self.model.score(question)
+
+    def model_flags(self, scores):
+        return {label for label, threshold in SAFETY_MODEL_THRESHOLDS.items()
+                if scores is not None and scores.get(label, 0.0) >= threshold}
+
     def process_question(self, question):
         """Main processing function"""
+        scores = self.classify(question)
+        flags = self.model_flags(scores)
+        enforce = SAFETY_MODEL_MODE == "enforce"
         
-        # Step 1: Check for crisis (highest priority)
+        # Step 1: Check for crisis (highest priority; keywords always override the model)
         crisis_check = self.check_crisis(question)
+        if not crisis_check['is_crisis'] and ('crisis' in flags or 'mental_health' in flags):
+            self._count_disagreement('crisis' if 'crisis' in flags else 'mental_health')
+            if enforce:
+                severity = 'CRITICAL' if 'crisis' in flags else 'MODERATE'
+                crisis_check = {
+                    'is_crisis': True,
+                    'severity': severity,
+                    'message': self.get_crisis_response() if severity == 'CRITICAL' else self.get_mental_health_response()
+                }
         if crisis_check['is_crisis']:
             return {
                 'safe': False,
                 'block': True,
                 'severity': crisis_check['severity'],
-                'response': crisis_check['message']
+                'response': crisis_check['message'],
+                'scores': scores
             }
         
         # Step 2: Check if in scope
         scope_check = self.check_scope(question)
+        if scope_check.get('default') and 'out_of_scope' in flags:
+            # No keyword either way: the model breaks the tie instead of "benefit of doubt"
+            self._count_disagreement('out_of_scope')
+            if enforce:
+                scope_check = {'in_scope': False, 'message': self.get_out_of_scope_response(None)}
         if not scope_check.get('in_scope', True):
             return {
                 'safe': True,
                 'block': False,
                 'in_scope': False,
-                'response': scope_check['message']
+                'response': scope_check['message'],
+                'scores': scores
             }
         
         # Step 3: All clear - proceed with normal processing
@@ -240,12 +324,16 @@ I understand financial stress can feel overwhelming, but there are ALWAYS soluti
             'safe': True,
             'block': False,
             'in_scope': True,
-            'response': None
+            'response': None,
+            'scores': scores
         }
 
+    def _count_disagreement(self, label):
+        metrics.counter("safety_model_only_total", label=label, mode=SAFETY_MODEL_MODE).inc()
+
 
 # Initialize global instance
-safety_filter = SafetyFilter()
+safety_filter = SafetyFilter(model=get_safety_model())
 
 def check_safety(question):
     """Main safety check function"""
@@ -0,0 +1,315 @@
+"""
+Safety Classifier
+Hashed character n-grams + a linear model, scored with NumPy in batches
+
+Runs next to the keyword rules in safety.py, never instead of them: a crisis
+keyword always wins. The model catches what exact substrings miss (spelling
+and inflection variants, paraphrases it has been trained on) and gives scope
+a probability instead of a first-match guess.
+
+Each label (crisis, mental_health, out_of_scope) is an independent logistic
+output. A question's features are its character 2-5-grams over Unicode code
+points, hashed into 2**18 signed buckets, so Hindi and Kannada need no
+tokenizer. Featurizing and scoring are whole-batch array operations: one
+question costs tens of microseconds, ten thousand logged questions a fraction
+of a second.
+
+Train (from backend/):  python -m app.safety_model train [--data labeled.jsonl]
+Score a log:            python -m app.safety_model score questions.txt > scores.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from .cache import normalize_question
+
+SAFETY_MODEL_PATH = Path(os.environ.get(
+    "SAFETY_MODEL_PATH", Path(__file__).parent.parent / "assets" / "safety_model.npz"))
+LABELS = ("crisis", "mental_health", "out_of_scope")
+HASH_BITS = 18
+NGRAM_RANGE = (2, 5)
+BATCH_SIZE = 4096  # questions featurized per array pass
+
+# Seeds for bootstrap_examples() beyond the keyword lists themselves
+CRISIS_PARAPHRASES = [
+    "i want to end it all", "i don't see a way out", "there is no point in living",
+    "i can't take it anymore", "i won't be around much longer", "i want to disappear forever",
+    "my family would be better without me", "i am thinking of ending everything",
+]
+LOCAL_IN_SCOPE_TEMPLATES = [
+    "{topic} क्या है", "{topic} के बारे में बताइए", "{topic} कैसे बढ़ाएं", "{topic} में निवेश कैसे करें",
+    "{topic} ಬಗ್ಗೆ ತಿಳಿಸಿ", "{topic} ಎಂದರೇನು", "{topic} ಹೇಗೆ ಹೆಚ್ಚಿಸುವುದು",
+]
+
+_PRIME = np.uint64(1099511628211)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hash_ngrams(texts, hash_bits=HASH_BITS, ngram_range=NGRAM_RANGE):
+    """Sparse features for a batch: (rows, cols, values), one entry per n-gram occurrence
+
+    All texts are joined into one code point array so every n-gram of every
+    text is hashed in a single vectorized pass per n; windows that straddle
+    two texts are dropped.
+    """
+    docs = [f" {normalize_question(text)} " for text in texts]
+    joined = "\x00".join(docs)
+    points = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    lengths = np.array([len(doc) + 1 for doc in docs], dtype=np.int64)
+    owner = np.repeat(np.arange(len(docs), dtype=np.int64), lengths)[:len(points)]
+
+    rows, cols, signs = [], [], []
+    low, high = ngram_range
+    # Rolling hash: the n-gram hashes extend the (n-1)-gram ones by one code point
+    h = points.copy()
+    valid = points != 0  # no separator inside the window
+    with np.errstate(over="ignore"):
+        for n in range(2, high + 1):
+            if len(h) < 2:
+                break
+            h = h[:-1] * _PRIME + points[n - 1:]
+            valid = valid[:-1] & (points[n - 1:] != 0)
+            if n < low:
+                continue
+            mixed = (h[valid] + np.uint64(n)) * _GOLDEN
+            rows.append(owner[:len(valid)][valid])
+            cols.append((mixed >> np.uint64(64 - hash_bits)).astype(np.int64))
+            signs.append(np.where((mixed >> np.uint64(20)) & np.uint64(1), 1.0, -1.0).astype(np.float32))
+
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32)
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    values = np.concatenate(signs)
+    # Unit-length rows (collisions aside) so long questions don't saturate the sigmoid
+    counts = np.bincount(rows, minlength=len(docs)).astype(np.float32)
+    values /= np.sqrt(np.maximum(counts, 1.0))[rows]
+    return rows, cols, values
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30.0, 30.0)))
+
+
+class LinearSafetyModel:
+    def __init__(self, weights, bias, labels=LABELS, hash_bits=HASH_BITS, ngram_range=NGRAM_RANGE):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)  # (2**hash_bits, len(labels))
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.labels = tuple(labels)
+        self.hash_bits = hash_bits
+        self.ngram_range = tuple(ngram_range)
+
+    @classmethod
+    def empty(cls, labels=LABELS, hash_bits=HASH_BITS, ngram_range=NGRAM_RANGE):
+        return cls(np.zeros((1 << hash_bits, len(labels)), dtype=np.float32),
+                   np.zeros(len(labels), dtype=np.float32), labels, hash_bits, ngram_range)
+
+    def _logits(self, texts):
+        rows, cols, values = hash_ngrams(texts, self.hash_bits, self.ngram_range)
+        logits = np.empty((len(texts), len(self.labels)), dtype=np.float64)
+        for j in range(len(self.labels)):
+            logits[:, j] = np.bincount(rows, weights=self.weights[cols, j] * values, minlength=len(texts))
+        return logits + self.bias, (rows, cols, values)
+
+    def score_batch(self, texts):
+        """(len(texts), len(labels)) probabilities"""
+        texts = list(texts)
+        out = np.empty((len(texts), len(self.labels)), dtype=np.float32)
+        for start in range(0, len(texts), BATCH_SIZE):
+            chunk = texts[start:start + BATCH_SIZE]
+            logits, _ = self._logits(chunk)
+            out[start:start + len(chunk)] = _sigmoid(logits)
+        return out
+
+    def score(self, text):
+        """{label: probability} for one question"""
+        probabilities = self.score_batch([text])[0]
+        return {label: round(float(p), 4) for label, p in zip(self.labels, probabilities)}
+
+    def fit(self, texts, targets, epochs=12, learning_rate=1.0, l2=1e-6, batch_size=256, seed=0):
+        """Minibatch SGD on per-label logistic loss; targets is (n, len(labels)) of 0/1"""
+        texts = list(texts)
+        targets = np.asarray(targets, dtype=np.float64)
+        weights = self.weights.astype(np.float64)
+        bias = self.bias.astype(np.float64)
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            order = rng.permutation(len(texts))
+            rate = learning_rate / (1.0 + epoch)
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                rows, cols, values = hash_ngrams([texts[i] for i in batch], self.hash_bits, self.ngram_range)
+                logits = np.empty((len(batch), len(self.labels)))
+                for j in range(len(self.labels)):
+                    logits[:, j] = np.bincount(rows, weights=weights[cols, j] * values, minlength=len(batch))
+                error = _sigmoid(logits + bias) - targets[batch]
+                if l2:
+                    weights[np.unique(cols)] *= 1.0 - rate * l2
+                np.add.at(weights, cols, -rate * values[:, None] * error[rows])
+                bias -= rate * error.mean(axis=0)
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        return self
+
+    def save(self, path=SAFETY_MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez_compressed(tmp, weights=self.weights, bias=self.bias, labels=np.array(self.labels),
+                            hash_bits=self.hash_bits, ngram_range=np.array(self.ngram_range))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path=SAFETY_MODEL_PATH):
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], [str(label) for label in data["labels"]],
+                       int(data["hash_bits"]), tuple(int(n) for n in data["ngram_range"]))
+
+
+def bootstrap_examples():
+    """Weakly labeled questions generated from the keyword lists in SafetyFilter
+
+    Enough to ship a model that generalizes the lists to their spelling and
+    phrasing variants; real labeled logs (--data) should be added on top.
+    """
+    from .safety import SafetyFilter
+    rules = SafetyFilter()
+    finance = [kw for kw in rules.financial_keywords if kw.isascii()]
+    examples = []
+
+    def add(text, *labels):
+        examples.append((text, {label: 1 for label in labels}))
+
+    for i, topic in enumerate(finance):
+        add(f"what is {topic}")
+        add(f"how do i manage my {topic} better")
+        add(f"explain {topic} in simple words")
+        add(f"should i worry about {topic} at my age")
+        add(f"is it a good idea to {finance[(i + 7) % len(finance)]} this month")
+    for topic in rules.financial_keywords:
+        if not topic.isascii():
+            for template in LOCAL_IN_SCOPE_TEMPLATES:
+                add(template.format(topic=topic))
+
+    for i, phrase in enumerate(rules.crisis_keywords):
+        topic = finance[i % len(finance)]
+        add(phrase, "crisis")
+        add(f"my {topic} problems are too much and i {phrase}", "crisis", "mental_health")
+        add(f"i lost everything, {phrase}", "crisis", "mental_health")
+        add(f"after this {topic} loss i think about {phrase}", "crisis", "mental_health")
+
+    for phrase in CRISIS_PARAPHRASES:
+        add(phrase, "crisis", "mental_health")
+        add(f"{phrase} because of my debt", "crisis", "mental_health")
+
+    indicators = ["can't", "cannot", "unable to", "hopeless", "lost", "don't know", "no way"]
+    for i, feeling in enumerate(rules.mental_health_keywords):
+        topic = finance[(i * 3) % len(finance)]
+        indicator = indicators[i % len(indicators)]
+        add(f"i am {feeling} about my {topic} and {indicator} sleep", "mental_health")
+        add(f"so {feeling}, {indicator} handle my {topic} anymore", "mental_health")
+        add(f"{feeling} {topic}", "mental_health")
+
+    for category, keywords in rules.out_of_scope_keywords.items():
+        for keyword in keywords:
+            add(f"which {keyword} is best", "out_of_scope")
+            add(f"tell me about {keyword}", "out_of_scope")
+            add(f"help me with my {keyword}", "out_of_scope")
+            add(f"how to prepare for {keyword}", "out_of_scope")
+    return examples
+
+
+def load_examples(path):
+    """JSONL lines of {"text": ..., "labels": ["crisis", ...]} (empty list = in-scope, safe)"""
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                examples.append((record["text"], {label: 1 for label in record.get("labels", [])}))
+    return examples
+
+
+def train_model(examples, holdout=0.1, seed=0, **fit_args):
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(examples))
+    cut = int(len(order) * (1 - holdout))
+    texts = [examples[i][0] for i in order]
+    targets = np.array([[examples[i][1].get(label, 0) for label in LABELS] for i in order], dtype=np.float32)
+
+    model = LinearSafetyModel.empty().fit(texts[:cut], targets[:cut], seed=seed, **fit_args)
+    report = {}
+    if cut < len(texts):
+        predicted = model.score_batch(texts[cut:]) >= 0.5
+        actual = targets[cut:] >= 0.5
+        for j, label in enumerate(LABELS):
+            tp = int((predicted[:, j] & actual[:, j]).sum())
+            report[label] = {
+                "precision": round(tp / max(1, int(predicted[:, j].sum())), 3),
+                "recall": round(tp / max(1, int(actual[:, j].sum())), 3),
+                "support": int(actual[:, j].sum())
+            }
+    return model, report
+
+
+# Global instance
+safety_model = None
+_loaded = False
+
+def get_safety_model():
+    """Load the trained model once; None when no model file has been built"""
+    global safety_model, _loaded
+    if not _loaded:
+        _loaded = True
+        if SAFETY_MODEL_PATH.exists():
+            try:
+                safety_model = LinearSafetyModel.load(SAFETY_MODEL_PATH)
+            except Exception as e:
+                print(f"Safety model load error: {e}")
+    return safety_model
+
+
+def _main(argv):
+    parser = argparse.ArgumentParser(prog="python -m app.safety_model")
+    commands = parser.add_subparsers(dest="command", required=True)
+    train = commands.add_parser("train", help="train and write SAFETY_MODEL_PATH")
+    train.add_argument("--data", action="append", default=[], help="labeled JSONL (repeatable)")
+    train.add_argument("--no-bootstrap", action="store_true", help="skip keyword-generated examples")
+    train.add_argument("--epochs", type=int, default=12)
+    train.add_argument("--out", default=str(SAFETY_MODEL_PATH))
+    score = commands.add_parser("score", help="score one question per line (or JSONL with 'question')")
+    score.add_argument("input", nargs="?", default="-")
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        examples = [] if args.no_bootstrap else bootstrap_examples()
+        for path in args.data:
+            examples.extend(load_examples(path))
+        model, report = train_model(examples, epochs=args.epochs)
+        print(f"✅ Trained on {len(examples)} examples -> {model.save(args.out)}")
+        for label, row in report.items():
+            print(f"   {label}: precision {row['precision']}, recall {row['recall']} (n={row['support']})")
+        return
+
+    model = get_safety_model()
+    if model is None:
+        sys.exit(f"No model at {SAFETY_MODEL_PATH}; run: python -m app.safety_model train")
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    questions = []
+    for line in stream:
+        line = line.strip()
+        if line:
+            questions.append(json.loads(line).get("question", "") if line.startswith("{") else line)
+    for question, probabilities in zip(questions, model.score_batch(questions)):
+        row = {label: round(float(p), 4) for label, p in zip(model.labels, probabilities)}
+        print(json.dumps({"question": question, **row}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
@@ -0,0 +1,189 @@
+"""
+Shared Cache
+LMDB-backed cache visible to every worker process on the host
+
+Drop-in for LRUCache (get/set/stats) used when SHARED_CACHE_DIR is set, so
+N uvicorn/gunicorn workers share one copy of answers and synthesized phrases
+instead of N copies with hit rates split N ways. Reads are lock-free LMDB
+snapshots over a memory map; writes serialize on LMDB's writer lock.
+
+Eviction is by write time (oldest first) once max_entries, max_bytes (LMDB pages
+used by this cache's values) or the map size is reached; reads don't write, so
+there is no per-hit bookkeeping.
+"""
+import hashlib
+import os
+import pickle
+import struct
+import threading
+import time
+from pathlib import Path
+
+from .cache import LRUCache
+
+SHARED_CACHE_DIR = os.environ.get("SHARED_CACHE_DIR", "")
+SHARED_CACHE_MB = int(os.environ.get("SHARED_CACHE_MB", "1024"))
+
+_HEADER = struct.Struct(">d")  # stored_at, followed by the pickled value
+_environments = {}
+_environments_pid = None
+
+
+def _open_env(path, map_size):
+    """One LMDB environment per path per process (LMDB handles must not cross fork)"""
+    global _environments_pid
+    import lmdb  # Optional dependency: pip install lmdb
+    if _environments_pid != os.getpid():
+        _environments.clear()
+        _environments_pid = os.getpid()
+    env = _environments.get(path)
+    if env is None:
+        Path(path).mkdir(parents=True, exist_ok=True)
+        env = lmdb.open(path, map_size=map_size, max_dbs=64, subdir=True, lock=True, readahead=False)
+        _environments[path] = env
+    return env
+
+
+class SharedCache:
+    def __init__(self, name, path=SHARED_CACHE_DIR, max_entries=10000, max_bytes=None, ttl=None,
+                 map_size_mb=SHARED_CACHE_MB):
+        self.name = name
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.map_size = map_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+        self._handles = None  # (pid, env, values db, by_time db)
+
+    def _dbs(self):
+        handles = self._handles
+        if handles is None or handles[0] != os.getpid():
+            env = _open_env(self.path, self.map_size)
+            values = env.open_db(f"{self.name}:values".encode())
+            by_time = env.open_db(f"{self.name}:by_time".encode())  # stored_at + key -> b""
+            handles = self._handles = (os.getpid(), env, values, by_time)
+        return handles[1:]
+
+    @staticmethod
+    def _key(key):
+        # Tuple keys (question, lang, profile band) -> fixed-size LMDB key
+        return hashlib.sha1(repr(key).encode("utf-8")).digest()
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, default=None, max_age=None):
+        max_age = self.ttl if max_age is None else max_age
+        env, values, _ = self._dbs()
+        with env.begin(db=values, buffers=True) as txn:
+            raw = txn.get(self._key(key))
+            if raw is None:
+                self._count(False)
+                return default
+            (stored_at,) = _HEADER.unpack_from(raw)
+            if max_age is not None and time.time() - stored_at > max_age:
+                self._count(False)
+                return default
+            value = pickle.loads(raw[_HEADER.size:])
+        self._count(True)
+        return value
+
+    def set(self, key, value):
+        import lmdb
+        env, values, by_time = self._dbs()
+        lmdb_key = self._key(key)
+        now = time.time()
+        payload = _HEADER.pack(now) + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        for _ in range(3):
+            try:
+                with env.begin(write=True) as txn:
+                    old = txn.get(lmdb_key, db=values)
+                    if old is not None:
+                        txn.delete(_HEADER.pack(_HEADER.unpack_from(old)[0]) + lmdb_key, db=by_time)
+                    txn.put(lmdb_key, payload, db=values)
+                    txn.put(_HEADER.pack(now) + lmdb_key, b"", db=by_time)
+                    overflow = txn.stat(values)["entries"] - self.max_entries
+                    if overflow > 0:
+                        self._evict(txn, values, by_time, overflow)
+                    if self.max_bytes:
+                        # Pickled sizes are what count here, so sizeof is not needed
+                        while self._db_bytes(txn, values) > self.max_bytes:
+                            entries = txn.stat(values)["entries"]
+                            if entries <= 1:
+                                break
+                            self._evict(txn, values, by_time, max(1, entries // 10))
+                return
+            except lmdb.MapFullError:
+                # Map is full of bytes rather than entries: make room and retry
+                with env.begin(write=True) as txn:
+                    self._evict(txn, values, by_time, max(1, txn.stat(values)["entries"] // 10))
+
+    def _evict(self, txn, values, by_time, count):
+        oldest = []
+        for index_key in txn.cursor(db=by_time).iternext(values=False):
+            oldest.append(bytes(index_key))
+            if len(oldest) >= count:
+                break
+        for index_key in oldest:
+            txn.delete(index_key[_HEADER.size:], db=values)
+            txn.delete(index_key, db=by_time)
+        removed = len(oldest)
+        with self._stats_lock:
+            self.evictions += removed
+
+    def __contains__(self, key):
+        env, values, _ = self._dbs()
+        with env.begin(db=values) as txn:
+            return txn.get(self._key(key)) is not None
+
+    def __len__(self):
+        env, values, _ = self._dbs()
+        with env.begin() as txn:
+            return txn.stat(values)["entries"]
+
+    def clear(self):
+        env, values, by_time = self._dbs()
+        with env.begin(write=True) as txn:
+            txn.drop(values, delete=False)
+            txn.drop(by_time, delete=False)
+
+    @property
+    def total_bytes(self):
+        env, values, _ = self._dbs()
+        with env.begin() as txn:
+            return self._db_bytes(txn, values)
+
+    @staticmethod
+    def _db_bytes(txn, values):
+        stat = txn.stat(values)
+        return (stat["branch_pages"] + stat["leaf_pages"] + stat["overflow_pages"]) * stat["psize"]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def shared_cache_enabled():
+    return bool(SHARED_CACHE_DIR)
+
+
+def make_cache(name, max_entries=1024, max_bytes=None, sizeof=None, ttl=None):
+    """SharedCache in multi-worker mode (SHARED_CACHE_DIR set), otherwise an in-process LRUCache"""
+    if shared_cache_enabled():
+        return SharedCache(name, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+    return LRUCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=sizeof, ttl=ttl)
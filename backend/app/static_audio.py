@@ -0,0 +1,133 @@
+"""
+Pre-rendered Static Audio
+Versioned bundle of audio for every static response a request can return: the
+crisis helpline response (served by /ask with no synthesis delay) and the model
+fallbacks (degraded answers)
+
+Build (from backend/):  python -m app.static_audio build
+"""
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from .fallbacks import FALLBACK_RESPONSES
+from .safety import SafetyFilter
+from .tts import LANG_MAP, TTSEngine, get_tts_engine
+
+BUNDLE_ROOT = Path(os.environ.get("STATIC_AUDIO_DIR", Path(__file__).parent.parent / "assets" / "static_audio"))
+
+
+def _text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def static_responses():
+    """Every (response_id, lang, voice, text) that a request can return without generation"""
+    # Mental-health and out-of-scope scripts are not served (keyword scope checks
+    # refused ordinary questions), so they aren't rendered either
+    english_only = {"crisis": SafetyFilter().get_crisis_response()}
+
+    for lang in LANG_MAP:
+        # Safety texts are English everywhere, so they are spoken with the English voice
+        for response_id, text in english_only.items():
+            yield response_id, lang, "en", text
+        localized = FALLBACK_RESPONSES.get(lang, {})
+        for key, text in FALLBACK_RESPONSES["en"].items():
+            if key in localized:
+                yield f"fallback_{key}", lang, lang, localized[key]
+            else:
+                yield f"fallback_{key}", lang, "en", text
+
+
+def bundle_version(engine):
+    """Changes whenever any text, the TTS backend or the output format changes"""
+    digest = hashlib.sha256(f"{engine.backend.name}|{engine.output_format}|{engine.bitrate}".encode())
+    for response_id, lang, voice, text in static_responses():
+        digest.update(f"{response_id}|{lang}|{voice}|{text}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def build_bundle(engine: TTSEngine = None, root: Path = BUNDLE_ROOT):
+    """Synthesize all static responses into root/<version>/ with a manifest"""
+    engine = engine or get_tts_engine()
+    version = bundle_version(engine)
+    bundle_dir = Path(root) / version
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {"version": version, "format": engine.output_format, "entries": {}}
+    rendered = {}  # the same text (e.g. safety responses) is rendered once per voice
+
+    for response_id, lang, voice, text in static_responses():
+        key = (voice, _text_hash(text))
+        if key not in rendered:
+            audio = engine.synthesize(text, voice)
+            filename = f"{voice}_{key[1]}.{engine.extension}"
+            (bundle_dir / filename).write_bytes(audio)
+            rendered[key] = filename
+            print(f"  🔊 {response_id} [{voice}] -> {filename}")
+        manifest["entries"][f"{lang}:{_text_hash(text)}"] = {
+            "id": response_id,
+            "file": rendered[key]
+        }
+
+    with open(bundle_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return bundle_dir
+
+
+class StaticAudioBundle:
+    """In-memory audio for static responses, looked up by (language, response text)"""
+
+    def __init__(self, version=None, media_type="audio/mpeg", files=None, entries=None):
+        self.version = version
+        self.media_type = media_type
+        self.files = files or {}      # filename -> bytes
+        self.entries = entries or {}  # "lang:text_hash" -> filename
+
+    @classmethod
+    def load(cls, engine: TTSEngine = None, root: Path = BUNDLE_ROOT):
+        engine = engine or get_tts_engine()
+        version = bundle_version(engine)
+        manifest_path = Path(root) / version / "manifest.json"
+        if not manifest_path.exists():
+            print(f"Static audio bundle {version} not built - static responses will be synthesized on demand")
+            return cls()
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        files = {
+            entry["file"]: (manifest_path.parent / entry["file"]).read_bytes()
+            for entry in manifest["entries"].values()
+        }
+        entries = {key: entry["file"] for key, entry in manifest["entries"].items()}
+        print(f"Loaded static audio bundle {version} ({len(files)} clips)")
+        return cls(version, engine.media_type, files, entries)
+
+    def lookup(self, text, lang):
+        """Filename of the pre-rendered clip for this exact text, or None"""
+        return self.entries.get(f"{lang}:{_text_hash(text)}")
+
+    def audio(self, filename):
+        return self.files.get(filename)
+
+
+# Global instance
+static_bundle = None
+
+def get_static_bundle():
+    """Get or load the static audio bundle"""
+    global static_bundle
+    if static_bundle is None:
+        static_bundle = StaticAudioBundle.load()
+    return static_bundle
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("Usage: python -m app.static_audio build")
+        sys.exit(1)
+    print("🎙️ Pre-rendering static responses...")
+    output = build_bundle()
+    print(f"✅ Bundle written to {output}")
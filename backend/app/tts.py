@@ -1,23 +1,204 @@
+"""
+Text-to-Speech
+Pluggable TTS backends (gTTS or offline Piper) with a sentence-level audio cache
+"""
 from gtts import gTTS
+import io
 import os
+import re
+import subprocess
+import wave
+
+from .shared_cache import make_cache
+from .metrics import metrics, stage_timer, cache_collector
+
+# Map language codes
+LANG_MAP = {
+    "en": "en",
+    "hi": "hi",
+    "kn": "kn"  # Kannada supported by gTTS
+}
+
+AUDIO_MEDIA_TYPES = {
+    "mp3": "audio/mpeg",
+    "opus": "audio/ogg",
+    "wav": "audio/wav"
+}
+
+AUDIO_EXTENSIONS = {
+    "mp3": "mp3",
+    "opus": "ogg",
+    "wav": "wav"
+}
+
+# Sentence boundaries in English, Hindi (danda) and Kannada text
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?।])\s+|\n+")
+
+
+def split_sentences(text):
+    return [part.strip() for part in SENTENCE_SPLIT.split(text) if part and part.strip()]
+
+
+class TTSBackend:
+    """Synthesizes one sentence into audio bytes of `native_format`"""
+    name = "base"
+    native_format = "mp3"
+
+    def synthesize(self, text, lang):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS - needs network access"""
+    name = "gtts"
+    native_format = "mp3"
+
+    def synthesize(self, text, lang):
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=LANG_MAP.get(lang, "en"), slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class PiperBackend(TTSBackend):
+    """Offline neural TTS on CPU via Piper voices (PIPER_VOICE_EN/HI/KN = .onnx paths)"""
+    name = "piper"
+    native_format = "wav"
+
+    def __init__(self, voice_paths=None):
+        self.voice_paths = voice_paths or {
+            lang: os.environ.get(f"PIPER_VOICE_{lang.upper()}", "")
+            for lang in LANG_MAP
+        }
+        self._voices = {}
+
+    def _voice(self, lang):
+        path = self.voice_paths.get(lang) or self.voice_paths.get("en")
+        if not path:
+            raise RuntimeError(f"No Piper voice configured for '{lang}'")
+        if path not in self._voices:
+            from piper import PiperVoice  # Optional dependency: pip install piper-tts
+            self._voices[path] = PiperVoice.load(path)
+        return self._voices[path]
+
+    def synthesize(self, text, lang):
+        voice = self._voice(lang)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            if hasattr(voice, "synthesize_wav"):
+                voice.synthesize_wav(text, wav_file)
+            else:
+                voice.synthesize(text, wav_file)
+        return buffer.getvalue()
+
+
+def concat_audio(segments, audio_format):
+    """Join per-sentence segments into one clip"""
+    if audio_format == "mp3":
+        # MP3 is a stream of self-contained frames, so byte concatenation plays fine
+        return b"".join(segments)
+
+    output = io.BytesIO()
+    with wave.open(output, "wb") as out:
+        for i, segment in enumerate(segments):
+            with wave.open(io.BytesIO(segment), "rb") as part:
+                if i == 0:
+                    out.setparams(part.getparams())
+                out.writeframes(part.readframes(part.getnframes()))
+    return output.getvalue()
+
+
+def encode_audio(data, source_format, target_format="mp3", bitrate=None):
+    """Re-encode to mp3/opus at a bitrate with ffmpeg; passthrough when nothing changes"""
+    if target_format == source_format and not bitrate:
+        return data
+
+    codec = {"mp3": ("libmp3lame", "mp3"), "opus": ("libopus", "ogg"), "wav": ("pcm_s16le", "wav")}
+    encoder, container = codec[target_format]
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error",
+               "-f", source_format, "-i", "pipe:0", "-c:a", encoder]
+    if bitrate and target_format != "wav":
+        command += ["-b:a", bitrate]
+    command += ["-f", container, "pipe:1"]
+
+    result = subprocess.run(command, input=data, capture_output=True, check=True)
+    return result.stdout
+
+
+class TTSEngine:
+    """Sentence-cached synthesis: recurring sentences are synthesized once, then concatenated"""
+
+    def __init__(self, backend, output_format="mp3", bitrate=None, cache_mb=64):
+        self.backend = backend
+        self.output_format = output_format
+        self.bitrate = bitrate
+        self.phrase_cache = make_cache(
+            "tts_phrase",
+            max_entries=20000,
+            max_bytes=cache_mb * 1024 * 1024,
+            sizeof=len
+        )
+        metrics.register_collector(cache_collector("tts_phrase", self.phrase_cache.stats))
+
+    @property
+    def media_type(self):
+        return AUDIO_MEDIA_TYPES[self.output_format]
+
+    @property
+    def extension(self):
+        return AUDIO_EXTENSIONS[self.output_format]
+
+    def _sentence(self, sentence, lang):
+        key = (self.backend.name, lang, sentence)
+        audio = self.phrase_cache.get(key)
+        if audio is None:
+            audio = self.backend.synthesize(sentence, lang)
+            self.phrase_cache.set(key, audio)
+        return audio
+
+    def synthesize(self, text, lang="en"):
+        """Full text to audio bytes in the configured output format"""
+        # Unknown languages are voiced in English; label and cache keys follow
+        # suit so client input can't mint unbounded metric series
+        lang = lang if lang in LANG_MAP else "en"
+        with stage_timer("tts_synthesize", lang=lang, backend=self.backend.name):
+            segments = [self._sentence(sentence, lang) for sentence in split_sentences(text)]
+            if not segments:
+                return None
+            audio = concat_audio(segments, self.backend.native_format)
+            return encode_audio(audio, self.backend.native_format, self.output_format, self.bitrate)
+
+
+# Global instance
+tts_engine = None
+
+def get_tts_engine():
+    """Get or create the TTS engine (TTS_BACKEND=gtts|piper, TTS_FORMAT=mp3|opus)"""
+    global tts_engine
+    if tts_engine is None:
+        backend_name = os.environ.get("TTS_BACKEND", "gtts")
+        backend = PiperBackend() if backend_name == "piper" else GTTSBackend()
+        tts_engine = TTSEngine(
+            backend,
+            output_format=os.environ.get("TTS_FORMAT", "mp3"),
+            bitrate=os.environ.get("TTS_BITRATE") or None,
+            cache_mb=int(os.environ.get("TTS_PHRASE_CACHE_MB", "64"))
+        )
+    return tts_engine
+
 
 def tts_synthesize(text, lang="en", output_path="out/speech.mp3"):
     """Convert text to speech"""
     try:
-        os.makedirs("out", exist_ok=True)
-        
-        # Map language codes
-        lang_map = {
-            "en": "en",
-            "hi": "hi",
-            "kn": "kn"  # Kannada supported by gTTS
-        }
-        
-        tts_lang = lang_map.get(lang, "en")
-        tts = gTTS(text=text, lang=tts_lang, slow=False)
-        tts.save(output_path)
-        
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        audio = get_tts_engine().synthesize(text, lang)
+        if audio is None:
+            return None
+        with open(output_path, "wb") as f:
+            f.write(audio)
+
         return output_path
     except Exception as e:
+        metrics.counter("upstream_errors_total", upstream="tts").inc()
         print(f"TTS Error: {e}")
         return None
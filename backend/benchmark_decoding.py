@@ -0,0 +1,74 @@
+"""
+Decoding Profile Benchmark
+Compares latency and answer quality of FinLitModel decoding profiles
+"""
+import sys
+sys.path.append('.')
+
+import time
+import statistics
+from rouge_score import rouge_scorer
+
+from app.model_server import FinLitModel, DECODING_PROFILES, is_valid_response
+
+# Questions paired with a reference answer for quality scoring
+BENCHMARK_SET = [
+    ("en", "What is an asset?",
+     "An asset is anything valuable you own that can make money or increase in value over time."),
+    ("en", "What is a SIP?",
+     "SIP allows investing a fixed amount regularly in mutual funds."),
+    ("en", "How much should I save every month?",
+     "Save at least 20% of your income every month and build an emergency fund first."),
+    ("en", "What is an EMI?",
+     "EMI is a fixed amount you pay every month to repay a loan, made of principal and interest."),
+    ("hi", "EMI क्या है?",
+     "EMI लोन चुकाने के लिए हर महीने दी जाने वाली fixed राशि है।"),
+]
+
+RUNS_PER_QUESTION = 3
+
+print("⏱️ Benchmarking decoding profiles...")
+print("=" * 60)
+
+model = FinLitModel()
+scorer = rouge_scorer.RougeScorer(['rougeL'], use_stemmer=True)
+
+results = {}
+
+for profile in DECODING_PROFILES:
+    latencies = []
+    rouge = []
+    model_answers = 0
+
+    # Warm-up call so the first profile isn't penalised
+    model.generate("What is a budget?", profile=profile)
+
+    for lang, question, reference in BENCHMARK_SET:
+        for _ in range(RUNS_PER_QUESTION):
+            start = time.perf_counter()
+            answer = model.generate(question, lang=lang, profile=profile)
+            latencies.append(time.perf_counter() - start)
+
+            if answer != model.get_fallback_response(question, lang) and is_valid_response(answer):
+                model_answers += 1
+            rouge.append(scorer.score(reference, answer)['rougeL'].fmeasure)
+
+    latencies.sort()
+    total = len(latencies)
+    results[profile] = {
+        "p50_ms": latencies[total // 2] * 1000,
+        "p95_ms": latencies[min(total - 1, int(total * 0.95))] * 1000,
+        "throughput_qps": total / sum(latencies),
+        "rougeL": statistics.mean(rouge),
+        "model_answer_rate": model_answers / total,
+    }
+
+print(f"\n{'Profile':<12}{'p50 ms':>10}{'p95 ms':>10}{'q/s':>8}{'ROUGE-L':>10}{'Model %':>10}")
+print("-" * 60)
+for profile, stats in results.items():
+    print(f"{profile:<12}{stats['p50_ms']:>10.0f}{stats['p95_ms']:>10.0f}"
+          f"{stats['throughput_qps']:>8.2f}{stats['rougeL']:>10.3f}"
+          f"{stats['model_answer_rate'] * 100:>9.0f}%")
+
+print("\n✅ Benchmark complete!")
+print("Pick a profile with FINLIT_DECODING_PROFILE=<name>")
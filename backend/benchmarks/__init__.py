@@ -0,0 +1,4 @@
+"""
+Benchmark Suite
+Local stand-ins (mock Groq, fake TTS, fixture feeds) plus load and micro benchmarks
+"""
@@ -0,0 +1,95 @@
+"""
+Benchmark Baselines
+Stores results in baselines.json and fails loudly when a run regresses
+
+With --require-baseline (or BENCH_REQUIRE_BASELINE=1, for CI) a suite or
+benchmark that has no recorded baseline is a failure too, not a warning.
+"""
+import json
+import os
+from pathlib import Path
+
+BASELINE_FILE = Path(__file__).parent / "baselines.json"
+
+# Allowed slowdown before a run counts as a regression
+DEFAULT_TOLERANCE = 1.25
+REQUIRE_BASELINE = os.environ.get("BENCH_REQUIRE_BASELINE", "0") == "1"
+
+
+def load_baselines():
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_baselines(suite, results):
+    baselines = load_baselines()
+    baselines[suite] = results
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+    print(f"💾 Baseline for '{suite}' saved to {BASELINE_FILE.name}")
+
+
+def compare(suite, results, tolerance=DEFAULT_TOLERANCE, require=REQUIRE_BASELINE):
+    """
+    Compare {name: {"p50_ms": ..., "throughput": ...}} against the stored baseline.
+    Latency may grow by `tolerance`x, throughput may shrink by 1/`tolerance`x.
+    Returns a list of regression messages; with `require`, missing baselines are ones too.
+    """
+    baseline = load_baselines().get(suite)
+    if not baseline:
+        if require:
+            return [f"no baseline for suite '{suite}' - record one with --update-baseline"]
+        print(f"⚠️ No baseline for '{suite}' yet - run with --update-baseline to record one")
+        return []
+
+    regressions = []
+    if require:
+        regressions.extend(f"{name}: in the baseline but not measured" for name in baseline if name not in results)
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            if require:
+                regressions.append(f"{name}: no baseline recorded")
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            if metric in previous and current.get(metric, 0) > previous[metric] * tolerance:
+                regressions.append(
+                    f"{name}: {metric} {current[metric]:.3f} > {previous[metric]:.3f} x {tolerance}"
+                )
+        if "throughput" in previous and current.get("throughput", 0) < previous["throughput"] / tolerance:
+            regressions.append(
+                f"{name}: throughput {current['throughput']:.1f} < {previous['throughput']:.1f} / {tolerance}"
+            )
+    return regressions
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def report(suite, results, update_baseline=False, tolerance=DEFAULT_TOLERANCE, require=REQUIRE_BASELINE):
+    """Print a results table, then save or compare; returns the process exit code"""
+    print(f"\n{'Benchmark':<32}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}")
+    print("-" * 74)
+    for name, stats in results.items():
+        print(f"{name:<32}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}"
+              f"{stats['p99_ms']:>10.3f}{stats['throughput']:>12.1f}")
+
+    if update_baseline:
+        save_baselines(suite, results)
+        return 0
+
+    regressions = compare(suite, results, tolerance, require)
+    if regressions:
+        print("\n❌ PERFORMANCE REGRESSION:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print("\n✅ No regressions against baseline")
+    return 0
@@ -0,0 +1,163 @@
+"""
+End-to-End Load Benchmark
+Drives /ask, /news and /audio in-process against the mock upstream and a fake TTS
+
+Usage (from backend/):
+    python -m benchmarks.load --concurrency 16 --requests 200
+    python -m benchmarks.load --update-baseline
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .baseline import REQUIRE_BASELINE, percentile, report
+from .mock_server import start_mock_server
+
+QUESTIONS = [
+    "What is an asset?",
+    "How much should I save every month?",
+    "Explain EMI simply",
+    "What is a SIP?",
+    "How do I build an emergency fund?",
+    "Is term insurance worth it?",
+    "How can I improve my credit score?",
+    "What is the 50-30-20 budget rule?",
+]
+
+FAKE_MP3 = b"\xff\xfb\x90\x64" + b"\x00" * 413  # One silent MPEG frame
+FIXED_MARKET = {"sensex": "₹80000.00", "nifty": "₹24000.00", "usd_inr": "83.00", "gold": "Check live rates"}
+
+
+def make_fake_tts_backend(latency_ms):
+    from app.tts import TTSBackend
+
+    class FakeTTSBackend(TTSBackend):
+        """Stands in for gTTS: fixed per-sentence latency, returns one silent frame"""
+        name = "fake"
+        native_format = "mp3"
+
+        def synthesize(self, text, lang):
+            time.sleep(latency_ms / 1000)
+            return FAKE_MP3
+
+    return FakeTTSBackend()
+
+
+def configure_environment(args):
+    """Must run before app.main is imported"""
+    server, base_url = start_mock_server(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms)
+    os.environ["GROQ_BASE_URL"] = base_url
+    os.environ["GROQ_API_KEY"] = "mock-key"
+    os.environ["NEWS_API_URL"] = f"{base_url}/v2/top-headlines"
+    os.environ["NEWS_API_KEY"] = "mock-key"
+    # The benchmark is a single client - don't let per-client limits cap it
+    os.environ["ASK_RATE_PER_CLIENT"] = "100000"
+    os.environ["ASK_BURST"] = "100000"
+    # Startup runs for real, but must not crawl live circular feeds or write into out/
+    os.environ["CIRCULARS_REFRESH_MINUTES"] = "0"
+    os.environ["PREWARM_ON_STARTUP"] = "0"
+    os.environ["ANALYTICS_DIR"] = tempfile.mkdtemp(prefix="bench-analytics-")
+    return server, base_url
+
+
+def use_fixture_news(broadcaster, base_url):
+    """News refresher reads the fixture RSS feeds from the mock server, never the live ones"""
+    service = broadcaster.service
+    service.rss_feeds = {"rbi": f"{base_url}/rss/rbi.xml", "sebi": f"{base_url}/rss/sebi.xml"}
+    service.cache_file = Path(tempfile.mkdtemp(prefix="bench-news-")) / "news_cache.json"
+    service.get_indian_financial_summary = lambda: dict(FIXED_MARKET)
+
+
+async def drive(client, method, path, total, concurrency, body_for=None):
+    """Issue `total` requests with at most `concurrency` in flight; returns stats"""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            kwargs = {"json": body_for(i)} if body_for else {}
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput": total / wall,
+        "errors": errors,
+    }
+
+
+async def run(args, base_url):
+    import httpx
+    import app.tts as tts
+    import app.main as main
+
+    # Fake TTS in place of network gTTS
+    tts.tts_engine = tts.TTSEngine(make_fake_tts_backend(args.tts_latency_ms))
+    use_fixture_news(main.news_broadcaster, base_url)
+
+    def ask_body(i):
+        question = QUESTIONS[0] if args.same_question else QUESTIONS[i % len(QUESTIONS)]
+        return {"question": question, "language": ["en", "hi", "kn"][i % 3]}
+
+    # ASGITransport sends no lifespan events, so run startup/shutdown (news refresher,
+    # job workers, analytics sink) ourselves, as uvicorn would
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        # Warm-up so connection pools, lazy singletons and the first news snapshot don't skew the first run
+        await client.post("/ask", json=ask_body(0))
+        await asyncio.wait_for(main.news_broadcaster.ready.wait(), timeout=main.NEWS_FIRST_LOAD_TIMEOUT)
+
+        results = {}
+        results["ask"] = await drive(client, "POST", "/ask", args.requests, args.concurrency, ask_body)
+        results["news"] = await drive(client, "GET", "/news?lang=en", args.requests, args.concurrency)
+        results["audio"] = await drive(client, "GET", "/audio/speech.mp3", args.requests, args.concurrency)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FinShiksha end-to-end load benchmark")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--tts-latency-ms", type=float, default=50.0, help="Per sentence")
+    parser.add_argument("--same-question", action="store_true", help="Exercise request coalescing")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    parser.add_argument("--require-baseline", action="store_true", help="fail when no baseline is recorded")
+    args = parser.parse_args()
+
+    server, base_url = configure_environment(args)
+    print(f"⏱️ Load benchmark: {args.requests} requests/endpoint at concurrency {args.concurrency}")
+    try:
+        results = asyncio.run(run(args, base_url))
+    finally:
+        server.shutdown()
+
+    for name, stats in results.items():
+        if stats["errors"]:
+            print(f"⚠️ {name}: {stats['errors']} error responses")
+
+    suite = f"load_c{args.concurrency}"
+    sys.exit(report(suite, results, args.update_baseline, args.tolerance, args.require_baseline or REQUIRE_BASELINE))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Mock Upstream Server
+Groq chat completions, NewsAPI and RSS feeds served locally with configurable latency
+
+Run standalone:  python -m benchmarks.mock_server --port 9000 --latency-ms 400
+Then point the backend at it:  GROQ_BASE_URL=http://127.0.0.1:9000
+                               NEWS_API_URL=http://127.0.0.1:9000/v2/top-headlines
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+MOCK_ANSWER = (
+    "💡 Start by saving at least 20% of your income every month.\n\n"
+    "• Build an emergency fund of 6 months of expenses\n"
+    "• Start a SIP in a diversified index fund\n"
+    "• Keep total EMI below 40% of income"
+)
+
+
+class MockConfig:
+    latency_ms = 300.0
+    jitter_ms = 100.0
+    error_rate = 0.0
+
+
+def _delay():
+    latency = MockConfig.latency_ms + random.uniform(-MockConfig.jitter_ms, MockConfig.jitter_ms)
+    time.sleep(max(0.0, latency) / 1000)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send(self, status, body, content_type="application/json"):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.endswith("/chat/completions"):
+            return self._send(404, {"error": {"message": "not found"}})
+
+        _delay()
+        if random.random() < MockConfig.error_rate:
+            return self._send(503, {"error": {"message": "mock overload", "type": "server_error"}})
+
+        self._send(200, {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": MOCK_ANSWER},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 180, "completion_tokens": 60, "total_tokens": 240}
+        })
+
+    def do_GET(self):
+        if self.path.startswith("/v2/top-headlines"):
+            _delay()
+            return self._send(200, (FIXTURES_DIR / "newsapi.json").read_bytes())
+
+        if self.path.startswith("/rss/"):
+            feed = FIXTURES_DIR / Path(self.path).name
+            if feed.suffix == ".xml" and feed.exists():
+                return self._send(200, feed.read_bytes(), "application/rss+xml")
+
+        self._send(404, {"error": "not found"})
+
+
+def start_mock_server(port=0, latency_ms=300.0, jitter_ms=100.0, error_rate=0.0):
+    """Start in a daemon thread; returns (server, base_url)"""
+    MockConfig.latency_ms = latency_ms
+    MockConfig.jitter_ms = jitter_ms
+    MockConfig.error_rate = error_rate
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Groq/NewsAPI/RSS server")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, url = start_mock_server(args.port, args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"🧪 Mock upstream running at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,45 @@
+"""
+Multi-worker deployment (Linux/macOS)
+
+    pip install gunicorn lmdb
+    SHARED_CACHE_DIR=out/shared_cache gunicorn app.main:app -c gunicorn.conf.py
+
+The app is imported once in the master before forking, so the safety tables,
+static audio bundle, circulars index and (with PRELOAD_LOCAL_MODEL=1) the
+registry's default local model are shared copy-on-write by every worker. Answer
+and TTS phrase caches and the artifact index live in one LMDB map under SHARED_CACHE_DIR.
+Conversation sessions stay per process, so put a sticky load balancer in
+front when clients send session_id.
+"""
+import gc
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", str(max(2, (os.cpu_count() or 2)))))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+graceful_timeout = 30
+
+# Keep the cyclic GC from touching (and thereby copying) preloaded objects
+gc.disable()
+
+
+def when_ready(server):
+    if os.environ.get("PRELOAD_LOCAL_MODEL", "0") == "1":
+        from app.model_server import get_model
+        get_model()
+        server.log.info("Preloaded the default local model for copy-on-write sharing")
+    # Everything allocated so far moves to a permanent generation the GC never scans
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    threads = os.environ.get("TORCH_THREADS_PER_WORKER")
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(int(threads))
+        except ImportError:
+            pass
@@ -17,11 +17,41 @@ function NewsTicker() {
   const [loading, setLoading] = useState(true);
   const [currentIndex, setCurrentIndex] = useState(0);
   const [error, setError] = useState<string>('');
+  const received = useRef(false);
 
   useEffect(() => {
-    fetchNews();
-    const interval = setInterval(fetchNews, 1800000);
-    return () => clearInterval(interval);
+    if (typeof EventSource === 'undefined') {
+      fetchNews();
+      const interval = setInterval(fetchNews, 1800000);
+      return () => clearInterval(interval);
+    }
+
+    // Server pushes a snapshot, then only what changed
+    const source = new EventSource(`${API_BASE_URL}/news/stream`);
+    source.addEventListener('snapshot', (event) => {
+      received.current = true;
+      setNews(JSON.parse((event as MessageEvent).data));
+      setLoading(false);
+      setError('');
+    });
+    source.addEventListener('articles', (event) => {
+      const diff = JSON.parse((event as MessageEvent).data);
+      setNews((prev: any) => {
+        if (!prev) return prev;
+        const removed = new Set(diff.removed);
+        const kept = (prev.breaking_news || []).filter((item: any) => !removed.has(item.url));
+        return { ...prev, breaking_news: [...diff.added, ...kept].slice(0, 5) };
+      });
+    });
+    source.addEventListener('market', (event) => {
+      const changed = JSON.parse((event as MessageEvent).data);
+      setNews((prev: any) => prev && { ...prev, market_summary: { ...prev.market_summary, ...changed } });
+    });
+    // EventSource reconnects on its own; fall back to one fetch if nothing arrived yet
+    source.onerror = () => {
+      if (!received.current) fetchNews();
+    };
+    return () => source.close();
   }, []);
 
   useEffect(() => {
@@ -37,6 +67,7 @@ function NewsTicker() {
     try {
       const res = await fetch(`${API_BASE_URL}/news?lang=en`);
       const data = await res.json();
+      received.current = true;
       setNews(data);
       setLoading(false);
       setError('');
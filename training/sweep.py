@@ -0,0 +1,361 @@
+"""
+Hyperparameter Sweep for FinLit AI
+Successive halving over learning rate, batch size, max length and weight decay
+
+Trials run concurrently in a process pool sized to the CPU cores
+(cores // SWEEP_THREADS_PER_TRIAL workers). Every trial first trains for a
+fraction of an epoch; only the best 1/eta by eval loss continue, with eta
+times the budget, until the survivors reach --epochs. Surviving trials resume
+from their own checkpoint, so no step is trained twice.
+
+The dataset is tokenized once per max length into an on-disk Arrow cache
+that every worker memory-maps, instead of each trial re-tokenizing it (keyed
+by a hash of the CSV, so an edited dataset is re-tokenized). Trials
+train on their own max length but are all evaluated on the test split at the
+sweep's longest max length, so eval losses cover the same label tokens and
+compare across lengths. Trial checkpoints start fresh on every sweep, so a
+rerun never resumes another configuration's weights.
+
+Results are ranked by eval loss (trials that got further first) and also
+report ROUGE-L per CPU-hour, the quality bought per unit of compute.
+
+    python training/sweep.py --trials 12 --eta 3 --epochs 3
+    python training/sweep.py --trials 12 --promote   # copy the winner to models/finlit_model
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+# Configuration (paths and split match train_model.py)
+BASE_DIR = Path(__file__).parent.parent
+DATASETS_DIR = BASE_DIR / "datasets"
+MODELS_DIR = BASE_DIR / "models"
+OUTPUTS_DIR = BASE_DIR / "outputs"
+SWEEP_DIR = OUTPUTS_DIR / "sweep"
+TOKEN_CACHE_DIR = SWEEP_DIR / "tokenized"
+
+MODEL_NAME = "google/flan-t5-small"
+DATA_PATH = DATASETS_DIR / "comprehensive_financial_literacy.csv"
+THREADS_PER_TRIAL = int(os.environ.get("SWEEP_THREADS_PER_TRIAL", "2"))
+
+SEARCH_SPACE = {
+    "learning_rate": [1e-4, 3e-4, 5e-4, 1e-3],
+    "batch_size": [2, 4, 8],
+    "max_length": [128, 256, 512],
+    "weight_decay": [0.0, 0.01],
+}
+
+
+def load_splits():
+    df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
+    train_df, test_df = train_test_split(df, test_size=0.15, random_state=42)
+    return train_df.reset_index(drop=True), test_df.reset_index(drop=True)
+
+
+def dataset_hash():
+    """Short content hash of the CSV, so tokenized caches follow dataset edits"""
+    digest = hashlib.sha256()
+    with open(DATA_PATH, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def token_cache_path(max_length, data_hash):
+    return TOKEN_CACHE_DIR / f"{MODEL_NAME.replace('/', '_')}-{data_hash}-{max_length}"
+
+
+def build_token_cache(train_df, test_df, max_lengths, data_hash):
+    """Tokenize once per max length; workers load_from_disk (memory-mapped, shared page cache)"""
+    from datasets import Dataset, DatasetDict
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    for max_length in sorted(set(max_lengths)):
+        path = token_cache_path(max_length, data_hash)
+        if path.exists():
+            print(f"♻️  Tokenized cache hit: {path.name}")
+            continue
+
+        def preprocess(examples):
+            # No padding here: the collator pads per batch, so short answers don't cost 512 tokens
+            model_inputs = tokenizer(examples['input'], max_length=max_length, truncation=True)
+            labels = tokenizer(text_target=examples['output'], max_length=max_length, truncation=True)
+            model_inputs['labels'] = labels['input_ids']
+            return model_inputs
+
+        splits = DatasetDict({
+            "train": Dataset.from_pandas(train_df[['input', 'output']]),
+            "test": Dataset.from_pandas(test_df[['input', 'output']]),
+        })
+        splits = splits.map(preprocess, batched=True, remove_columns=['input', 'output'])
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        splits.save_to_disk(str(tmp))
+        os.replace(tmp, path)
+        print(f"✅ Tokenized cache built: {path.name}")
+
+
+def sample_trials(count, seed):
+    grid = [dict(zip(SEARCH_SPACE, values)) for values in itertools.product(*SEARCH_SPACE.values())]
+    random.Random(seed).shuffle(grid)
+    return [dict(config, id=f"t{i:02d}") for i, config in enumerate(grid[:count])]
+
+
+def rung_budgets(min_fraction, eta, max_epochs):
+    """Epoch budgets per rung, e.g. 0.25, 0.75, 2.25, 3 for eta=3 and 3 epochs"""
+    budgets = []
+    budget = min_fraction
+    while budget < max_epochs:
+        budgets.append(budget)
+        budget *= eta
+    budgets.append(max_epochs)
+    return budgets
+
+
+def _init_worker(threads):
+    import torch
+    torch.set_num_threads(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+
+def _latest_checkpoint(trial_dir):
+    checkpoints = sorted(trial_dir.glob("checkpoint-*"), key=lambda p: int(p.name.split("-")[-1]))
+    return checkpoints[-1] if checkpoints else None
+
+
+def run_rung(trial, epochs, seed, eval_max_length, data_hash):
+    """Train one trial up to `epochs` total (resuming its checkpoint) and evaluate"""
+    from datasets import load_from_disk
+    from transformers import (
+        AutoTokenizer, AutoModelForSeq2SeqLM, Seq2SeqTrainingArguments, Seq2SeqTrainer, DataCollatorForSeq2Seq
+    )
+
+    cpu_start, wall_start = time.process_time(), time.time()
+    trial_dir = SWEEP_DIR / "trials" / trial["id"]
+    splits = load_from_disk(str(token_cache_path(trial["max_length"], data_hash)))
+    # Shorter max lengths truncate the labels too: score everyone on the same tokens
+    eval_split = load_from_disk(str(token_cache_path(eval_max_length, data_hash)))["test"]
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
+
+    steps_per_epoch = math.ceil(len(splits["train"]) / trial["batch_size"])
+    max_steps = max(1, math.ceil(epochs * steps_per_epoch))
+    args = Seq2SeqTrainingArguments(
+        output_dir=str(trial_dir),
+        learning_rate=trial["learning_rate"],
+        # Constant LR so a resumed trial continues the same schedule it started
+        lr_scheduler_type="constant",
+        per_device_train_batch_size=trial["batch_size"],
+        per_device_eval_batch_size=8,
+        weight_decay=trial["weight_decay"],
+        max_steps=max_steps,
+        save_strategy="steps",
+        save_steps=max_steps,
+        save_total_limit=1,
+        eval_strategy="no",
+        logging_steps=50,
+        report_to="none",
+        seed=seed,
+    )
+    trainer = Seq2SeqTrainer(
+        model=model,
+        args=args,
+        train_dataset=splits["train"],
+        eval_dataset=eval_split,
+        tokenizer=tokenizer,
+        data_collator=DataCollatorForSeq2Seq(tokenizer, model=model, padding=True),
+    )
+    resume = _latest_checkpoint(trial_dir)
+    trainer.train(resume_from_checkpoint=str(resume) if resume else None)
+    eval_loss = trainer.evaluate()["eval_loss"]
+    return {
+        "trial": trial["id"],
+        "epochs": epochs,
+        "steps": max_steps,
+        "eval_loss": float(eval_loss),
+        "eval_max_length": eval_max_length,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "wall_seconds": time.time() - wall_start,
+    }
+
+
+def score_rouge(trial, samples):
+    """Mean ROUGE-L F1 of greedy answers from the trial's latest checkpoint"""
+    import torch
+    from rouge_score import rouge_scorer
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    checkpoint = _latest_checkpoint(SWEEP_DIR / "trials" / trial["id"])
+    tokenizer = AutoTokenizer.from_pretrained(str(checkpoint))
+    model = AutoModelForSeq2SeqLM.from_pretrained(str(checkpoint)).eval()
+    scorer = rouge_scorer.RougeScorer(['rougeL'], use_stemmer=True)
+    scores = []
+    for question, expected in samples:
+        inputs = tokenizer(question, return_tensors="pt", max_length=trial["max_length"], truncation=True)
+        with torch.inference_mode():
+            outputs = model.generate(**inputs, max_new_tokens=160, num_beams=1)
+        prediction = tokenizer.decode(outputs[0], skip_special_tokens=True)
+        scores.append(scorer.score(expected, prediction)['rougeL'].fmeasure)
+    return trial["id"], sum(scores) / max(1, len(scores))
+
+
+def run_sweep(args):
+    SWEEP_DIR.mkdir(parents=True, exist_ok=True)
+    train_df, test_df = load_splits()
+    print(f"✅ Loaded {len(train_df)} train / {len(test_df)} test samples")
+
+    trials = sample_trials(args.trials, args.seed)
+    data_hash = dataset_hash()
+    build_token_cache(train_df, test_df, [trial["max_length"] for trial in trials], data_hash)
+    eval_max_length = max(trial["max_length"] for trial in trials)
+
+    budgets = rung_budgets(args.min_fraction, args.eta, args.epochs)
+    workers = args.workers or max(1, (os.cpu_count() or 1) // THREADS_PER_TRIAL)
+    print(f"🚀 {len(trials)} trials, rungs {budgets} epochs, {workers} workers x {THREADS_PER_TRIAL} threads, "
+          f"eval at max length {eval_max_length}\n")
+
+    # Trial ids are reused across sweeps: never resume a previous sweep's checkpoints
+    shutil.rmtree(SWEEP_DIR / "trials", ignore_errors=True)
+
+    state = {trial["id"]: dict(trial, status="running", rung=-1, cpu_seconds=0.0, history=[]) for trial in trials}
+    survivors = list(trials)
+    # Spawn: workers import torch fresh instead of inheriting a forked parent
+    context = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(THREADS_PER_TRIAL,)) as pool:
+        for rung, budget in enumerate(budgets):
+            futures = {pool.submit(run_rung, trial, budget, args.seed, eval_max_length, data_hash): trial for trial in survivors}
+            finished = []
+            for future in as_completed(futures):
+                trial = futures[future]
+                record = state[trial["id"]]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {trial['id']} failed at rung {rung}: {e}")
+                    record["status"] = "failed"
+                    continue
+                record["history"].append(result)
+                record["cpu_seconds"] += result["cpu_seconds"]
+                record["eval_loss"] = result["eval_loss"]
+                record["rung"] = rung
+                finished.append(trial)
+                print(f"   rung {rung} {trial['id']}: eval_loss {result['eval_loss']:.4f} "
+                      f"({result['cpu_seconds'] / 60:.1f} CPU-min)")
+
+            finished.sort(key=lambda trial: state[trial["id"]]["eval_loss"])
+            if rung == len(budgets) - 1:
+                for trial in finished:
+                    state[trial["id"]]["status"] = "completed"
+                break
+            keep = max(1, len(finished) // args.eta)
+            survivors = finished[:keep]
+            for trial in finished[keep:]:
+                state[trial["id"]]["status"] = f"stopped@{budget:g}ep"
+            print(f"✂️  Rung {rung} done: {len(survivors)} of {len(finished)} continue\n")
+
+        print("\n📊 Scoring ROUGE-L...")
+        samples = list(zip(test_df['input'], test_df['output']))[:args.rouge_samples]
+        scored = [trial for trial in trials if state[trial["id"]]["rung"] >= 0]
+        for future in as_completed([pool.submit(score_rouge, trial, samples) for trial in scored]):
+            try:
+                trial_id, rouge = future.result()
+                state[trial_id]["rougeL"] = rouge
+            except Exception as e:
+                print(f"⚠️ ROUGE scoring failed: {e}")
+
+    return rank(list(state.values()))
+
+
+def rank(records):
+    for record in records:
+        cpu_hours = record["cpu_seconds"] / 3600
+        rouge = record.get("rougeL")
+        record["rougeL_per_cpu_hour"] = rouge / cpu_hours if rouge is not None and cpu_hours > 0 else None
+    # Further rungs first (losses from shorter budgets aren't comparable), then eval loss
+    return sorted(records, key=lambda r: (-r["rung"], r.get("eval_loss", float("inf"))))
+
+
+def report(ranked):
+    columns = ["id", "status", "learning_rate", "batch_size", "max_length", "weight_decay",
+               "eval_loss", "rougeL", "cpu_seconds", "rougeL_per_cpu_hour"]
+    table = pd.DataFrame([{column: record.get(column) for column in columns} for record in ranked])
+    table["cpu_hours"] = (table.pop("cpu_seconds") / 3600).round(3)
+    print("\n" + table.to_string(index=False))
+
+    table.to_csv(SWEEP_DIR / "results.csv", index=False)
+    with open(SWEEP_DIR / "results.json", 'w') as f:
+        json.dump({"finished": datetime.now().isoformat(), "trials": ranked}, f, indent=2)
+    print(f"\n💾 Results: {SWEEP_DIR / 'results.csv'}")
+
+    efficient = [record for record in ranked if record.get("rougeL_per_cpu_hour") is not None]
+    if efficient:
+        best_value = max(efficient, key=lambda r: r["rougeL_per_cpu_hour"])
+        print(f"💡 Most ROUGE-L per CPU-hour: {best_value['id']} ({best_value['rougeL_per_cpu_hour']:.3f})")
+
+
+def promote(best):
+    """Copy the winning checkpoint's weights + tokenizer to models/finlit_model"""
+    checkpoint = _latest_checkpoint(SWEEP_DIR / "trials" / best["id"])
+    target = MODELS_DIR / "finlit_model"
+    tmp = target.with_name(target.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(checkpoint, tmp, ignore=shutil.ignore_patterns(
+        "optimizer.pt", "scheduler.pt", "rng_state*.pth", "trainer_state.json", "training_args.bin"))
+    if target.exists():
+        shutil.rmtree(target)
+    os.replace(tmp, target)
+    print(f"✅ Promoted {best['id']} to {target}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter sweep")
+    parser.add_argument("--trials", type=int, default=12)
+    parser.add_argument("--eta", type=int, default=3, help="keep 1/eta of trials per rung")
+    parser.add_argument("--min-fraction", type=float, default=0.25, help="first rung budget, in epochs")
+    parser.add_argument("--epochs", type=float, default=3.0, help="budget of the final rung")
+    parser.add_argument("--workers", type=int, default=0, help="default: cores // SWEEP_THREADS_PER_TRIAL")
+    parser.add_argument("--rouge-samples", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--promote", action="store_true", help="copy the best trial to models/finlit_model")
+    args = parser.parse_args()
+
+    if not DATA_PATH.exists():
+        print(f"❌ Dataset not found: {DATA_PATH}")
+        sys.exit(1)
+
+    print("=" * 70)
+    print(f"🔬 FINLIT AI - HYPERPARAMETER SWEEP ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
+    print("=" * 70)
+    ranked = run_sweep(args)
+    report(ranked)
+
+    best = next((record for record in ranked if record["status"] == "completed"), None)
+    if best is None:
+        print("❌ No trial completed")
+        sys.exit(1)
+    print(f"\n🏆 Best: {best['id']} eval_loss {best['eval_loss']:.4f}. Train it with:")
+    print(f"   FINLIT_LEARNING_RATE={best['learning_rate']} FINLIT_BATCH_SIZE={best['batch_size']} "
+          f"FINLIT_MAX_LENGTH={best['max_length']} FINLIT_WEIGHT_DECAY={best['weight_decay']} "
+          f"FINLIT_NUM_EPOCHS={args.epochs:g} python training/train_model.py")
+    if args.promote:
+        promote(best)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """
 Complete Training Pipeline for FinLit AI with Real Data
 """
+import os
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
@@ -33,10 +34,12 @@ for dir_path in [MODELS_DIR, OUTPUTS_DIR, LOGS_DIR]:
     dir_path.mkdir(exist_ok=True, parents=True)
 
 MODEL_NAME = "google/flan-t5-small"
-MAX_LENGTH = 512
-BATCH_SIZE = 2
-LEARNING_RATE = 3e-4
-NUM_EPOCHS = 3
+# Defaults; override with the winning config from training/sweep.py
+MAX_LENGTH = int(os.environ.get("FINLIT_MAX_LENGTH", "512"))
+BATCH_SIZE = int(os.environ.get("FINLIT_BATCH_SIZE", "2"))
+LEARNING_RATE = float(os.environ.get("FINLIT_LEARNING_RATE", "3e-4"))
+NUM_EPOCHS = float(os.environ.get("FINLIT_NUM_EPOCHS", "3"))
+WEIGHT_DECAY = float(os.environ.get("FINLIT_WEIGHT_DECAY", "0.01"))
 
 print("="*70)
 print("🎓 FINLIT AI - TRAINING WITH REAL DATA")
@@ -103,7 +106,7 @@ training_args = Seq2SeqTrainingArguments(
     per_device_train_batch_size=BATCH_SIZE,
     per_device_eval_batch_size=BATCH_SIZE,
     num_train_epochs=NUM_EPOCHS,
-    weight_decay=0.01,
+    weight_decay=WEIGHT_DECAY,
     save_strategy="epoch",
     save_total_limit=2,
     predict_with_generate=True,